@@ -0,0 +1,150 @@
+"""
+Velocidad de la carga del catálogo (catalog.py) desde un export de TMDB.
+
+Genera un export sintético movie_ids_*.json.gz con --rows líneas (con títulos
+acentuados, algunas líneas rotas e ids repetidos) y lo carga en una base
+SQLite temporal:
+
+- fila a fila: db.session.merge() de cada película y un commit cada
+  --batch-size filas, sobre las primeras --naive-rows líneas,
+- por lotes: cargar_catalogo() con el archivo completo,
+- reanudación: una carga que se corta a la mitad y se vuelve a lanzar; la
+  segunda ejecución solo lee lo que faltaba.
+
+Uso:
+    python benchmarks/bench_catalog.py [--rows 1000000] [--batch-size 10000] [--naive-rows 50000]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+WORDS = ["La", "noche", "del", "cazador", "Amélie", "Ciudad", "perdida", "El", "último", "tren",
+         "Blondie", "Star", "Wars", "¿Quién", "mató", "a", "Ñoño?", "Dr.", "Strangelove", "Río"]
+
+
+class Interrumpir(Exception):
+    pass
+
+
+def generar_export(path, rows, seed=0):
+    rng = random.Random(seed)
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for i in range(rows):
+            if i % 100000 == 99999:
+                fh.write("{roto\n")
+                continue
+            movie_id = rng.randrange(rows) if i % 1000 == 0 else i + 1
+            fh.write(json.dumps({
+                "adult": i % 50 == 0,
+                "id": movie_id,
+                "original_title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))),
+                "popularity": round(rng.random() * 100, 3),
+                "video": i % 200 == 0,
+            }) + "\n")
+
+
+def nueva_app():
+    from movie_bot import create_app
+    from movie_bot.db import db
+
+    db_path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "TMDB_DISK_CACHE": ""})
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def fila_a_fila(path, rows, batch_size):
+    from movie_bot.catalog import leer_export
+    from movie_bot.db import db
+    from movie_bot.models import CatalogMovie
+
+    app = nueva_app()
+    with app.app_context():
+        start = time.perf_counter()
+        n = 0
+        for line_no, row in leer_export(path):
+            if line_no >= rows:
+                break
+            db.session.merge(CatalogMovie(**row))
+            n += 1
+            if n % batch_size == 0:
+                db.session.commit()
+        db.session.commit()
+        return n, time.perf_counter() - start
+
+
+def por_lotes(path, batch_size):
+    from movie_bot.catalog import cargar_catalogo
+    from movie_bot.db import db
+    from movie_bot.models import CatalogMovie
+
+    app = nueva_app()
+    with app.app_context():
+        start = time.perf_counter()
+        loaded, state = cargar_catalogo(path, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        return loaded, elapsed, db.session.query(CatalogMovie).count(), state.lines_done
+
+
+def reanudar(path, batch_size, rows):
+    from movie_bot.catalog import cargar_catalogo
+    from movie_bot.db import db
+    from movie_bot.models import CatalogMovie
+
+    app = nueva_app()
+    with app.app_context():
+        def cortar(loaded, seconds):
+            if loaded >= rows // 2:
+                raise Interrumpir()
+
+        start = time.perf_counter()
+        try:
+            cargar_catalogo(path, batch_size=batch_size, progress=cortar)
+        except Interrumpir:
+            db.session.rollback()
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded, state = cargar_catalogo(path, batch_size=batch_size)
+        second = time.perf_counter() - start
+        again, _ = cargar_catalogo(path, batch_size=batch_size)
+        return first, second, loaded, state.upserts, db.session.query(CatalogMovie).count(), again
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--naive-rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "movie_ids_10_19_2026.json.gz")
+    start = time.perf_counter()
+    generar_export(path, args.rows)
+    print(f"export de {args.rows} líneas ({os.path.getsize(path) / 2**20:.1f} MiB gz) "
+          f"generado en {time.perf_counter() - start:.1f} s")
+
+    n, elapsed = fila_a_fila(path, args.naive_rows, args.batch_size)
+    print(f"fila a fila   {n:>9} filas en {elapsed:6.1f} s  {n / elapsed:>9,.0f} filas/s "
+          f"(~{args.rows / (n / elapsed) / 60:.1f} min el archivo completo)")
+
+    loaded, elapsed, count, lines = por_lotes(path, args.batch_size)
+    print(f"por lotes     {loaded:>9} filas en {elapsed:6.1f} s  {loaded / elapsed:>9,.0f} filas/s "
+          f"({count} películas distintas, {lines} líneas)")
+
+    first, second, loaded, total, count, again = reanudar(path, args.batch_size, args.rows)
+    print(f"reanudación   corte a la mitad tras {first:.1f} s; la segunda ejecución escribió {loaded} filas "
+          f"en {second:.1f} s ({total} en total, {count} películas); una tercera cargó {again}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Repite una conversación contra TMDB y OpenAI grabados (cassette.py).
+
+Primero se graba una sesión real (necesita TMDB_API_KEY y OPENAI_API_KEY, o
+--fake-tmdb para TMDB):
+    python benchmarks/bench_chat_replay.py --record conversacion.txt
+
+Después se reproduce sin red, con la latencia original escalada, para comparar
+el tiempo de chat() entre dos versiones del código:
+    python benchmarks/bench_chat_replay.py conversacion.txt [--latency 1.0] [--runs 3]
+
+conversacion.txt tiene un mensaje por línea; sin archivo se usa CONVERSACION.
+Cada ejecución parte de una base de datos y cachés vacías.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+CONVERSACION = [
+    "que rating tiene Dune",
+    "y el trailer?",
+    "donde la puedo ver",
+    "alguna parecida?",
+    "que nota tiene la segunda",
+    "recomiendame algo",
+    "me recomiendas una de terror",
+    "estrenos",
+    "donde puedo ver Oppenheimer, Barbie y Wonka",
+    "que me recomiendas para ver con mis padres?",
+    "hola! que pelicula ves para una noche de lluvia?",
+]
+
+
+def run_once(messages, db_path):
+    """Corre la conversación en este proceso; devuelve [(intención, segundos)]."""
+    from movie_bot import create_app
+    from movie_bot.chatbot import detectar_intencion, responder
+    from movie_bot.db import db
+    from movie_bot.models import User
+    from movie_bot.text_utils import limpiar_texto
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}"})
+    results = []
+    with app.app_context():
+        db.create_all()
+        user = User(email="bench@moviebot.test", region="US", favorite_genre="accion")
+        user.set_password("bench")
+        db.session.add(user)
+        db.session.commit()
+        for message in messages:
+            intent, _ = detectar_intencion(limpiar_texto(message, conservar=","))
+            start = time.perf_counter()
+            responder(user, message)
+            results.append((intent, time.perf_counter() - start))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("conversation", nargs="?")
+    parser.add_argument("--cassette", default=os.path.join(ROOT, "instance", "bench_chat.ndjson.gz"))
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--fake-tmdb", action="store_true")
+    parser.add_argument("--latency", type=float, default=1.0, help="factor de la latencia grabada")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.conversation:
+        with open(args.conversation, encoding="utf-8") as fh:
+            messages = [line.strip() for line in fh if line.strip()]
+    else:
+        messages = CONVERSACION
+
+    if args.child:
+        from movie_bot.metrics import metrics
+
+        # Una ejecución por proceso: cachés en memoria e índices vacíos
+        db_path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+        for intent, seconds in run_once(messages, db_path):
+            print(f"{intent} {seconds}")
+        print(f"# {metrics.snapshot()['counters'].get('cassette.misses', 0)}")
+        return
+
+    env = {**os.environ, "MOVIEBOT_CASSETTE_PATH": args.cassette,
+           "MOVIEBOT_CASSETTE_LATENCY": str(args.latency), "TMDB_DISK_CACHE": ""}
+    if args.record:
+        if os.path.exists(args.cassette):
+            os.remove(args.cassette)
+        env["MOVIEBOT_CASSETTE"] = "record"
+        if args.fake_tmdb:
+            from fake_tmdb import start_fake_tmdb
+            server, env["TMDB_BASE_URL"] = start_fake_tmdb(0.1)
+            env.setdefault("TMDB_API_KEY", "bench")
+        runs = 1
+    else:
+        env["MOVIEBOT_CASSETTE"] = "replay"
+        env.setdefault("TMDB_API_KEY", "replay")
+        env.setdefault("OPENAI_API_KEY", "replay")
+        runs = args.runs
+
+    command = [sys.executable, __file__, "--child"] + ([args.conversation] if args.conversation else [])
+    by_intent = {}
+    totals = []
+    misses = 0
+    for _ in range(runs):
+        output = subprocess.run(command, env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        total = 0.0
+        for line in output.splitlines():
+            intent, seconds = line.split()
+            if intent == "#":
+                misses += int(seconds)
+                continue
+            by_intent.setdefault(intent, []).append(float(seconds))
+            total += float(seconds)
+        totals.append(total)
+
+    mode = "grabación" if args.record else f"replay x{args.latency:g}"
+    print(f"{len(messages)} mensajes, {runs} ejecuciones ({mode}, {args.cassette})")
+    for intent, values in sorted(by_intent.items()):
+        values.sort()
+        print(
+            f"{intent:10s} n={len(values):3d}  p50 {statistics.median(values) * 1000:8.1f} ms  "
+            f"max {values[-1] * 1000:8.1f} ms"
+        )
+    print(f"total por conversación: {statistics.median(totals) * 1000:.1f} ms (mediana)")
+    if misses:
+        print(f"AVISO: {misses} peticiones no estaban grabadas (el cassette no corresponde a la conversación)")
+
+
+if __name__ == "__main__":
+    main()
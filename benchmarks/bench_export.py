@@ -0,0 +1,101 @@
+"""
+Memoria de la exportación del historial (export.py) según el tamaño del historial.
+
+Crea un usuario con N mensajes (y N/10 recomendaciones) en una base SQLite
+temporal y mide el pico de memoria de Python (tracemalloc) al exportarlo
+completo, frente a cargarlo con Message.query...all(). Con el streaming el pico
+debe ser el mismo para cualquier N.
+
+Uso:
+    python benchmarks/bench_export.py [--rows 10000 100000 1000000] [--gzip]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+INSERT_BATCH = 50000
+
+
+def poblar(db, user_id, rows):
+    from sqlalchemy import insert
+    from movie_bot.models import Message, Recommendation
+
+    now = datetime.utcnow()
+    for start in range(0, rows, INSERT_BATCH):
+        n = min(INSERT_BATCH, rows - start)
+        db.session.execute(insert(Message), [
+            {"user_id": user_id, "author": "user" if i % 2 else "assistant",
+             "content": f"Mensaje de prueba número {start + i} con algo de texto", "timestamp": now}
+            for i in range(n)
+        ])
+        db.session.execute(insert(Recommendation), [
+            {"user_id": user_id, "movie_id": start + i, "movie_title": f"Película {start + i}", "timestamp": now}
+            for i in range(0, n, 10)
+        ])
+        db.session.commit()
+
+
+def medir(fn):
+    """(segundos, pico de memoria en MiB) de ejecutar fn()."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--skip-all", action="store_true", help="no medir la carga con .all()")
+    args = parser.parse_args()
+
+    from movie_bot import create_app
+    from movie_bot.db import db
+    from movie_bot.export import exportar_historial
+    from movie_bot.models import Message, User
+
+    print(f"{'filas':>9}  {'streaming':>22}  {'.all()':>22}")
+    for rows in args.rows:
+        db_path = os.path.join(tempfile.mkdtemp(), "export.sqlite3")
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "TMDB_DISK_CACHE": ""})
+        with app.app_context():
+            db.create_all()
+            user = User(email="export@moviebot.test", password_hash="x")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+            poblar(db, user_id, rows)
+            db.session.expunge_all()
+
+            def streaming():
+                total = 0
+                for chunk in exportar_historial(user_id, comprimir=args.gzip):
+                    total += len(chunk)
+                return total
+
+            def cargar_todo():
+                return len(Message.query.filter_by(user_id=user_id).all())
+
+            s_time, s_peak, size = medir(streaming)
+            line = f"{rows:>9}  {s_peak:7.1f} MiB {s_time:7.2f} s {size / 2**20:5.0f}MB"
+            if not args.skip_all:
+                a_time, a_peak, _ = medir(cargar_todo)
+                db.session.expunge_all()
+                line += f"  {a_peak:7.1f} MiB {a_time:7.2f} s"
+            print(line)
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark del clasificador local de intenciones (intent_model.py).
+
+Entrena el modelo solo con las frases de ejemplo (SEMILLAS), sin mensajes
+guardados, y lo evalúa con mensajes de prueba escritos aparte: otras
+formulaciones y títulos que no aparecen en el entrenamiento. Para cada umbral
+de confianza informa:
+
+- qué parte de los mensajes dejan de ir a OpenAI (frente a solo las frases fijas),
+- aciertos de intención y de título entre los que se resuelven localmente,
+- mensajes que deberían ir a GPT y el modelo se queda (falsos locales),
+- tiempo de inferencia por mensaje.
+
+Uso:
+    python benchmarks/bench_intent.py [--thresholds 0.5 0.6 0.7 0.8 0.9]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# (mensaje, intención esperada, título esperado)
+PRUEBA = [
+    ("¿Cuánta nota tiene Dune?", "rating", "dune"),
+    ("cuanta nota le dan a Blade Runner", "rating", "blade runner"),
+    ("¿Es buena El club de la pelea?", "rating", "el club de la pelea"),
+    ("Pulp Fiction vale la pena?", "rating", "pulp fiction"),
+    ("qué puntaje tiene Whiplash", "rating", "whiplash"),
+    ("cuantas estrellas le ponen a Mad Max", "rating", "mad max"),
+    ("Pelis como Alien", "similares", "alien"),
+    ("películas tipo El resplandor", "similares", "el resplandor"),
+    ("algo parecido a La sirenita", "similares", "la sirenita"),
+    ("quiero otras como Up", "similares", "up"),
+    ("peliculas del estilo de Pulp Fiction", "similares", "pulp fiction"),
+    ("me pasas el trailer de Whiplash", "trailer", "whiplash"),
+    ("tráiler de Mad Max", "trailer", "mad max"),
+    ("ponme el avance de Blade Runner", "trailer", "blade runner"),
+    ("quiero ver el adelanto de El resplandor", "trailer", "el resplandor"),
+    ("¿En qué plataforma está Pulp Fiction?", "donde_ver", "pulp fiction"),
+    ("en que app veo Up", "donde_ver", "up"),
+    ("La sirenita está en Disney?", "donde_ver", "la sirenita"),
+    ("dónde pasan El club de la pelea", "donde_ver", "el club de la pelea"),
+    ("donde consigo Whiplash", "donde_ver", "whiplash"),
+    ("hay algo de comedia para ver", "recomendar", None),
+    ("sugiéreme una de terror", "recomendar", None),
+    ("no sé qué ver hoy", "recomendar", None),
+    ("¿Qué hay en cartelera?", "estrenos", None),
+    ("novedades de esta semana en cines", "estrenos", None),
+    ("¿Qué se estrenó este mes?", "estrenos", None),
+    ("hola, ¿qué tal?", "gpt", None),
+    ("¿Quién hizo la banda sonora de Blade Runner?", "gpt", None),
+    ("me explicas el final de El resplandor", "gpt", None),
+    ("¿Cuál fue la primera película de Pixar?", "gpt", None),
+    ("¿Quién dirigió Pulp Fiction?", "gpt", None),
+    ("¿De qué trata Whiplash?", "gpt", None),
+    ("gracias!", "gpt", None),
+    ("qué actores salen en Mad Max", "gpt", None),
+    # Los que ya resuelven las frases fijas
+    ("¿Qué rating tiene Up?", "rating", "up"),
+    ("¿Dónde puedo ver Mad Max?", "donde_ver", "mad max"),
+    ("¿Me recomiendas una de acción?", "recomendar", None),
+    ("Muéstrame una parecida a Whiplash", "similares", "whiplash"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    args = parser.parse_args()
+
+    from movie_bot.chatbot import detectar_intencion
+    from movie_bot.intent_model import IntentModel, ejemplos_semilla
+    from movie_bot.text_utils import limpiar_texto
+
+    start = time.perf_counter()
+    model = IntentModel.entrenar(ejemplos_semilla())
+    print(f"Entrenamiento: {len(ejemplos_semilla())} ejemplos, {len(model.vocab)} rasgos, "
+          f"{time.perf_counter() - start:.2f} s")
+
+    mensajes = []
+    for texto, esperado, titulo in PRUEBA:
+        clean = limpiar_texto(texto, conservar=",")
+        regla = detectar_intencion(clean, usar_modelo=False)
+        mensajes.append((clean, regla, esperado, titulo))
+
+    tiempos = []
+    predicciones = []
+    for clean, _, _, _ in mensajes:
+        t = time.perf_counter()
+        predicciones.append(model.predecir(clean.replace(",", "")))
+        tiempos.append(time.perf_counter() - t)
+    tiempos.sort()
+
+    total = len(mensajes)
+    a_gpt_reglas = sum(1 for _, regla, _, _ in mensajes if regla[0] == "gpt")
+    print(f"{total} mensajes de prueba; solo con frases fijas van a GPT {a_gpt_reglas} ({a_gpt_reglas / total:.0%})")
+    print(f"Inferencia: p50 {statistics.median(tiempos) * 1e6:.0f} µs, "
+          f"p99 {tiempos[int(len(tiempos) * 0.99) - 1] * 1e6:.0f} µs por mensaje")
+    print(f"{'umbral':>7} {'a GPT':>10} {'locales':>8} {'intención ok':>13} {'título ok':>10} {'falsos locales':>15}")
+    for threshold in args.thresholds:
+        a_gpt = locales = intent_ok = title_ok = titled = falsos = 0
+        for (clean, regla, esperado, titulo), (intent, confidence, arg) in zip(mensajes, predicciones):
+            if regla[0] != "gpt":
+                continue
+            if intent == "gpt" or confidence < threshold:
+                a_gpt += 1
+                continue
+            locales += 1
+            if esperado == "gpt":
+                falsos += 1
+            intent_ok += intent == esperado
+            if titulo is not None and intent == esperado:
+                titled += 1
+                title_ok += arg == titulo
+        print(f"{threshold:7.2f} {a_gpt:4d} ({a_gpt / total:3.0%}) {locales:8d} "
+              f"{intent_ok:6d}/{locales:<6d} {title_ok:4d}/{titled:<5d} {falsos:15d}")
+
+
+if __name__ == "__main__":
+    main()
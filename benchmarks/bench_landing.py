@@ -0,0 +1,93 @@
+"""
+Benchmark de la página principal (/).
+
+Compara peticiones/segundo sobre "/" en tres escenarios, con un TMDB falso
+que responde con una latencia fija:
+  - sin caché (se vacían las cachés antes de cada petición)
+  - con caché de fragmentos y de listados
+  - visitante recurrente que envía If-None-Match (respuesta 304)
+
+Uso:
+    python benchmarks/bench_landing.py [--requests 200] [--latency-ms 40]
+"""
+import argparse
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TMDB_API_KEY", "bench")
+
+
+def fake_tmdb(latency):
+    movies = [
+        {
+            "id": i,
+            "title": f"Película {i}",
+            "overview": "Descripción de prueba " * 10,
+            "release_date": "2025-01-01",
+            "backdrop_path": f"/backdrop{i}.jpg",
+        }
+        for i in range(20)
+    ]
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {"results": movies}
+
+    def get(url, params=None, **kwargs):
+        time.sleep(latency)
+        return FakeResponse()
+
+    return get
+
+
+def run(client, n, headers=None, before=None):
+    start = time.perf_counter()
+    for _ in range(n):
+        if before:
+            before()
+        response = client.get("/", headers=headers or {})
+        assert response.status_code in (200, 304), response.status_code
+    elapsed = time.perf_counter() - start
+    return n / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    args = parser.parse_args()
+
+    from movie_bot import create_app, tmdb_api
+    from movie_bot.blueprints import landing
+
+    app = create_app()
+
+    def clear_caches():
+        landing.landing_cache.clear()
+        tmdb_api._list_cache.clear()
+
+    with mock.patch.object(tmdb_api.requests, "get", fake_tmdb(args.latency_ms / 1000)):
+        client = app.test_client()
+
+        no_cache = run(client, max(args.requests // 10, 5), before=clear_caches)
+
+        clear_caches()
+        client.get("/")
+        cached = run(client, args.requests)
+
+        etag = client.get("/").headers["ETag"]
+        not_modified = run(client, args.requests, headers={"If-None-Match": etag})
+
+    print(f"Latencia TMDB simulada: {args.latency_ms:.0f} ms")
+    print(f"Sin caché:            {no_cache:10.1f} req/s")
+    print(f"Fragmento en caché:   {cached:10.1f} req/s  (x{cached / no_cache:.1f})")
+    print(f"304 Not Modified:     {not_modified:10.1f} req/s  (x{not_modified / no_cache:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Latencia del chat con un destino de logs lento, con y sin la cola de logs.py.
+
+Hace --requests POST /chat con el cliente de pruebas de Flask (frente a un
+TMDB falso) mientras los logs van a un stream que tarda --sink-ms por línea,
+como un disco lento o un recolector atascado. Compara:
+
+- en el hilo (LOG_QUEUE_SIZE=0): cada línea espera al stream,
+- cola: la petición solo encola; se descarta lo que no cabe,
+- cola + muestreo: además solo pasa una fracción de las líneas INFO del chat.
+
+Uso:
+    python benchmarks/bench_logging.py [--requests 300] [--sink-ms 5] [--queue-size 10000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_workers import prepare_db  # noqa: E402
+from fake_tmdb import start_fake_tmdb  # noqa: E402
+
+
+class SlowStream:
+    """Stream de texto que tarda ``delay`` segundos en cada escritura."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.lines = 0
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        with self._lock:
+            time.sleep(self.delay)
+            self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def run(label, queue_size, sampling, args):
+    from movie_bot import create_app
+    from movie_bot.logs import instalar_logging, parse_sampling
+    from movie_bot.metrics import metrics
+
+    # Base nueva en cada caso: el historial del chat crece con cada mensaje
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+    prepare_db(db_path)
+    stream = SlowStream(args.sink_ms / 1000)
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+                      "LOG_QUEUE_SIZE": queue_size, "LOG_SAMPLING": sampling})
+    # Mismos parámetros que logs_config(), pero hacia el stream lento
+    handler = instalar_logging(
+        level="INFO", fmt="json", queue_size=queue_size, sampling=parse_sampling(sampling), stream=stream
+    )
+
+    client = app.test_client()
+    client.post("/login", data={"email": "bench@moviebot.test", "password": "bench"})
+    dropped_before = metrics.snapshot()["counters"].get("logging.dropped", 0)
+
+    latencies = []
+    for i in range(args.requests):
+        start = time.perf_counter()
+        client.post("/chat", data={"message": f"que rating tiene pelicula {i % 20}"})
+        latencies.append(time.perf_counter() - start)
+
+    # Espera a que el hilo de escritura vacíe la cola
+    flush_start = time.perf_counter()
+    if queue_size:
+        handler.close()
+    flush = time.perf_counter() - flush_start
+
+    latencies.sort()
+    dropped = metrics.snapshot()["counters"].get("logging.dropped", 0) - dropped_before
+    return {
+        "label": label,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "total": sum(latencies),
+        "lines": stream.lines,
+        "dropped": dropped,
+        "flush": flush,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--sink-ms", type=float, default=5)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    server, tmdb_url = start_fake_tmdb(0)
+    os.environ.update({"TMDB_API_KEY": "bench", "TMDB_BASE_URL": tmdb_url, "TMDB_DISK_CACHE": "",
+                       "PASSWORD_HASH_WORKERS": "0", "LOG_QUEUE_SIZE": "0"})
+
+    sampling = "movie_bot.chatbot=0.1,movie_bot.intent_model=0.1,movie_bot.query_counter=0.1"
+    print(f"{args.requests} chats, destino de logs de {args.sink_ms:g} ms por línea")
+    for label, queue_size, rates in (
+        ("en el hilo", 0, ""),
+        ("cola", args.queue_size, ""),
+        ("cola + muestreo", args.queue_size, sampling),
+    ):
+        r = run(label, queue_size, rates, args)
+        print(
+            f"{r['label']:16s} p50 {r['p50'] * 1000:6.1f} ms  p99 {r['p99'] * 1000:6.1f} ms  "
+            f"total {r['total']:5.2f} s | {r['lines']} líneas escritas, {r['dropped']} descartadas, "
+            f"vaciado de la cola {r['flush']:.2f} s"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark de una ráfaga de logins: logins/s y latencia del chat mientras tanto.
+
+Levanta gunicorn (un worker gthread, el tipo por defecto) frente a un TMDB
+falso y, durante --seconds segundos, --storm hilos hacen login sin parar
+mientras otro cliente chatea. Compara el hash en el mismo proceso
+(PASSWORD_HASH_WORKERS=0) con el pool de procesos de passwords.py.
+
+Uso:
+    python benchmarks/bench_login.py [--storm 32] [--seconds 10] [--pool-workers 1]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_workers import free_port, prepare_db  # noqa: E402
+from fake_tmdb import start_fake_tmdb  # noqa: E402
+
+EMAIL = "bench@moviebot.test"
+PASSWORD = "bench"
+
+
+def chat_latencies(base, stop):
+    session = requests.Session()
+    session.post(f"{base}/login", data={"email": EMAIL, "password": PASSWORD})
+    latencies = []
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.post(f"{base}/chat", data={"message": f"que rating tiene pelicula {i % 20}"}, timeout=120)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    return latencies
+
+
+def run(label, hash_workers, args, env):
+    port = free_port()
+    env = {**env, "PORT": str(port), "WEB_CONCURRENCY": "1",
+           "PASSWORD_HASH_WORKERS": str(hash_workers)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{base}/login", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.1)
+
+        # Calentamiento: arranca los procesos del pool
+        requests.post(f"{base}/login", data={"email": EMAIL, "password": PASSWORD})
+
+        stop = threading.Event()
+        logins = []
+
+        def storm():
+            while not stop.is_set():
+                response = requests.post(
+                    f"{base}/login", data={"email": EMAIL, "password": PASSWORD},
+                    allow_redirects=False, timeout=120
+                )
+                logins.append(response.status_code)
+
+        def idle_chat():
+            # Línea base sin ráfaga
+            idle_stop = threading.Event()
+            timer = threading.Timer(2, idle_stop.set)
+            timer.start()
+            return chat_latencies(base, idle_stop)
+
+        idle = idle_chat()
+        threads = [threading.Thread(target=storm) for _ in range(args.storm)]
+        for t in threads:
+            t.start()
+        result = {}
+        chat_thread = threading.Thread(target=lambda: result.setdefault("chat", chat_latencies(base, stop)))
+        chat_thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads + [chat_thread]:
+            t.join()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    chat = sorted(result["chat"])
+    ok = sum(1 for status in logins if status == 302)
+    return {
+        "label": label,
+        "logins": ok / args.seconds,
+        "busy": sum(1 for status in logins if status == 503),
+        "idle_p50": statistics.median(idle),
+        "p50": statistics.median(chat),
+        "p95": chat[max(0, int(len(chat) * 0.95) - 1)],
+        "chats": len(chat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--storm", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--pool-workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    args = parser.parse_args()
+
+    server, tmdb_url = start_fake_tmdb(0)
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.sqlite3")
+    env = {**os.environ, "TMDB_API_KEY": "bench", "TMDB_BASE_URL": tmdb_url, "TMDB_DISK_CACHE": "",
+           "DATABASE_URL": f"sqlite:///{db_path}", "PASSWORD_HASH_WORKERS": "0"}
+    os.environ.update(env)
+    prepare_db(db_path)
+
+    print(f"{args.storm} hilos haciendo login durante {args.seconds:g} s, {os.cpu_count()} CPU")
+    for label, workers in (("en el hilo", 0), (f"pool x{args.pool_workers}", args.pool_workers)):
+        r = run(label, workers, args, env)
+        print(
+            f"{r['label']:12s} {r['logins']:6.1f} logins/s ({r['busy']} rechazados)  "
+            f"chat: sin ráfaga p50 {r['idle_p50'] * 1000:6.1f} ms | con ráfaga p50 {r['p50'] * 1000:7.1f} ms "
+            f"p95 {r['p95'] * 1000:7.1f} ms ({r['chats']} chats)"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark del ranking local de recomendaciones (movie_bot/ranking.py).
+
+Genera N películas sintéticas con el formato de TMDB, construye el
+CandidateSet y mide cuánto tarda rank() frente a la misma puntuación
+calculada fila a fila en Python puro.
+
+Uso:
+    python benchmarks/bench_ranking.py [--rows 100000] [--runs 20]
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from movie_bot import ranking  # noqa: E402
+from movie_bot.records import movies_from_tmdb  # noqa: E402
+
+
+def synthetic_results(rows, seed=0):
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": f"Película {i}",
+            "genre_ids": rnd.sample(ranking.TMDB_GENRE_IDS, rnd.randint(1, 3)),
+            "vote_average": round(rnd.uniform(3, 9), 1),
+            "popularity": rnd.uniform(1, 5000),
+            "release_date": f"{rnd.randint(1980, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        }
+        for i in range(rows)
+    ]
+
+
+def rank_python(results, favorite_id, disliked_id, history_ids, k, today):
+    """Misma puntuación que ranking.rank() sin el historial, fila a fila."""
+    max_pop = max(math.log1p(m["popularity"]) for m in results)
+    scored = []
+    for m in results:
+        if m["id"] in history_ids:
+            continue
+        genre = (ranking.FAVORITE_WEIGHT * (favorite_id in m["genre_ids"])
+                 + ranking.DISLIKED_WEIGHT * (disliked_id in m["genre_ids"]))
+        age = max(today - ranking._dias(m["release_date"]), 0)
+        score = (genre
+                 + ranking.QUALITY_WEIGHT * m["vote_average"] / 10
+                 + ranking.POPULARITY_WEIGHT * math.log1p(m["popularity"]) / max_pop
+                 + ranking.RECENCY_WEIGHT * math.exp(-age / ranking.RECENCY_DAYS))
+        scored.append((score, m["id"]))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def timed(fn, runs):
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    results = synthetic_results(args.rows)
+    favorite_id, disliked_id = 28, 27
+    history_ids = set(range(0, args.rows, 97))
+    today = ranking._dias("2025-06-01")
+
+    t = time.perf_counter()
+    candidates = ranking.CandidateSet.from_movies(movies_from_tmdb(results))
+    build = time.perf_counter() - t
+
+    weights = ranking.pesos_de_genero(favorite_id, disliked_id)
+    numpy_time = timed(lambda: ranking.rank(candidates, weights, history_ids, k=5, today=today), args.runs)
+    python_time = timed(
+        lambda: rank_python(results, favorite_id, disliked_id, history_ids, 5, today),
+        max(1, args.runs // 10),
+    )
+
+    print(f"Filas candidatas: {args.rows}")
+    print(f"Construcción del CandidateSet: {build * 1000:8.1f} ms (una vez por TTL de listados)")
+    print(f"rank() con NumPy:              {numpy_time * 1000:8.1f} ms (mediana)")
+    print(f"Puntuación en Python puro:     {python_time * 1000:8.1f} ms (mediana)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Efecto del límite de /chat (rate_limit.py) frente a un usuario que martillea.
+
+Con el cliente de pruebas de Flask y un TMDB falso, un mismo usuario manda:
+
+- script: --requests mensajes distintos seguidos,
+- doble envío: --limit mensajes, cada uno enviado dos veces (sin llegar a la
+  ventana, solo actúa el debounce).
+
+Cada caso usa títulos distintos para no aprovechar las cachés de TMDB del
+caso anterior.
+
+Para cada backend (sin límite, en memoria, SQLite compartido) informa cuántos
+mensajes se procesaron (guardados en la base), cuántas peticiones llegaron a
+TMDB, cuántas se limitaron, la latencia de las respuestas procesadas frente a
+las limitadas y lo que cuesta cada comprobación.
+
+Uso:
+    python benchmarks/bench_rate_limit.py [--requests 200] [--limit 20] [--latency 0.02]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_workers import prepare_db  # noqa: E402
+from fake_tmdb import start_fake_tmdb  # noqa: E402
+
+
+def run(backend, scenario, args, server, salt):
+    from movie_bot import create_app
+    from movie_bot.db import db
+    from movie_bot.models import Message
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.sqlite3")
+    prepare_db(db_path)
+    config = {"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+              "CHAT_RATE_LIMIT": 0 if backend == "sin límite" else args.limit,
+              "CHAT_RATE_LIMIT_DB": os.path.join(tmp, "limits.sqlite3") if backend == "sqlite" else ""}
+    app = create_app(config)
+    client = app.test_client()
+    client.post("/login", data={"email": "bench@moviebot.test", "password": "bench"})
+
+    if scenario == "script":
+        messages = [f"que rating tiene pelicula {salt} {i}" for i in range(args.requests)]
+    else:
+        messages = [f"que rating tiene pelicula {salt} {i // 2}" for i in range(2 * args.limit)]
+
+    hits_before = server.hits
+    processed, limited = [], []
+    for message in messages:
+        start = time.perf_counter()
+        response = client.post("/chat", data={"message": message})
+        elapsed = time.perf_counter() - start
+        (limited if response.status_code == 429 or "Retry-After" in response.headers else processed).append(elapsed)
+
+    with app.app_context():
+        saved = db.session.query(Message).filter_by(author="user").count()
+    # Costo de una comprobación aceptada (usuarios distintos, sin límite alcanzado)
+    limiter = app.extensions.get("chat_rate_limiter")
+    check_us = 0
+    if limiter is not None:
+        start = time.perf_counter()
+        for user_id in range(1000, 2000):
+            limiter.check(user_id, "hola")
+        check_us = (time.perf_counter() - start) / 1000 * 1e6
+    return {
+        "saved": saved,
+        "tmdb": server.hits - hits_before,
+        "limited": len(limited),
+        "processed_ms": statistics.mean(processed) * 1000 if processed else 0,
+        "limited_ms": statistics.mean(limited) * 1000 if limited else 0,
+        "check_us": check_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server, tmdb_url = start_fake_tmdb(args.latency)
+    os.environ.update({"TMDB_API_KEY": "bench", "TMDB_BASE_URL": tmdb_url, "TMDB_DISK_CACHE": "",
+                       "PASSWORD_HASH_WORKERS": "0", "CHAT_RATE_WINDOW": "60", "CHAT_DEBOUNCE": "5"})
+
+    print(f"POST /chat de un usuario; límite {args.limit} por minuto, debounce 5 s")
+    print(f"{'escenario':12s} {'backend':11s} {'procesados':>10s} {'a TMDB':>7s} {'limitados':>9s} "
+          f"{'ms procesado':>12s} {'ms limitado':>11s} {'µs comprobación':>15s}")
+    salt = 0
+    for scenario in ("script", "doble envío"):
+        for backend in ("sin límite", "memoria", "sqlite"):
+            salt += 1
+            r = run(backend, scenario, args, server, salt)
+            print(f"{scenario:12s} {backend:11s} {r['saved']:10d} {r['tmdb']:7d} {r['limited']:9d} "
+                  f"{r['processed_ms']:12.1f} {r['limited_ms']:11.1f} {r['check_us']:15.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark de memoria de las películas en caché (movie_bot/records.py).
+
+Compara, para N películas con el formato de respuesta de TMDB:
+  - el JSON completo de TMDB, que era lo que guardaba la caché de listados;
+  - diccionarios con los mismos campos que Movie;
+  - registros Movie con __slots__, que es lo que se guarda ahora.
+
+Uso:
+    python benchmarks/bench_records.py [--movies 10000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from movie_bot.records import Movie, movies_from_tmdb  # noqa: E402
+
+
+def tmdb_page_json(movies, seed=0):
+    """Respuesta de /movie/popular con los campos reales de TMDB, como texto JSON."""
+    rnd = random.Random(seed)
+    results = [
+        {
+            "adult": False,
+            "backdrop_path": f"/{rnd.getrandbits(64):016x}.jpg",
+            "genre_ids": rnd.sample([28, 12, 16, 35, 80, 18, 27, 53, 10749, 878], 3),
+            "id": 100000 + i,
+            "original_language": "en",
+            "original_title": f"Original Title {i}",
+            "overview": "Sinopsis de la película " * rnd.randint(8, 20),
+            "popularity": rnd.uniform(1, 5000),
+            "poster_path": f"/{rnd.getrandbits(64):016x}.jpg",
+            "release_date": f"20{rnd.randint(10, 25)}-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}",
+            "title": f"Película número {i}",
+            "video": False,
+            "vote_average": round(rnd.uniform(3, 9), 3),
+            "vote_count": rnd.randint(0, 30000),
+        }
+        for i in range(movies)
+    ]
+    return json.dumps({"page": 1, "results": results, "total_pages": 500, "total_results": 10000})
+
+
+def measure(build):
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--movies", type=int, default=10_000)
+    args = parser.parse_args()
+
+    text = tmdb_page_json(args.movies)
+    fields = Movie.__slots__
+
+    # Cada variante parte del JSON recién decodificado y solo conserva lo que
+    # quedaría en caché, así que también cuenta los textos (sinopsis, títulos)
+    sizes = {
+        "JSON de TMDB completo (antes)": measure(lambda: json.loads(text)),
+        "dicts con los campos de Movie": measure(
+            lambda: [{f: getattr(m, f) for f in fields} for m in movies_from_tmdb(json.loads(text)["results"])]
+        ),
+        "registros Movie con __slots__ (ahora)": measure(lambda: movies_from_tmdb(json.loads(text)["results"])),
+    }
+    print(f"Memoria para {args.movies} películas en caché:")
+    for label, size in sizes.items():
+        print(f"  {label:40s} {size / 2**20:7.2f} MiB ({size / args.movies:6.0f} bytes por película)")
+
+
+if __name__ == "__main__":
+    main()
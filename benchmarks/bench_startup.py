@@ -0,0 +1,56 @@
+"""
+Benchmark de arranque en frío.
+
+Mide, en procesos nuevos, cuánto tarda "import movie_bot" + create_app()
+y cuánto costaría además cargar las dependencias diferidas (openai, alembic)
+que antes se importaban siempre al arrancar.
+
+Uso:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SNIPPETS = {
+    "create_app()": "import movie_bot; movie_bot.create_app()",
+    "create_app() + openai + flask_migrate (carga anterior)": (
+        "import movie_bot; movie_bot.create_app(); import openai, flask_migrate"
+    ),
+}
+
+TEMPLATE = """
+import time
+t = time.perf_counter()
+{code}
+print(time.perf_counter() - t)
+"""
+
+
+def measure(code, runs):
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", TEMPLATE.format(code=code)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+            env={**os.environ, "ENABLE_MIGRATIONS": "0"},
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, code in SNIPPETS.items():
+        print(f"{label:55s} {measure(code, args.runs) * 1000:8.1f} ms (mediana de {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
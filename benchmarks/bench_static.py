@@ -0,0 +1,118 @@
+"""
+Bytes transferidos por vista de página, con y sin los archivos con huella de assets.py.
+
+Para la portada, el login y el chat descarga el HTML y todo lo que enlaza
+(css, js, imágenes) con un navegador simulado (cliente de pruebas de Flask
+que acepta gzip/br y respeta Cache-Control), en una primera visita y en una
+visita repetida:
+
+- "sin build": Flask sirve static/ y Bootstrap sin comprimir; en la visita
+  repetida el navegador revalida cada archivo (304).
+- "flask assets": URLs versionadas y precomprimidas; en la visita repetida los
+  archivos salen de la caché del navegador (immutable) sin ninguna petición.
+
+Uso:
+    python benchmarks/bench_static.py
+"""
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_workers import prepare_db  # noqa: E402
+from fake_tmdb import start_fake_tmdb  # noqa: E402
+
+PAGES = ("/", "/login", "/chat")
+RESOURCE_RE = re.compile(r'<(?:link|script|img)[^>]+(?:href|src)="(/(?:static|assets|bootstrap)/[^"]+)"')
+ACCEPT_ENCODING = "gzip, deflate, br"
+
+
+class Navegador:
+    """Caché HTTP mínima: guarda ETag/Last-Modified y respeta max-age."""
+
+    def __init__(self, client):
+        self.client = client
+        self.cache = {}
+
+    def get(self, url):
+        """(bytes recibidos, peticiones hechas) para traer ``url``."""
+        cached = self.cache.get(url)
+        if cached is not None and cached["fresh"]:
+            return 0, 0
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = self.client.get(url, headers=headers)
+        body = len(response.get_data())
+        cache_control = response.cache_control
+        self.cache[url] = {
+            "fresh": bool(cache_control.max_age) and not cache_control.no_cache,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return body, 1
+
+    def vista(self, page):
+        """(bytes del HTML, bytes de estáticos, peticiones de estáticos) de una vista."""
+        response = self.client.get(page, headers={"Accept-Encoding": ACCEPT_ENCODING})
+        html = response.get_data(as_text=True)
+        static_bytes = requests = 0
+        for url in dict.fromkeys(RESOURCE_RE.findall(html)):
+            body, n = self.get(url)
+            static_bytes += body
+            requests += n
+        return len(response.get_data()), static_bytes, requests
+
+
+def medir(assets_dir, build):
+    from movie_bot import create_app
+    from movie_bot.assets import build_assets
+
+    app = create_app({"ASSETS_DIR": assets_dir, "TESTING": True})
+    if build:
+        with app.app_context():
+            build_assets(app)
+        app = create_app({"ASSETS_DIR": assets_dir, "TESTING": True})
+
+    client = app.test_client()
+    client.post("/login", data={"email": "bench@moviebot.test", "password": "bench"})
+    navegador = Navegador(client)
+    return {
+        visita: [navegador.vista(page) for page in PAGES]
+        for visita in ("primera", "repetida")
+    }
+
+
+def main():
+    server, tmdb_url = start_fake_tmdb(0)
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.sqlite3")
+    os.environ.update({"TMDB_API_KEY": "bench", "TMDB_BASE_URL": tmdb_url, "TMDB_DISK_CACHE": "",
+                       "DATABASE_URL": f"sqlite:///{db_path}", "PASSWORD_HASH_WORKERS": "0"})
+    prepare_db(db_path)
+
+    results = {
+        "sin build": medir(os.path.join(tmp, "sin-assets"), build=False),
+        "flask assets": medir(os.path.join(tmp, "assets"), build=True),
+    }
+    print(f"{'':14s}{'visita':10s}" + "".join(f"{page:>26s}" for page in PAGES))
+    for label, visitas in results.items():
+        for visita, vistas in visitas.items():
+            cells = "".join(
+                f"{(html + static) / 1024:9.1f} KiB ({static / 1024:6.1f}, {n:2d} req)"
+                for html, static, n in vistas
+            )
+            print(f"{label:14s}{visita:10s}{cells}")
+    print("(total por vista; entre paréntesis, KiB y peticiones de estáticos)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark del índice de trigramas de títulos (movie_bot/title_index.py).
+
+Construye el índice con N títulos sintéticos (por defecto MAX_TITLES, el
+tamaño máximo por worker), informa la memoria que ocupa (tracemalloc), el
+tiempo por búsqueda de títulos con errores de tipeo y cuánto tarda el
+descarte de la mitad más antigua cuando el índice se llena.
+
+Uso:
+    python benchmarks/bench_title_index.py [--titles 500000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from movie_bot.title_index import MAX_TITLES, TitleIndex  # noqa: E402
+
+STOPWORDS = "el la los las de del en y a un una the of and".split()
+SYLLABLES = (
+    "ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo ga go gu la le li lo lu "
+    "ma me mi mo mu na ne ni no nu pa pe pi po ra re ri ro ru sa se si so su ta te ti "
+    "to tu va ve vi vo za ze zo tra tre tro bra bri cla clo gra gre pla ple"
+).split()
+
+
+def synthetic_titles(n, seed=0):
+    """Títulos de 1 a 5 palabras de un vocabulario grande, con artículos frecuentes."""
+    rnd = random.Random(seed)
+    vocabulary = list({
+        "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))) for _ in range(60000)
+    })
+    titles = []
+    for _ in range(n):
+        words = [rnd.choice(vocabulary) for _ in range(rnd.randint(1, 4))]
+        if rnd.random() < 0.5:
+            words.insert(rnd.randrange(len(words) + 1), rnd.choice(STOPWORDS))
+        titles.append(" ".join(words))
+    return titles
+
+
+def typo(title, rnd):
+    """Quita o duplica una letra al azar."""
+    i = rnd.randrange(len(title))
+    return title[:i] + title[i + 1:] if rnd.random() < 0.5 else title[:i] + title[i] + title[i:]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=MAX_TITLES)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.titles)
+    tracemalloc.start()
+    t = time.perf_counter()
+    index = TitleIndex(maxsize=len(titles))
+    for movie_id, title in enumerate(titles):
+        index.add(movie_id, title)
+    build = time.perf_counter() - t
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rnd = random.Random(1)
+    sample = [rnd.randrange(len(titles)) for _ in range(args.queries)]
+    times = []
+    hits = 0
+    for movie_id in sample:
+        query = typo(titles[movie_id], rnd)
+        t = time.perf_counter()
+        matches = index.search(query, k=5)
+        times.append(time.perf_counter() - t)
+        hits += any(m[1] == movie_id for m in matches)
+    times.sort()
+
+    print(f"Títulos indexados: {len(index)} en {build:.1f} s")
+    print(f"Memoria del índice: {memory / 2**20:.1f} MiB ({memory / len(index):.0f} bytes por título)")
+    print(f"Búsqueda con error de tipeo: p50 {statistics.median(times) * 1e6:.0f} µs, "
+          f"p95 {times[int(len(times) * 0.95)] * 1e6:.0f} µs")
+    print(f"Título correcto entre los 5 primeros: {hits / len(sample):.1%}")
+
+    # Un título más con el índice lleno: se descarta la mitad más antigua
+    if len(index) >= index.maxsize:
+        t = time.perf_counter()
+        index.add(len(titles), "título que no cabe")
+        print(f"Descarte al llenarse: {time.perf_counter() - t:.2f} s, quedan {len(index)} títulos")
+
+
+if __name__ == "__main__":
+    main()
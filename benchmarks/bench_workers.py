@@ -0,0 +1,155 @@
+"""
+Benchmark de /chat: workers síncronos vs workers gthread con el mismo número
+de peticiones en vuelo.
+
+Levanta gunicorn dos veces frente a un TMDB falso con latencia fija y lanza
+muchos chats a la vez. Las dos configuraciones atienden --workers * --threads
+peticiones a la vez, así que la diferencia es solo procesos contra hilos:
+  - sync:    --workers * --threads procesos síncronos (GUNICORN_THREADS=1)
+  - gthread: --workers procesos con --threads hilos cada uno
+
+Uso:
+    python benchmarks/bench_workers.py [--concurrency 60] [--latency-ms 200] [--workers 2] [--threads 8]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_tmdb import start_fake_tmdb  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_mb(pid):
+    """RSS total del proceso maestro de gunicorn y sus hijos, en MB."""
+    total = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                ppid = int(fh.read().rsplit(")", 1)[1].split()[1])
+            if int(entry) != pid and ppid != pid:
+                continue
+            with open(f"/proc/{entry}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total / 1024
+
+
+def prepare_db(path):
+    from movie_bot import create_app
+    from movie_bot.db import db
+    from movie_bot.models import User
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+    with app.app_context():
+        db.create_all()
+        user = User(email="bench@moviebot.test", region="US")
+        user.set_password("bench")
+        db.session.add(user)
+        db.session.commit()
+
+
+def run_mode(mode, args, env):
+    port = free_port()
+    if mode == "sync":
+        workers, threads = args.workers * args.threads, 1
+    else:
+        workers, threads = args.workers, args.threads
+    env = {**env, "PORT": str(port), "WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(threads)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{base}/login", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                time.sleep(0.1)
+
+        session = requests.Session()
+        session.post(f"{base}/login", data={"email": "bench@moviebot.test", "password": "bench"})
+        cookies = session.cookies.get_dict()
+
+        def one(i):
+            start = time.perf_counter()
+            response = requests.post(
+                f"{base}/chat", data={"message": f"que rating tiene pelicula {mode} {i}"},
+                cookies=cookies, timeout=120
+            )
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            results = list(pool.map(one, range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        memory = rss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if r[1] != 200)
+    return {
+        "throughput": len(results) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "errors": errors,
+        "rss": memory,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    server, tmdb_url = start_fake_tmdb(args.latency_ms / 1000)
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.sqlite3")
+    env = {**os.environ, "TMDB_API_KEY": "bench", "TMDB_BASE_URL": tmdb_url,
+           "TMDB_LIST_TTL": "0", "DATABASE_URL": f"sqlite:///{db_path}",
+           # Todos los chats son del mismo usuario: sin límite por usuario
+           "CHAT_RATE_LIMIT": "0", "LOG_LEVEL": "WARNING"}
+    os.environ.update(env)
+    prepare_db(db_path)
+
+    print(f"{args.concurrency} chats concurrentes, TMDB a {args.latency_ms:.0f} ms, "
+          f"{args.workers * args.threads} peticiones en vuelo")
+    for mode in ("sync", "gthread"):
+        r = run_mode(mode, args, env)
+        print(
+            f"{mode:7s} {r['throughput']:7.1f} chats/s  p50 {r['p50'] * 1000:7.0f} ms  "
+            f"p95 {r['p95'] * 1000:7.0f} ms  errores {r['errors']:3d}  RSS {r['rss']:6.1f} MB"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Servidor HTTP falso que imita los endpoints de TMDB que usa MovieBot.
+
+Responde con datos sintéticos tras una latencia fija, para medir el
+comportamiento de la app frente a un upstream lento sin salir a Internet.
+Se usa apuntando TMDB_BASE_URL a la URL que devuelve start_fake_tmdb().
+FakeImageUpstream hace lo mismo con las imágenes del CDN.
+"""
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def _movies(seed, n=20):
+    return [
+        {
+            "id": seed * 100 + i,
+            "title": f"Película {seed * 100 + i}",
+            "original_title": f"Movie {seed * 100 + i}",
+            "overview": "Descripción de prueba.",
+            "release_date": "2025-01-01",
+            "backdrop_path": f"/backdrop{i}.jpg",
+            "vote_average": round(5 + (i % 5), 1),
+            "popularity": 100.0 - i,
+            "genre_ids": [28, 27, 35, 18, 10749, 53][i % 6:i % 6 + 2],
+        }
+        for i in range(n)
+    ]
+
+
+def _facet(movie_id, facet):
+    if facet == "watch/providers":
+        providers = {"flatrate": [{"provider_id": 8, "provider_name": "Netflix", "logo_path": "/n.png"}]}
+        return {"id": movie_id, "results": {r: providers for r in ("US", "MX", "ES", "AR", "CL")}}
+    if facet == "videos":
+        return {"id": movie_id, "results": [{"type": "Trailer", "site": "YouTube", "key": f"k{movie_id}"}]}
+    if facet == "similar":
+        return {"page": 1, "results": _movies(movie_id % 50)}
+    return None
+
+
+def route(path, query):
+    """Devuelve el JSON de respuesta para una ruta de la API de TMDB."""
+    page = int(query.get("page", ["1"])[0])
+    match = re.match(r"^/3/movie/(\d+)(?:/(\w+(?:/\w+)?))?$", path)
+    if path == "/3/search/movie":
+        seed = sum(map(ord, query.get("query", [""])[0])) % 50
+        return {"results": _movies(seed, 5)}
+    if path in ("/3/movie/popular", "/3/movie/now_playing", "/3/discover/movie"):
+        return {"page": page, "results": _movies(page)}
+    if match:
+        movie_id, facet = int(match.group(1)), match.group(2)
+        if facet:
+            return _facet(movie_id, facet)
+        # append_to_response añade cada faceta bajo su propio nombre
+        details = {"id": movie_id, "title": f"Película {movie_id}", "vote_average": 7.0}
+        for extra in query.get("append_to_response", [""])[0].split(","):
+            if extra:
+                details[extra] = _facet(movie_id, extra)
+        return details
+    return None
+
+
+def start_fake_tmdb(latency=0.1, port=0):
+    """Arranca el servidor en un hilo; devuelve (server, base_url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.server.hits += 1
+            parsed = urlparse(self.path)
+            body = route(parsed.path, parse_qs(parsed.query))
+            time.sleep(latency)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.hits = 0  # peticiones recibidas (aproximado con varios hilos)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/3"
+
+
+class FakeImageUpstream:
+    """
+    Origen de imágenes falso para image_proxy (config IMAGE_UPSTREAM).
+
+    Genera un PNG de color sólido (derivado del nombre del archivo) con el
+    ancho correspondiente al tamaño pedido y proporción 16:9.
+    """
+
+    WIDTHS = {"w300": 300, "w500": 500, "w780": 780, "w1280": 1280, "original": 1920}
+
+    def __init__(self):
+        self.calls = 0
+
+    def fetch(self, size, filename):
+        self.calls += 1
+        width = self.WIDTHS.get(size, 500)
+        height = width * 9 // 16
+        digest = hashlib.md5(filename.encode("utf-8")).digest()
+        return _solid_png(width, height, digest[:3])
+
+
+def _solid_png(width, height, rgb):
+    def chunk(kind, payload):
+        body = kind + payload
+        return struct.pack(">I", len(payload)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(rgb) * width
+    raw = row * height
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
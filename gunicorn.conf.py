@@ -0,0 +1,29 @@
+# Configuración de gunicorn:  gunicorn -c gunicorn.conf.py
+import os
+
+wsgi_app = "movie_bot:create_app()"
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+# Workers gthread: cada petición ocupa un hilo de principio a fin, así que un
+# chat esperando a TMDB u OpenAI bloquea un hilo y no un proceso entero. Las
+# peticiones en vuelo son workers * threads; con GUNICORN_THREADS=1 se vuelve
+# al worker síncrono. Cada hilo puede tener una conexión a la base, así que
+# threads no debería superar el pool de SQLAlchemy (5 + 10 de overflow).
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# La app se crea una sola vez en el proceso maestro y los workers la heredan
+# por fork. create_app() no abre conexiones ni importa openai.
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Por si algo abrió una conexión antes del fork: cada worker usa su propio pool
+    from movie_bot.db import db
+    from movie_bot.jobs import iniciar_trabajos
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose()
+    # Los hilos de la cola de trabajos nacen en el worker, no en el maestro
+    iniciar_trabajos(app)
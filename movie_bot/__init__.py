@@ -1,2 +1 @@
-# movie_bot/__init__.py
-from .app import app
+from .app import create_app
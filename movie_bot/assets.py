@@ -0,0 +1,221 @@
+"""
+Archivos estáticos con huella (fingerprint), precomprimidos y caché inmutable.
+
+"flask assets" copia a ASSETS_DIR (por defecto instance/assets) los archivos
+de static/ y los de Bootstrap que usan las plantillas (del paquete
+Bootstrap-Flask), con el hash del contenido en el nombre:
+
+    images/bot_avatar.png -> static/images/bot_avatar.1f3a9c0b2e.png
+
+Las imágenes PNG más grandes que ASSETS_MAX_IMAGE_SIZE se reducen y se
+recomprimen; los archivos de texto (css, js, svg, ...) se guardan también en
+.gz y, si está instalado brotli, en .br. manifest.json relaciona cada archivo
+con su versión.
+
+Con el manifiesto presente, url_for('static', ...) y url_for('bootstrap.static', ...)
+en las plantillas devuelven la URL versionada (/assets/...), que se sirve con
+Cache-Control immutable y la codificación que acepte el navegador. Sin
+manifiesto todo sigue como antes: Flask sirve los originales.
+"""
+import io
+import os
+import gzip
+import json
+import hashlib
+import logging
+import mimetypes
+
+import click
+from flask import abort, current_app, request, send_from_directory, url_for
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow es opcional: sin él las imágenes se copian tal cual
+    Image = None
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se genera .gz
+    brotli = None
+
+ONE_YEAR = 60 * 60 * 24 * 365
+
+# Archivos de Bootstrap-Flask que enlaza base.html
+BOOTSTRAP_FILES = ("css/bootstrap.min.css", "umd/popper.min.js", "js/bootstrap.min.js")
+
+# Extensiones que vale la pena comprimir (las imágenes ya vienen comprimidas)
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".webmanifest", ".ico", ".txt", ".map"}
+# Precompresiones por orden de preferencia: (Content-Encoding, extensión)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+MIN_COMPRESS_BYTES = 512
+
+
+def _fuentes(app):
+    """(endpoint, carpeta, nombres relativos) de cada origen de archivos estáticos."""
+    static_files = []
+    for root, _, files in os.walk(app.static_folder):
+        for name in files:
+            static_files.append(os.path.relpath(os.path.join(root, name), app.static_folder).replace(os.sep, "/"))
+    yield "static", app.static_folder, sorted(static_files)
+
+    bootstrap = app.blueprints.get("bootstrap")
+    if bootstrap is not None and bootstrap.static_folder:
+        yield "bootstrap.static", bootstrap.static_folder, BOOTSTRAP_FILES
+
+
+def _optimizar_imagen(data, max_size):
+    """PNG reducido a ``max_size`` px por lado y recomprimido; el original si no mejora."""
+    if Image is None:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.format != "PNG" or getattr(img, "n_frames", 1) > 1:
+                return data
+            img.load()
+            if max(img.size) > max_size:
+                img.thumbnail((max_size, max_size), Image.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format="PNG", optimize=True)
+    except Exception as e:
+        logger.warning(f"[assets] No se pudo optimizar la imagen: {e}")
+        return data
+    optimized = out.getvalue()
+    return optimized if len(optimized) < len(data) else data
+
+
+def _comprimir(data):
+    """{Content-Encoding: bytes} con las versiones comprimidas que ahorran espacio."""
+    versions = {}
+    if brotli is not None:
+        versions["br"] = brotli.compress(data, quality=11)
+    versions["gzip"] = gzip.compress(data, compresslevel=9, mtime=0)
+    return {encoding: body for encoding, body in versions.items() if len(body) < len(data)}
+
+
+def build_assets(app, output_dir=None):
+    """
+    Escribe en ASSETS_DIR los archivos con huella y devuelve el manifiesto
+    {"endpoint:archivo": {"path": ..., "bytes": ..., "encodings": {...}}}.
+
+    Las versiones anteriores no se borran: los workers que siguen con el
+    manifiesto viejo (hasta reiniciarse) pueden seguir sirviéndolas.
+    """
+    output_dir = output_dir or app.config["ASSETS_DIR"]
+    max_size = app.config["ASSETS_MAX_IMAGE_SIZE"]
+
+    manifest = {}
+    for endpoint, folder, names in _fuentes(app):
+        prefix = endpoint.split(".")[0]
+        for name in names:
+            with open(os.path.join(folder, name), "rb") as fh:
+                data = fh.read()
+            stem, ext = os.path.splitext(name)
+            if ext.lower() == ".png":
+                data = _optimizar_imagen(data, max_size)
+
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            path = f"{prefix}/{stem}.{digest}{ext}"
+            entry = {"path": path, "bytes": len(data), "encodings": {}}
+            files = {path: data}
+            if ext.lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+                for encoding, body in _comprimir(data).items():
+                    suffix = dict(ENCODINGS)[encoding]
+                    files[path + suffix] = body
+                    entry["encodings"][encoding] = len(body)
+
+            for rel_path, body in files.items():
+                full_path = os.path.join(output_dir, rel_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, "wb") as fh:
+                    fh.write(body)
+            manifest[f"{endpoint}:{name}"] = entry
+
+    # El manifiesto se reemplaza de una vez para que nunca se lea a medias
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return manifest
+
+
+def load_manifest(app):
+    path = os.path.join(app.config["ASSETS_DIR"], "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url_for(endpoint, **values):
+    """url_for de las plantillas: la versión con huella si el archivo está en el manifiesto."""
+    filename = values.get("filename")
+    if filename is not None and endpoint in ("static", "bootstrap.static"):
+        entry = current_app.extensions["assets_manifest"].get(f"{endpoint}:{filename}")
+        if entry is not None:
+            values["filename"] = entry["path"]
+            return url_for("assets.asset", **values)
+    return url_for(endpoint, **values)
+
+
+def serve_asset(filename):
+    """
+    Sirve un archivo con huella, precomprimido según Accept-Encoding. El nombre
+    cambia cuando cambia el contenido, así que se puede cachear para siempre.
+    """
+    manifest_paths = current_app.extensions["assets_paths"]
+    entry = manifest_paths.get(filename)
+    if entry is None:
+        abort(404)
+
+    directory = current_app.config["ASSETS_DIR"]
+    encoding = None
+    for candidate, suffix in ENCODINGS:
+        if candidate in entry["encodings"] and candidate in request.accept_encodings:
+            encoding = candidate
+            break
+
+    # El mimetype sale del nombre original, no del .gz/.br
+    mimetype = None
+    if encoding is not None:
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_from_directory(
+        directory, filename + dict(ENCODINGS)[encoding] if encoding else filename,
+        mimetype=mimetype, conditional=True, max_age=ONE_YEAR,
+    )
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    if entry["encodings"]:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def assets_config(app):
+    app.config.setdefault("ASSETS_DIR", os.getenv("ASSETS_DIR", os.path.join(app.instance_path, "assets")))
+    app.config.setdefault("ASSETS_MAX_IMAGE_SIZE", int(os.getenv("ASSETS_MAX_IMAGE_SIZE", 512)))
+
+    manifest = load_manifest(app)
+    app.extensions["assets_manifest"] = manifest
+    app.extensions["assets_paths"] = {entry["path"]: entry for entry in manifest.values()}
+    app.jinja_env.globals["url_for"] = asset_url_for
+    if manifest:
+        logger.info(f"[assets] {len(manifest)} archivos estáticos con huella en {app.config['ASSETS_DIR']}")
+
+
+@click.command("assets")
+def assets_command():
+    """Genera los archivos estáticos con huella y precomprimidos (ASSETS_DIR)."""
+    app = current_app._get_current_object()
+    manifest = build_assets(app)
+    original = compressed = 0
+    for key, entry in manifest.items():
+        endpoint, name = key.split(":", 1)
+        folder = app.static_folder if endpoint == "static" else app.blueprints["bootstrap"].static_folder
+        original += os.path.getsize(os.path.join(folder, name))
+        compressed += min([entry["bytes"], *entry["encodings"].values()])
+    click.echo(f"{len(manifest)} archivos en {app.config['ASSETS_DIR']}: "
+               f"{original / 1024:.0f} KiB -> {compressed / 1024:.0f} KiB (con la mejor codificación)")
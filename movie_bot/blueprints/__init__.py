@@ -0,0 +1,2 @@
+# Blueprints de la aplicación, uno por funcionalidad.
+# Se registran en create_app() (movie_bot/app.py).
@@ -0,0 +1,14 @@
+from flask import Blueprint
+
+from ..assets import serve_asset
+
+bp = Blueprint("assets", __name__)
+
+
+@bp.route("/assets/<path:filename>")
+def asset(filename):
+    """
+    Archivos estáticos con huella generados con "flask assets".
+    Ej: /assets/static/images/bot_avatar.1f3a9c0b2e.png
+    """
+    return serve_asset(filename)
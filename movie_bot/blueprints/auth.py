@@ -0,0 +1,72 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required
+
+from ..db import db
+from ..models import User
+from ..passwords import PasswordHashBusy
+
+bp = Blueprint("auth", __name__)
+
+MSG_OCUPADO = "Hay muchos inicios de sesión en este momento. Inténtalo de nuevo en unos segundos."
+
+
+@bp.route("/signup", methods=["GET", "POST"])
+def signup():
+    if request.method == "POST":
+        email = request.form.get("email")
+        password = request.form.get("password")
+        user = User.query.filter_by(email=email).first()
+        # El hash tarda cientos de ms: mientras tanto la conexión vuelve al pool
+        db.session.close()
+
+        if user:
+            flash("El correo ya está registrado.", "danger")
+        else:
+            new_user = User(email=email)
+            try:
+                new_user.set_password(password)
+            except PasswordHashBusy:
+                flash(MSG_OCUPADO, "warning")
+                return render_template("signup.html", title="Registro"), 503
+            db.session.add(new_user)
+            db.session.commit()
+            flash("Registro exitoso. Por favor, inicia sesión.", "success")
+            return redirect(url_for("auth.login"))
+
+    return render_template("signup.html", title="Registro")
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        email = request.form.get("email")
+        password = request.form.get("password")
+        user = User.query.filter_by(email=email).first()
+        # El hash tarda cientos de ms: mientras tanto la conexión vuelve al pool
+        db.session.close()
+
+        try:
+            valid = user is not None and user.check_password(password)
+            # Hash con parámetros viejos: se recalcula ahora que tenemos la contraseña
+            if valid and user.password_needs_rehash():
+                user.set_password(password)
+                db.session.add(user)
+                db.session.commit()
+        except PasswordHashBusy:
+            flash(MSG_OCUPADO, "warning")
+            return render_template("login.html", title="Inicio de Sesión"), 503
+
+        if valid:
+            login_user(user)
+            flash("Inicio de sesión exitoso.", "success")
+            return redirect(url_for("chat.chat"))
+        else:
+            flash("Credenciales inválidas.", "danger")
+
+    return render_template("login.html", title="Inicio de Sesión")
+
+@bp.route("/logout")
+@login_required
+def logout():
+    logout_user()
+    flash("Cierre de sesión exitoso.", "success")
+    return redirect(url_for("auth.login"))
@@ -0,0 +1,132 @@
+import math
+import logging
+from collections import namedtuple
+
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for
+)
+from flask_login import login_required, current_user
+
+from ..cache import TTLCache
+from ..conversation import olvidar
+from ..db import db
+from ..models import ChatJob, Message, Recommendation
+from ..chatbot import clasificar_mensaje, responder, es_intencion_lenta
+from ..jobs import get_job_queue
+from ..rate_limit import limitar_chat
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("chat", __name__)
+
+MSG_LIMITE = "Estás enviando mensajes muy rápido. Espera unos segundos e inténtalo de nuevo."
+
+# Último historial mostrado a cada usuario, para responder a los mensajes
+# rechazados por el límite sin volver a consultar la base
+ChatLine = namedtuple("ChatLine", "id author content pending")
+_historiales = TTLCache(maxsize=1000, ttl=60)
+
+
+def _render_chat():
+    messages = Message.query.filter_by(user_id=current_user.id).order_by(Message.timestamp.asc()).all()
+    lines = [ChatLine(m.id, m.author, m.content, m.pending) for m in messages]
+    _historiales.set(current_user.id, lines)
+    return render_template("chat.html", messages=lines, title="Chat")
+
+
+def _respuesta_limitada(user_message):
+    """
+    Respuesta rápida si el mensaje supera el límite (ver rate_limit.py), sin
+    guardarlo ni procesarlo; None si se puede procesar. Un envío repetido
+    (debounce) ve el chat con el mensaje original; si se superó la ventana,
+    se avisa con el último historial mostrado.
+    """
+    decision = limitar_chat(current_user.id, user_message)
+    if decision is None:
+        return None
+    reason, retry_after = decision
+    headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+    if reason == "debounce":
+        return _render_chat(), 200, headers
+
+    flash(MSG_LIMITE, "warning")
+    lines = _historiales.get(current_user.id)
+    if lines is None:
+        return _render_chat(), 429, headers
+    return render_template("chat.html", messages=lines, title="Chat"), 429, headers
+
+
+def _guardar_mensaje(content, author, intent=None):
+    db.session.add(Message(content=content, author=author, user=current_user, intent=intent))
+    db.session.commit()
+
+
+@bp.route("/clear_chat", methods=["POST"])
+@login_required
+def clear_chat():
+    try:
+        ChatJob.query.filter_by(user_id=current_user.id).delete()
+        Message.query.filter_by(user_id=current_user.id).delete()
+        Recommendation.query.filter_by(user_id=current_user.id).delete()
+        db.session.commit()
+        olvidar(current_user.id)
+        _historiales.pop(current_user.id)
+        flash("El chat ha sido limpiado.", "success")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error al limpiar el chat: {e}")
+        flash("No se pudo limpiar el chat. Inténtalo nuevamente.", "danger")
+    return redirect(url_for("chat.chat"))
+
+@bp.route("/chat/messages/<int:message_id>")
+@login_required
+def message_status(message_id):
+    """Estado de un mensaje del bot; chat.html lo consulta mientras está pendiente."""
+    message = db.session.get(Message, message_id)
+    if message is None or message.user_id != current_user.id:
+        abort(404)
+    return jsonify({"id": message.id, "pending": message.pending, "content": message.content})
+
+@bp.route("/chat", methods=["GET", "POST"])
+@login_required
+def chat():
+    try:
+        if request.method == "POST":
+            user_message = request.form.get("message")
+
+            if not user_message or user_message.strip() == "":
+                flash("El mensaje no puede estar vacío.", "danger")
+                return _render_chat()
+
+            limitada = _respuesta_limitada(user_message)
+            if limitada is not None:
+                return limitada
+
+            # Guardamos el mensaje del usuario en la BD, con la intención detectada
+            intencion = clasificar_mensaje(user_message, current_user.id)
+            _guardar_mensaje(user_message, "user", intent=intencion[0])
+
+            if current_app.config["CHAT_JOBS"] and es_intencion_lenta(*intencion):
+                # GPT y recomendaciones por género: se responde ya con un mensaje
+                # pendiente que completa la cola de trabajos (chat.html lo consulta)
+                get_job_queue().enqueue(current_user, user_message)
+            else:
+                # La lógica de intenciones vive en chatbot.py
+                bot_reply = responder(current_user, user_message, intencion=intencion)
+
+                # Guardamos la respuesta del bot en la BD
+                _guardar_mensaje(bot_reply, "assistant")
+
+        return _render_chat()
+
+    except Exception as e:
+        logger.error(f"Error en /chat: {e}")
+        return "Ha ocurrido un error interno en el servidor.", 500
@@ -0,0 +1,14 @@
+from flask import Blueprint
+
+from ..image_proxy import serve_image
+
+bp = Blueprint("images", __name__)
+
+
+@bp.route("/img/<size>/<path:filename>")
+def tmdb_image(size, filename):
+    """
+    Proxy con caché en disco para los backdrops de TMDB.
+    Ej: /img/w500/abc123.jpg o /img/w500/abc123.jpg?w=400
+    """
+    return serve_image(size, filename)
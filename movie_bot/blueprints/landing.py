@@ -0,0 +1,88 @@
+import hashlib
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, render_template, make_response, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+from ..cache import TTLCache
+from ..tmdb_api import get_popular_movies, get_carousel_banners, TMDB_LIST_TTL
+
+bp = Blueprint("landing", __name__)
+
+# HTML ya renderizado del bloque de películas de la landing, por (región, idioma).
+# Usa el mismo TTL que la caché de listados de TMDB.
+landing_cache = TTLCache(maxsize=64, ttl=TMDB_LIST_TTL)
+
+
+@bp.route("/")
+def landing():
+    """
+    Página principal que muestra:
+    - Lista de películas populares (banners principales).
+    - Carrusel de banners con películas distintas para evitar duplicidades.
+
+    El bloque de películas solo depende de la región y el idioma, así que se
+    guarda ya renderizado durante TMDB_LIST_TTL. La respuesta lleva ETag y
+    Last-Modified para que los visitantes recurrentes reciban 304.
+    """
+    region = "US"
+    if current_user.is_authenticated and current_user.region:
+        region = current_user.region
+    language = "es"
+
+    fragment = render_landing_fragment(region, language)
+
+    # La página completa varía además por usuario; con mensajes flash pendientes
+    # no se puede responder 304 porque se perderían.
+    user_key = current_user.get_id() if current_user.is_authenticated else "anon"
+    etag = f"{fragment['etag']}-{user_key}"
+    conditional = not session.get("_flashes")
+    if conditional and not is_resource_modified(
+        request.environ, etag=etag, last_modified=fragment["rendered_at"]
+    ):
+        response = Response(status=304)
+    else:
+        response = make_response(render_template(
+            "landing.html",
+            title="Página de Inicio",
+            movies_html=fragment["html"]
+        ))
+
+    if conditional:
+        response.set_etag(etag)
+        response.last_modified = fragment["rendered_at"]
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add("Cookie")
+    return response
+
+def render_landing_fragment(region: str, language: str) -> dict:
+    """
+    Devuelve el HTML de películas populares + carrusel para (región, idioma),
+    desde la caché de fragmentos o renderizándolo si hace falta.
+    """
+    key = (region, language)
+    fragment = landing_cache.get(key)
+    if fragment is not None:
+        return fragment
+
+    # Obtenemos 6 películas populares (página 1)
+    popular_movies = get_popular_movies(limit=6, region=region, language=language, page=1)
+    # Obtenemos 5 películas diferentes para el carrusel (página 2)
+    carousel_banners = get_carousel_banners(limit=5, region=region, language=language, page=2)
+
+    html = render_template(
+        "_landing_movies.html",
+        popular_movies=popular_movies,
+        carousel_banners=carousel_banners
+    )
+    fragment = {
+        "html": html,
+        "etag": hashlib.md5(html.encode("utf-8")).hexdigest(),
+        "rendered_at": datetime.now(timezone.utc).replace(microsecond=0),
+    }
+    # Si TMDB falló no guardamos el fragmento vacío, para reintentar pronto
+    if popular_movies or carousel_banners:
+        landing_cache.set(key, fragment)
+    return fragment
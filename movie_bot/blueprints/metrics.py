@@ -0,0 +1,23 @@
+import hmac
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from ..metrics import metrics
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics")
+def metrics_json():
+    """
+    Contadores y tiempos de este proceso (cola de trabajos, cachés, etc.).
+    Solo con METRICS_TOKEN configurado y enviado como "Authorization: Bearer
+    <token>"; sin token configurado la ruta no existe (404).
+    """
+    token = current_app.config["METRICS_TOKEN"]
+    if not token:
+        abort(404)
+    scheme, _, sent = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(sent.encode(), token.encode()):
+        abort(401)
+    return jsonify(metrics.snapshot())
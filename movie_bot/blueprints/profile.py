@@ -0,0 +1,47 @@
+import logging
+
+from datetime import date
+
+from flask import Blueprint, Response, render_template, redirect, request, stream_with_context, url_for, flash
+from flask_login import login_required, current_user
+
+from ..db import db
+from ..export import exportar_historial
+from ..forms import ProfileForm
+
+logger = logging.getLogger(__name__)
+
+bp = Blueprint("profile", __name__)
+
+
+@bp.route("/perfil", methods=["GET", "POST"])
+@login_required
+def perfil():
+    try:
+        form = ProfileForm(obj=current_user)
+        if form.validate_on_submit():
+            current_user.favorite_genre = form.favorite_genre.data
+            current_user.disliked_genre = form.disliked_genre.data
+            current_user.region = form.region.data
+            db.session.commit()
+            flash("Perfil actualizado exitosamente.", "success")
+            return redirect(url_for('profile.perfil'))
+
+        return render_template("perfil.html", form=form, title="Editar Perfil")
+    except Exception as e:
+        logger.error(f"Error en /perfil: {e}")
+        return "Ha ocurrido un error interno en el servidor.", 500
+
+
+@bp.route("/export")
+@login_required
+def export():
+    """Descarga del historial de chat y recomendaciones en NDJSON (con ?gzip=1, comprimido)."""
+    comprimir = request.args.get("gzip", "0").lower() in ("1", "true")
+    filename = f"moviebot-historial-{date.today().isoformat()}.ndjson" + (".gz" if comprimir else "")
+    # stream_with_context mantiene la sesión de la BD mientras se envía la respuesta
+    return Response(
+        stream_with_context(exportar_historial(current_user.id, comprimir=comprimir)),
+        mimetype="application/gzip" if comprimir else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,151 @@
+"""
+Grabación y reproducción ("cassette") del tráfico con TMDB y OpenAI.
+
+Con MOVIEBOT_CASSETTE=record cada petición real a TMDB (tmdb_api.py)
+y cada llamada a OpenAI (openai_client.py) se guarda, junto con
+su respuesta y su latencia, en MOVIEBOT_CASSETTE_PATH. Con
+MOVIEBOT_CASSETTE=replay esas respuestas se sirven desde el archivo sin salir a
+la red, esperando la latencia original multiplicada por
+MOVIEBOT_CASSETTE_LATENCY (0 = sin espera). Así una conversación grabada se
+puede repetir en una máquina sin conexión para comparar cambios de chat().
+
+El archivo es NDJSON comprimido con gzip; cada entrada se añade como un
+miembro gzip independiente, así que varios workers pueden grabar en el mismo
+archivo y gzip.open() lo lee entero. Las claves no incluyen la api_key.
+"""
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+
+import requests
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay")
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """La petición no está grabada; en modo replay nunca se sale a la red."""
+
+
+class Cassette:
+    """
+    Pistas grabadas por (tipo, clave). En replay, una clave grabada varias
+    veces devuelve sus respuestas en orden y después repite la última.
+    """
+
+    def __init__(self, path, mode, latency_scale=1.0):
+        if mode not in MODES:
+            raise ValueError(f"Modo de cassette desconocido: {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._tracks = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                entry = json.loads(line)
+                self._tracks.setdefault((entry["kind"], entry["key"]), deque()).append(entry)
+                if entry.get("alt"):
+                    self._tracks.setdefault((entry["kind"], entry["alt"]), deque()).append(entry)
+        logger.info(f"[cassette] {len(self._tracks)} pistas cargadas de {self.path}")
+
+    def record(self, kind, key, status, body, latency, alt=None):
+        """Añade una respuesta al archivo. ``alt`` es una clave alternativa para replay."""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        entry = {"kind": kind, "key": key, "status": status, "body": body, "latency": round(latency, 4)}
+        if alt:
+            entry["alt"] = alt
+        data = gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        with self._lock, open(self.path, "ab") as fh:
+            fh.write(data)
+        metrics.incr("cassette.recorded")
+
+    def play(self, kind, key, alt=None):
+        """(status, body, espera) grabados para la clave; lanza CassetteMiss si no hay."""
+        with self._lock:
+            track = self._tracks.get((kind, key)) or (alt and self._tracks.get((kind, alt)))
+            if not track:
+                metrics.incr("cassette.misses")
+                raise CassetteMiss(f"{kind} sin grabar: {key}")
+            entry = track.popleft() if len(track) > 1 else track[0]
+        metrics.incr("cassette.replayed")
+        return entry["status"], entry["body"], entry["latency"] * self.latency_scale
+
+    def replay(self, kind, key, alt=None):
+        status, body, delay = self.play(kind, key, alt)
+        if delay > 0:
+            time.sleep(delay)
+        return status, body
+
+
+def openai_keys(model, messages):
+    """
+    Clave exacta de una llamada a OpenAI (modelo y mensajes completos) y clave
+    alternativa con solo el mensaje del usuario, por si el prompt del sistema
+    cambió (p. ej. otra lista de películas ya recomendadas).
+    """
+    exact = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    alt = json.dumps({"model": model, "user": messages[-1]["content"]}, ensure_ascii=False)
+    return (
+        hashlib.sha1(exact.encode("utf-8")).hexdigest(),
+        hashlib.sha1(alt.encode("utf-8")).hexdigest(),
+    )
+
+
+_active = None
+
+
+def active():
+    """Cassette activo en el proceso, o None fuera de los modos record/replay."""
+    return _active
+
+
+def set_cassette(cassette):
+    global _active
+    _active = cassette
+
+
+def cassette_config(app):
+    app.config.setdefault("CASSETTE_MODE", os.getenv("MOVIEBOT_CASSETTE", "").lower())
+    app.config.setdefault(
+        "CASSETTE_PATH", os.getenv("MOVIEBOT_CASSETTE_PATH", os.path.join(app.instance_path, "cassette.ndjson.gz"))
+    )
+    app.config.setdefault("CASSETTE_LATENCY", float(os.getenv("MOVIEBOT_CASSETTE_LATENCY", 1.0)))
+
+    mode = app.config["CASSETTE_MODE"]
+    if not mode:
+        set_cassette(None)
+        return
+
+    from .tmdb_api import set_disk_cache
+
+    path = app.config["CASSETTE_PATH"]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    cassette = Cassette(path, mode, latency_scale=app.config["CASSETTE_LATENCY"])
+    app.extensions["cassette"] = cassette
+    set_cassette(cassette)
+    # Sin caché en disco: todas las peticiones a TMDB pasan por el cassette y
+    # la grabación no depende de lo que hubiera en caché
+    set_disk_cache(None)
+    logger.info(f"[cassette] Modo {mode} con {path}")
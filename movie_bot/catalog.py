@@ -0,0 +1,164 @@
+"""
+Catálogo local de películas a partir de los exports diarios de ids de TMDB.
+
+TMDB publica cada día un archivo movie_ids_MM_DD_YYYY.json.gz con una línea
+JSON por película ({"id", "original_title", "popularity", "adult", "video"}).
+"flask catalog" lo lee del disco línea a línea (sin cargarlo en memoria) y lo
+vuelca en catalog_movies por lotes, cada uno en su transacción, con el título
+normalizado como limpiar_texto en title_key:
+
+    flask --app movie_bot catalog movie_ids_10_19_2026.json.gz
+    flask --app movie_bot catalog movie_ids_10_19_2026.json.gz --restart
+
+Cada lote guarda también en catalog_ingest_state hasta qué línea se llegó,
+así que si la carga se interrumpe, volver a ejecutar el comando sigue desde
+el último lote confirmado. Un archivo ya cargado completo no se vuelve a
+procesar salvo con --restart.
+"""
+import os
+import gzip
+import json
+import time
+import logging
+from datetime import datetime
+
+import click
+
+from .db import db
+from .models import CatalogIngestState, CatalogMovie
+from .text_utils import limpiar_texto
+
+logger = logging.getLogger(__name__)
+
+# Filas por transacción
+BATCH_SIZE = 10000
+# Largo máximo de los títulos (columna String(500))
+MAX_TITLE = 500
+# Cada cuántos segundos se informa el avance
+REPORT_EVERY = 5
+
+
+def _insert(table):
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def leer_export(path, skip=0):
+    """
+    Generador de (número de línea, fila) de un export de TMDB (.json.gz o
+    .json), desde la línea ``skip``. Las líneas vacías o mal formadas se
+    registran y se saltan.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh):
+            if line_no < skip or not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                title = str(item.get("original_title") or "")[:MAX_TITLE]
+                row = {
+                    "movie_id": int(item["id"]),
+                    "original_title": title,
+                    "title_key": limpiar_texto(title)[:MAX_TITLE],
+                    "popularity": float(item.get("popularity") or 0.0),
+                    "adult": bool(item.get("adult", False)),
+                    "video": bool(item.get("video", False)),
+                }
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # Un campo con un valor raro invalida la línea, no la carga
+                logger.warning(f"[catalog] Línea {line_no + 1} inválida: {e}")
+                continue
+            yield line_no, row
+
+
+def _upsert(rows):
+    stmt = _insert(CatalogMovie.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["movie_id"],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("original_title", "title_key", "popularity", "adult", "video")
+        },
+    )
+    db.session.execute(stmt, rows)
+
+
+def cargar_catalogo(path, batch_size=BATCH_SIZE, restart=False, progress=None):
+    """
+    Carga (o sigue cargando) el export ``path`` en catalog_movies. Devuelve
+    (filas escritas en esta ejecución, estado). ``progress(filas, segundos)``
+    se llama tras cada lote. Las filas escritas no son películas distintas:
+    un id que se repite en lotes diferentes se escribe (y cuenta) cada vez.
+    """
+    source = os.path.basename(path)
+    file_size = os.path.getsize(path)
+    state = db.session.get(CatalogIngestState, source)
+    if state is None:
+        state = CatalogIngestState(source=source, file_size=file_size, lines_done=0, upserts=0, finished=False)
+        db.session.add(state)
+    elif restart or state.file_size != file_size:
+        # Otro archivo con el mismo nombre, o se pidió empezar de cero
+        state.file_size = file_size
+        state.lines_done = state.upserts = 0
+        state.finished = False
+    elif state.finished:
+        return 0, state
+    db.session.commit()
+
+    start = time.perf_counter()
+    loaded = 0
+    batch = {}
+    last_line = state.lines_done - 1
+
+    def confirmar():
+        nonlocal loaded
+        if batch:
+            # Un id repetido dentro del lote se queda con la última línea
+            _upsert(list(batch.values()))
+        state.lines_done = last_line + 1
+        state.upserts += len(batch)
+        state.updated_at = datetime.utcnow()
+        db.session.commit()
+        loaded += len(batch)
+        batch.clear()
+        if progress is not None:
+            progress(loaded, time.perf_counter() - start)
+
+    for last_line, row in leer_export(path, skip=state.lines_done):
+        batch[row["movie_id"]] = row
+        if len(batch) >= batch_size:
+            confirmar()
+
+    state.finished = True
+    confirmar()
+    return loaded, state
+
+
+@click.command("catalog")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=BATCH_SIZE, show_default=True, help="Filas por transacción.")
+@click.option("--restart", is_flag=True, help="Ignorar el punto de reanudación y cargar todo el archivo.")
+def catalog_command(path, batch_size, restart):
+    """Carga un export diario de ids de películas de TMDB en catalog_movies."""
+    last_report = [0.0]
+
+    def progress(rows, seconds):
+        if seconds - last_report[0] >= REPORT_EVERY:
+            last_report[0] = seconds
+            click.echo(f"  {rows} filas, {rows / seconds:,.0f} filas/s")
+
+    start = time.perf_counter()
+    loaded, state = cargar_catalogo(path, batch_size=batch_size, restart=restart, progress=progress)
+    elapsed = time.perf_counter() - start
+    movies = db.session.query(CatalogMovie).count()
+    if not loaded and state.finished and not restart:
+        click.echo(f"{state.source} ya estaba cargado ({movies} películas en el catálogo); usa --restart para repetirlo.")
+        return
+    click.echo(
+        f"{loaded} filas escritas en {elapsed:.1f} s ({loaded / max(elapsed, 1e-9):,.0f} filas/s); "
+        f"{state.source}: {state.lines_done} líneas; {movies} películas en el catálogo"
+    )
@@ -0,0 +1,613 @@
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+
+from .coindex import vecinos, vecinos_por_titulo
+from .conversation import contexto, es_referencia, recordar, resolver_referencia
+from .db import db
+from .models import Recommendation
+from .query_counter import anotar
+from .records import Movie
+from .text_utils import limpiar_texto, GENRE_MAP
+from .tmdb_api import (
+    get_streaming_platforms,
+    get_movie_rating,
+    get_similar_movies,
+    get_movie_trailer,
+    get_now_playing_movies,
+    discover_movies_by_genre
+)
+
+logger = logging.getLogger(__name__)
+
+# "donde puedo ver A, B y C": máximo de títulos por mensaje y plazo total (s)
+# para resolverlos todos en paralelo
+MAX_TITULOS = 5
+DONDE_VER_DEADLINE = 8
+_lookup_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tmdb-lookup")
+
+# "parecida a X": plazo para /similar de TMDB (s) antes de responder solo con
+# el índice local de co-recomendaciones, y cuántos vecinos locales se mezclan
+SIMILARES_DEADLINE = 3
+MAX_VECINOS_LOCALES = 3
+
+RATING_PHRASES = [
+    "que evaluacion tiene",
+    "que puntuacion tiene",
+    "que rating tiene"
+]
+
+# Preguntas de seguimiento sin título ("y el trailer", "donde la puedo ver",
+# "que nota tiene la segunda"): solo cuentan si "ref" apunta al contexto de
+# la conversación (ver conversation.py), o si está vacío y el usuario tiene
+# una película en contexto
+SEGUIMIENTOS = [
+    (re.compile(r"\bdonde (?:(?:la|lo) )?(?:puedo |se puede )?(?:ver|veo)(?:la|lo)?(?P<ref>\s.*)?$"), "donde_ver"),
+    (re.compile(r"\btrailer(?: de)?(?P<ref>\s.*)?$"), "trailer"),
+    (re.compile(r"\b(?:rating|puntuacion|evaluacion|nota)(?: tiene| de)?(?P<ref>\s.*)?$"), "rating"),
+    (re.compile(r"\b(?:parecidas?|similares?)(?: a)?(?P<ref>\s.*)?$"), "similares"),
+]
+# Intenciones sobre una sola película, que pueden resolverse con el contexto
+INTENCIONES_DE_PELICULA = {"donde_ver", "rating", "similares", "trailer"}
+
+
+def obtener_ids_recomendados(user_id: int) -> set:
+    recomendaciones = Recommendation.query.filter_by(user_id=user_id).all()
+    return set([r.movie_id for r in recomendaciones])
+
+
+def obtener_generos_recomendados(user_id: int) -> list:
+    """Géneros (tuplas de ids de TMDB) de cada película ya recomendada."""
+    filas = db.session.scalars(
+        db.select(Recommendation.genre_ids)
+        .where(Recommendation.user_id == user_id, Recommendation.genre_ids.isnot(None))
+    )
+    return [tuple(int(g) for g in fila.split(",")) for fila in filas]
+
+
+def _recomendacion(user, movie, title=None):
+    """Fila de Recommendation para una película, con sus géneros si se conocen."""
+    return Recommendation(
+        user_id=user.id,
+        movie_id=movie.id,
+        movie_title=title or movie.title,
+        genre_ids=",".join(str(g) for g in movie.genre_ids[:10]) or None,
+    )
+
+
+def _texto_despues_de(texto: str, frase: str) -> str:
+    idx = texto.find(frase)
+    return texto[idx + len(frase):].strip()
+
+
+def detectar_intencion(user_msg_clean: str, usar_modelo: bool = True, con_contexto: bool = False):
+    """
+    Devuelve (intención, argumento) a partir del mensaje ya limpio.
+    El argumento suele ser el título o el resto del mensaje tras la frase clave.
+    El mensaje conserva las comas, que solo se usan para separar varios títulos
+    en "donde puedo ver A, B y C".
+
+    Sin ``usar_modelo`` solo se aplican las frases fijas (así se etiquetan
+    los mensajes para entrenar el clasificador de intent_model.py).
+    ``con_contexto`` indica que hay una película de la que se venía hablando.
+    """
+    # 1. "donde puedo ver" + título(s)
+    # Regex para capturar "donde puedo ver" o "donde veo" con o sin "la pelicula"
+    pattern_where = re.search(r"donde (?:puedo ver|veo)(?: la pelicula)?\s+(.*)", user_msg_clean)
+    if pattern_where:
+        return "donde_ver", pattern_where.group(1).strip()
+
+    user_msg_clean = user_msg_clean.replace(",", "")
+
+    # 2. "que evaluacion/puntuacion/rating tiene x"
+    for phrase in RATING_PHRASES:
+        if phrase in user_msg_clean:
+            return "rating", _texto_despues_de(user_msg_clean, phrase)
+
+    # 3. "parecida a x"
+    if "parecida a" in user_msg_clean:
+        return "similares", _texto_despues_de(user_msg_clean, "parecida a")
+
+    # 4. "muestras el trailer de x"
+    if "muestras el trailer de" in user_msg_clean:
+        return "trailer", _texto_despues_de(user_msg_clean, "muestras el trailer de")
+
+    # 5. "me recomiendas x" / "recomiendame x"
+    if "me recomiendas" in user_msg_clean:
+        return "recomendar", _texto_despues_de(user_msg_clean, "me recomiendas")
+    if "recomiendame" in user_msg_clean:
+        return "recomendar", _texto_despues_de(user_msg_clean, "recomiendame")
+
+    # 6. "peliculas mas recientes" / "estrenos"
+    if ("peliculas mas recientes" in user_msg_clean) or ("estrenos" in user_msg_clean):
+        return "estrenos", ""
+
+    # 7. Seguimientos sobre la película de la que se venía hablando
+    for pattern, intent in SEGUIMIENTOS:
+        match = pattern.search(user_msg_clean)
+        if match is None:
+            continue
+        ref = (match.group("ref") or "").strip()
+        # Sin "ref" ("dame una nota", "me gusta ver el trailer") solo es un
+        # seguimiento si hay película en contexto; si no, sigue al modelo o a GPT
+        if es_referencia(ref) and (ref or con_contexto):
+            return intent, ref
+
+    # 8. Clasificador local para las frases que no coinciden con las anteriores
+    if usar_modelo:
+        from .intent_model import clasificar
+        predicho = clasificar(user_msg_clean)
+        if predicho is not None:
+            return predicho
+
+    # 9. Caso genérico -> GPT
+    return "gpt", ""
+
+
+def clasificar_mensaje(user_message: str, user_id=None):
+    """
+    (intención, argumento) de un mensaje tal como lo escribió el usuario.
+    Con ``user_id`` se consulta su contexto para las preguntas de seguimiento.
+    """
+    user_msg_clean = limpiar_texto(user_message, conservar=",")
+    logger.info("[CHAT] Original: %s | Limpio: %s", user_message, user_msg_clean)
+    ctx = contexto(user_id) if user_id is not None else None
+    intent, arg = detectar_intencion(user_msg_clean, con_contexto=ctx is not None and ctx.movie is not None)
+    anotar("intent", intent)
+    return intent, arg
+
+
+def responder(user, user_message: str, reintentar: bool = False, intencion=None) -> str:
+    """
+    Procesa un mensaje del usuario y devuelve la respuesta del bot.
+    Las recomendaciones mostradas se guardan en la BD.
+
+    Con ``reintentar`` los errores transitorios de OpenAI se relanzan en vez de
+    convertirse en respuesta, para que la cola de trabajos pueda reintentar.
+    ``intencion`` es el resultado de clasificar_mensaje() si ya se calculó.
+    """
+    ids_recomendados = obtener_ids_recomendados(user.id)
+    intent, arg = intencion or clasificar_mensaje(user_message, user.id)
+
+    if intent == "gpt":
+        return responder_gpt(user, user_message, ids_recomendados, reintentar=reintentar)
+    return _manejar(user, intent, arg, ids_recomendados)
+
+
+def _manejar(user, intent, arg, ids_recomendados):
+    """
+    Ejecuta el manejador de la intención. Si el argumento no es un título sino
+    una referencia ("", "la", "esa película", "la segunda"), la película sale
+    del contexto de la conversación y no se busca en TMDB.
+    """
+    if intent in INTENCIONES_DE_PELICULA and es_referencia(arg):
+        movie = resolver_referencia(user.id, arg)
+        if movie is None:
+            return "¿De qué película me hablas? Dime el título."
+        return INTENT_HANDLERS[intent](user, movie.title, ids_recomendados, movie=movie)
+    return INTENT_HANDLERS[intent](user, arg, ids_recomendados)
+
+
+def es_intencion_lenta(intent, arg) -> bool:
+    """
+    True para las intenciones que pueden tardar varios segundos (GPT y
+    recomendaciones por género con varias páginas); se resuelven en la cola
+    de trabajos en segundo plano.
+    """
+    if intent == "gpt":
+        return True
+    return intent == "recomendar" and any(genre_word in arg for genre_word in GENRE_MAP)
+
+
+# ----------------------------------------------------------
+# Manejadores de intenciones
+# ----------------------------------------------------------
+def separar_titulos(texto: str) -> list:
+    """
+    Separa "a, b y c" en ["a", "b", "c"]. La "y"/"e" solo separa el último
+    elemento de una lista con comas, porque sin comas puede ser parte del
+    título ("harry potter y la piedra filosofal").
+    """
+    partes = [p.strip() for p in texto.split(",") if p.strip()]
+    if len(partes) > 1:
+        ultimas = re.split(r"\s+(?:y|e)\s+", partes[-1])
+        partes = partes[:-1] + [p.strip() for p in ultimas if p.strip()]
+    # Sin repetidos y respetando el orden
+    return list(dict.fromkeys(partes))[:MAX_TITULOS]
+
+
+def buscar_plataformas(titulos, region):
+    """
+    Consulta las plataformas de varios títulos en paralelo (cada uno con su
+    búsqueda y su watch/providers) con un único plazo total. Los títulos que no
+    respondieron a tiempo quedan con None.
+    """
+    futures = {
+        _lookup_pool.submit(get_streaming_platforms, titulo, region=region): titulo
+        for titulo in titulos
+    }
+    done, not_done = wait(futures, timeout=DONDE_VER_DEADLINE)
+    for future in not_done:
+        future.cancel()
+
+    resultados = {titulo: None for titulo in titulos}
+    for future in done:
+        try:
+            resultados[futures[future]] = future.result()
+        except Exception as e:
+            logger.error(f"[buscar_plataformas] Error con '{futures[future]}': {e}")
+            resultados[futures[future]] = {"error": "Error al conectar con TMDB."}
+    return resultados
+
+
+def responder_donde_ver(user, texto_titulos, ids_recomendados, movie=None):
+    user_region = user.region or "US"  # región del usuario o US por defecto
+    titulos = [texto_titulos] if movie is not None else separar_titulos(texto_titulos)
+
+    if len(titulos) <= 1:
+        movie_name = titulos[0] if titulos else texto_titulos
+        result = get_streaming_platforms(movie_name, region=user_region, movie=movie)
+        if "error" in result:
+            return result["error"]
+        recordar(user.id, "donde_ver", movie=result["match"])
+        if "message" in result:
+            return result["message"]
+        platforms = [p.name for p in result["platforms"]]
+        return (
+            f"La película '{movie_name}' está disponible (en {user_region}) en: "
+            f"{', '.join(platforms)}."
+        )
+
+    # Varios títulos: una sola tabla con todos los resultados
+    lines = [f"Dónde ver en {user_region}:", "Película | Plataformas"]
+    encontradas = []
+    for titulo, result in buscar_plataformas(titulos, user_region).items():
+        if result is not None and "match" in result:
+            encontradas.append(result["match"])
+        if result is None:
+            celda = "Sin respuesta a tiempo"
+        elif "error" in result:
+            celda = result["error"]
+        elif "message" in result:
+            celda = f"Sin streaming en {user_region}"
+        else:
+            celda = ", ".join(p.name for p in result["platforms"])
+        lines.append(f"{titulo} | {celda}")
+    recordar(user.id, "donde_ver", results=encontradas)
+    return "\n".join(lines)
+
+
+def responder_rating(user, movie_name, ids_recomendados, movie=None):
+    result = get_movie_rating(movie_name, movie=movie)
+    if "error" in result:
+        return result["error"]
+    recordar(user.id, "rating", movie=result["match"])
+    return (
+        f"La película '{movie_name}' tiene una puntuación promedio de "
+        f"{result['rating']}."
+    )
+
+
+def _similares_combinadas(locales, de_tmdb, ids_recomendados):
+    """Primero los vecinos locales no recomendados, después TMDB, sin repetir."""
+    combinadas = [m for m in locales if m.id not in ids_recomendados][:MAX_VECINOS_LOCALES]
+    vistos = {m.id for m in combinadas}
+    combinadas.extend(m for m in de_tmdb if m.id not in vistos)
+    return combinadas
+
+
+def responder_similares(user, movie_name, ids_recomendados, movie=None):
+    future = _lookup_pool.submit(get_similar_movies, movie_name, language="es", movie=movie)
+    try:
+        result = future.result(timeout=SIMILARES_DEADLINE)
+    except TimeoutError:
+        logger.warning(f"[responder_similares] TMDB no respondió a tiempo para '{movie_name}'")
+        result = {"error": "TMDB está tardando demasiado en responder. Intenta más tarde."}
+    except Exception as e:
+        logger.error(f"[responder_similares] Error con '{movie_name}': {e}")
+        result = {"error": "Error al conectar con TMDB."}
+
+    # Vecinos del índice local: por id si TMDB encontró la película, si no por título
+    if "movie_id" in result:
+        locales = vecinos(result["movie_id"])
+    else:
+        locales = vecinos_por_titulo(movie_name)
+
+    if not locales:
+        if "error" in result:
+            return result["error"]
+        if "message" in result:
+            return result["message"]
+
+    similares = [
+        m for m in _similares_combinadas(locales, result.get("recommendations", []), ids_recomendados)
+        if m.id not in ids_recomendados
+    ]
+    recommendations = [
+        f"{m.title} (estrenada el {m.release_date})" if m.release_date else m.title
+        for m in similares
+    ]
+    recordar(user.id, "similares", movie=result.get("match"), results=similares)
+    if not recommendations:
+        return f"No hay más similares a '{movie_name}' que no te haya recomendado."
+
+    # Guardar en Recommendation los primeros 5
+    for rec_m in similares[:5]:
+        db.session.add(_recomendacion(user, rec_m))
+    db.session.commit()
+    return f"Películas similares a '{movie_name}':\n" + "\n".join(recommendations)
+
+
+def responder_trailer(user, movie_name, ids_recomendados, movie=None):
+    trailer_data = get_movie_trailer(movie_name, movie=movie)
+    if "error" in trailer_data:
+        return trailer_data["error"]
+    recordar(user.id, "trailer", movie=trailer_data["match"])
+    if "message" in trailer_data:
+        return trailer_data["message"]
+    return f"Aquí está el tráiler de '{movie_name}': {trailer_data['trailer_url']}"
+
+
+def responder_recomendar(user, tail, ids_recomendados):
+    found_genre_word = None
+    found_genre_id = None
+    for genre_word, genre_id in GENRE_MAP.items():
+        if genre_word in tail:
+            found_genre_word = genre_word
+            found_genre_id = genre_id
+            break
+
+    if found_genre_id:
+        return recomendar_por_genero(user, found_genre_word, found_genre_id, ids_recomendados)
+
+    if "reciente" in tail:
+        return recomendar_recientes(user, ids_recomendados, "Ya te recomendé todas las recientes.")
+
+    # Sin género específico -> ranking local según el perfil del usuario
+    if not tail or "pelicula" in tail or "algo" in tail:
+        return recomendar_personalizado(user, ids_recomendados)
+
+    # Título directo
+    result = get_movie_rating(tail)
+    if "error" in result:
+        return result["error"]
+    recordar(user.id, "recomendar", movie=result["match"])
+    rating = result["rating"]
+    return (
+        f"Para la película '{tail}', la puntuación promedio en TMDB es {rating}. "
+        "¿Te gustaría saber algo más?"
+    )
+
+
+def responder_estrenos(user, arg, ids_recomendados):
+    return recomendar_recientes(user, ids_recomendados, "Todas las recientes ya te las recomendé.")
+
+
+# Lógica de múltiples páginas para no quedarnos sin recomendaciones
+MAX_GENRE_PAGES = 5
+
+
+def recomendar_por_genero(user, genre_word, genre_id, ids_recomendados):
+    user_region = user.region or "US"
+    all_new_movies = []
+    current_page = 1
+    while current_page <= MAX_GENRE_PAGES:
+        result = discover_movies_by_genre(
+            genre_id=genre_id,
+            limit=20,
+            region=user_region,
+            language="es",
+            page=current_page
+        )
+
+        if "error" in result:
+            # Nos quedamos con lo que se haya juntado en páginas anteriores
+            break
+
+        all_new_movies.extend(_nuevas_de_pagina(result, ids_recomendados))
+        if len(all_new_movies) >= 5:
+            break
+
+        current_page += 1
+
+    return _responder_genero(user, genre_word, all_new_movies)
+
+
+def _nuevas_de_pagina(result, ids_recomendados):
+    """Películas de una página de discover que todavía no se le recomendaron al usuario."""
+    # Con "message" no se encontraron películas en esa página
+    movie_list = result.get("movies", [])
+    return [
+        m for m in movie_list
+        if m.id not in ids_recomendados
+    ]
+
+
+def _responder_genero(user, genre_word, all_new_movies):
+    final_recommendations = all_new_movies[:5]
+    if not final_recommendations:
+        return f"Todas las de {genre_word} ya te las recomendé (o no hay más resultados)."
+    recordar(user.id, "recomendar", results=final_recommendations)
+
+    lines = [
+        f"{m.title} (Estreno: {m.release_date})"
+        for m in final_recommendations
+    ]
+    for mov in final_recommendations:
+        db.session.add(_recomendacion(user, mov))
+    db.session.commit()
+    return (
+        f"Películas de {genre_word} que podrían gustarte:\n"
+        + "\n".join(lines)
+    )
+
+
+def recomendar_recientes(user, ids_recomendados, msg_todas_recomendadas):
+    user_region = user.region or "US"
+    result = get_now_playing_movies(limit=5, region=user_region, language="es")
+    if "error" in result:
+        return result["error"]
+    if "message" in result:
+        return result["message"]
+
+    movie_list = result.get("movies", [])
+    if not movie_list:
+        return "No encontré películas recientes en este momento."
+
+    nuevas = [m for m in movie_list if m.id not in ids_recomendados]
+    lines = [f"{m.title} (Estreno: {m.release_date})" for m in nuevas]
+    if not lines:
+        return msg_todas_recomendadas
+
+    for mov in nuevas:
+        db.session.add(_recomendacion(user, mov))
+    db.session.commit()
+    recordar(user.id, "estrenos", results=nuevas)
+    return (
+        "Aquí tienes algunas películas recientes en cartelera:\n"
+        + "\n".join(lines)
+    )
+
+
+def recomendar_personalizado(user, ids_recomendados):
+    """
+    Recomienda con el ranking local (ranking.py) sobre los listados de TMDB en
+    caché. Si no hay candidatas disponibles, recurre a las recientes.
+    """
+    reply = _recomendacion_local(user, ids_recomendados, "Estas películas podrían gustarte según tus gustos:")
+    if reply is None:
+        return recomendar_recientes(user, ids_recomendados, "Ya te recomendé todas las recientes.")
+    return reply
+
+
+def responder_sin_gpt(user, ids_recomendados):
+    """
+    Respuesta inmediata cuando el control de admisión de OpenAI rechaza la
+    consulta: recomendaciones locales solo con los listados ya en memoria.
+    """
+    reply = _recomendacion_local(
+        user, ids_recomendados,
+        "Ahora mismo tengo muchas consultas. Mientras tanto, te recomiendo:",
+        cached_only=True
+    )
+    if reply is None:
+        return "Ahora mismo tengo muchas consultas. Inténtalo de nuevo en unos segundos."
+    return reply
+
+
+def _recomendacion_local(user, ids_recomendados, encabezado, cached_only=False):
+    """Top 5 del ranking local según el perfil del usuario; None si no hay candidatas."""
+    # numpy se importa aquí para no cargarlo al arrancar los workers
+    from .ranking import candidatas, genero_a_id, pesos_de_genero, pesos_de_historial, rank
+
+    favorite_id = genero_a_id(user.favorite_genre)
+    disliked_id = genero_a_id(user.disliked_genre)
+    genre_ids = [favorite_id] if favorite_id else []
+    candidates = candidatas(user.region or "US", genre_ids, cached_only=cached_only)
+    if not len(candidates):
+        return None
+
+    weights = pesos_de_genero(favorite_id, disliked_id)
+    if ids_recomendados:
+        weights = weights + pesos_de_historial(obtener_generos_recomendados(user.id))
+    top = rank(candidates, weights, ids_recomendados, k=5)
+    if not len(top):
+        return "Ya te recomendé todo lo que tengo para ti por ahora. ¡Prueba con un género!"
+
+    lines = []
+    mostradas = []
+    for i in top:
+        movie = Movie(int(candidates.ids[i]), candidates.titles[i], candidates.release_dates[i],
+                      vote_average=float(candidates.vote[i]), genre_ids=candidates.genre_ids(i))
+        lines.append(f"{movie.title} (Estreno: {movie.release_date})")
+        mostradas.append(movie)
+        db.session.add(_recomendacion(user, movie))
+    db.session.commit()
+    recordar(user.id, "recomendar", results=mostradas)
+    return f"{encabezado}\n" + "\n".join(lines)
+
+
+def _mensajes_gpt(user, user_message):
+    user_region = user.region or "US"
+    recomendaciones_previas = Recommendation.query.filter_by(user_id=user.id).all()
+    no_repetir = ", ".join([r.movie_title for r in recomendaciones_previas]) or "ninguna"
+
+    system_prompt = f"""
+    Eres un bot recomendador de películas llamado MovieBot.
+    Género favorito del usuario: {user.favorite_genre or 'No especificado'}.
+    Género que debe evitar: {user.disliked_genre or 'No especificado'}.
+    Región del usuario: {user_region}.
+    No recomiendes las siguientes películas otra vez: {no_repetir}.
+    Responde de forma breve y clara.
+    """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def _titulo_gpt(bot_reply):
+    # Intentar extraer título (heurística con comillas)
+    patron_titulo = re.compile(r'"([^"]+)"')
+    match = patron_titulo.search(bot_reply)
+    return match.group(1) if match else None
+
+
+def _guardar_titulo_gpt(user, titulo_gpt, rating_result, ids_recomendados):
+    if "movie_id" in rating_result:
+        recordar(user.id, "gpt", movie=rating_result["match"])
+        if rating_result["movie_id"] not in ids_recomendados:
+            db.session.add(_recomendacion(user, rating_result["match"], title=titulo_gpt))
+            db.session.commit()
+
+
+def _respuesta_error_gpt(e):
+    """Traduce una excepción de la llamada a OpenAI al mensaje para el usuario."""
+    # openai se importa aquí para no cargarlo al arrancar los workers
+    from openai.error import AuthenticationError, RateLimitError, OpenAIError
+
+    if isinstance(e, AuthenticationError):
+        logger.error("Error de autenticación con OpenAI.")
+        return "Error de autenticación con OpenAI. Verifica tu clave API."
+    if isinstance(e, RateLimitError):
+        logger.error("Límite de solicitudes excedido a OpenAI.")
+        return "Has excedido el límite de solicitudes a OpenAI. Intenta más tarde."
+    if isinstance(e, OpenAIError):
+        logger.error(f"Error general de OpenAI: {e}")
+        return f"Error general de OpenAI: {e}"
+    logger.error(f"Error inesperado: {e}")
+    return f"Error inesperado: {e}"
+
+
+def _es_error_transitorio(e):
+    from openai.error import RateLimitError, APIConnectionError, Timeout, ServiceUnavailableError, TryAgain
+
+    return isinstance(e, (RateLimitError, APIConnectionError, Timeout, ServiceUnavailableError, TryAgain))
+
+
+def responder_gpt(user, user_message, ids_recomendados, reintentar=False):
+    from .openai_client import OpenAISaturated, chat_completion
+
+    try:
+        bot_reply = chat_completion(_mensajes_gpt(user, user_message))
+        titulo_gpt = _titulo_gpt(bot_reply)
+        if titulo_gpt:
+            _guardar_titulo_gpt(user, titulo_gpt, get_movie_rating(titulo_gpt), ids_recomendados)
+    except OpenAISaturated:
+        bot_reply = responder_sin_gpt(user, ids_recomendados)
+    except Exception as e:
+        if reintentar and _es_error_transitorio(e):
+            raise
+        bot_reply = _respuesta_error_gpt(e)
+
+    return bot_reply
+
+
+INTENT_HANDLERS = {
+    "donde_ver": responder_donde_ver,
+    "rating": responder_rating,
+    "similares": responder_similares,
+    "trailer": responder_trailer,
+    "recomendar": responder_recomendar,
+    "estrenos": responder_estrenos,
+}
@@ -0,0 +1,193 @@
+"""
+Índice item-item de co-recomendaciones.
+
+A partir de la tabla recommendations cuenta, para cada par de películas,
+a cuántos usuarios se les recomendaron ambas (co_pairs), y a cuántos se les
+recomendó cada una (co_items). La similitud entre dos películas es el coseno
+shared_users / sqrt(users_a * users_b).
+
+El índice se actualiza solo con las filas nuevas de recommendations (se
+guarda la última procesada en co_index_state). Las películas ya contadas de
+cada usuario se guardan en co_seen, que no depende de recommendations: si el
+usuario borra su historial y se le vuelve a recomendar la misma película,
+no se cuenta otra vez.
+
+    flask --app movie_bot coindex           # incremental
+    flask --app movie_bot coindex --full    # reconstruir desde cero
+"""
+import math
+import logging
+from collections import Counter, defaultdict
+
+import click
+from sqlalchemy import delete, select
+
+from .db import db
+from .models import CoIndexState, CoItem, CoPair, CoSeen, Recommendation
+from .records import Movie
+from .text_utils import limpiar_texto
+
+logger = logging.getLogger(__name__)
+
+# Mínimo de usuarios en común para considerar vecinas a dos películas
+MIN_SHARED_USERS = 2
+# Filas de recommendations procesadas por lote
+BATCH_SIZE = 5000
+
+
+def _insert(table):
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+
+def _chunks(values, size=500):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _vistas_previas(user_ids):
+    """Películas ya contadas en el índice de cada usuario (co_seen)."""
+    vistas = defaultdict(set)
+    for chunk in _chunks(user_ids):
+        rows = db.session.execute(
+            select(CoSeen.user_id, CoSeen.movie_id).where(CoSeen.user_id.in_(chunk))
+        )
+        for user_id, movie_id in rows:
+            vistas[user_id].add(movie_id)
+    return vistas
+
+
+def _guardar_deltas(item_delta, titles, pair_delta, seen):
+    if seen:
+        stmt = _insert(CoSeen.__table__).on_conflict_do_nothing(index_elements=["user_id", "movie_id"])
+        db.session.execute(stmt, [{"user_id": user_id, "movie_id": movie_id} for user_id, movie_id in seen])
+
+    if titles:
+        stmt = _insert(CoItem.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["movie_id"],
+            set_={
+                "users": CoItem.__table__.c.users + stmt.excluded.users,
+                "movie_title": stmt.excluded.movie_title,
+                "title_key": stmt.excluded.title_key,
+            },
+        )
+        db.session.execute(stmt, [
+            {
+                "movie_id": movie_id,
+                "movie_title": title,
+                "title_key": limpiar_texto(title),
+                "users": item_delta.get(movie_id, 0),
+            }
+            for movie_id, title in titles.items()
+        ])
+
+    if pair_delta:
+        stmt = _insert(CoPair.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["movie_a", "movie_b"],
+            set_={"shared_users": CoPair.__table__.c.shared_users + stmt.excluded.shared_users},
+        )
+        db.session.execute(stmt, [
+            {"movie_a": a, "movie_b": b, "shared_users": n}
+            for (a, b), n in pair_delta.items()
+        ])
+
+
+def actualizar_indice(full=False, batch_size=BATCH_SIZE):
+    """
+    Incorpora al índice las recomendaciones nuevas; con ``full`` lo reconstruye.
+    Devuelve cuántas filas de recommendations se procesaron.
+    """
+    if full:
+        db.session.execute(delete(CoPair))
+        db.session.execute(delete(CoItem))
+        db.session.execute(delete(CoSeen))
+        db.session.execute(delete(CoIndexState))
+        db.session.commit()
+
+    state = db.session.get(CoIndexState, 1)
+    if state is None:
+        state = CoIndexState(id=1, last_recommendation_id=0)
+        db.session.add(state)
+
+    processed = 0
+    while True:
+        last_id = state.last_recommendation_id
+        rows = db.session.execute(
+            select(Recommendation.id, Recommendation.user_id, Recommendation.movie_id, Recommendation.movie_title)
+            .where(Recommendation.id > last_id)
+            .order_by(Recommendation.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        vistas = _vistas_previas({r.user_id for r in rows})
+        item_delta = Counter()
+        pair_delta = Counter()
+        titles = {}
+        seen = []
+        for r in rows:
+            titles[r.movie_id] = r.movie_title
+            previas = vistas[r.user_id]
+            # Una película recomendada dos veces al mismo usuario cuenta una sola vez
+            if r.movie_id in previas:
+                continue
+            item_delta[r.movie_id] += 1
+            for other in previas:
+                pair_delta[(r.movie_id, other)] += 1
+                pair_delta[(other, r.movie_id)] += 1
+            previas.add(r.movie_id)
+            seen.append((r.user_id, r.movie_id))
+
+        _guardar_deltas(item_delta, titles, pair_delta, seen)
+        state.last_recommendation_id = rows[-1].id
+        db.session.commit()
+        processed += len(rows)
+
+    db.session.commit()
+    return processed
+
+
+def vecinos(movie_id, k=10):
+    """
+    Películas más parecidas a ``movie_id`` según el índice, de mayor a menor
+    similitud, como registros Movie (solo con id y título).
+    """
+    item = db.session.get(CoItem, movie_id)
+    if item is None or not item.users:
+        return []
+
+    rows = db.session.execute(
+        select(CoPair.movie_b, CoPair.shared_users, CoItem.movie_title, CoItem.users)
+        .join(CoItem, CoItem.movie_id == CoPair.movie_b)
+        .where(CoPair.movie_a == movie_id, CoPair.shared_users >= MIN_SHARED_USERS)
+    ).all()
+    scored = sorted(
+        ((shared / math.sqrt(item.users * users), other_id, title) for other_id, shared, title, users in rows),
+        reverse=True,
+    )
+    return [Movie(id=other_id, title=title) for _, other_id, title in scored[:k]]
+
+
+def vecinos_por_titulo(movie_name, k=10):
+    """Como vecinos(), buscando la película por su título normalizado."""
+    item = db.session.execute(
+        select(CoItem).where(CoItem.title_key == limpiar_texto(movie_name)).order_by(CoItem.users.desc())
+    ).scalars().first()
+    if item is None:
+        return []
+    return vecinos(item.movie_id, k=k)
+
+
+@click.command("coindex")
+@click.option("--full", is_flag=True, help="Reconstruir el índice desde cero.")
+def coindex_command(full):
+    """Actualiza el índice de co-recomendaciones con las filas nuevas."""
+    processed = actualizar_indice(full=full)
+    click.echo(f"Filas de recommendations procesadas: {processed}")
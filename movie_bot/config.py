@@ -0,0 +1,42 @@
+import os
+
+
+class Config:
+    """
+    Configuración por defecto de la aplicación, leída de variables de entorno.
+    create_app() carga el archivo .env antes de instanciarla.
+    """
+
+    def __init__(self):
+        self.SECRET_KEY = os.getenv("SECRET_KEY", "clave_secreta_predeterminada")
+        self.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+        if os.getenv("DATABASE_URL"):
+            self.SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+        # Control de admisión de OpenAI (ver openai_client.py): llamadas a la vez,
+        # cuántas pueden esperar turno y cuánto (s) antes de responder sin GPT
+        self.OPENAI_MAX_CONCURRENT = int(os.getenv("OPENAI_MAX_CONCURRENT", 8))
+        self.OPENAI_MAX_WAITING = int(os.getenv("OPENAI_MAX_WAITING", 16))
+        self.OPENAI_WAIT_TIMEOUT = float(os.getenv("OPENAI_WAIT_TIMEOUT", 2))
+        # Cola de trabajos para las intenciones lentas del chat (ver jobs.py). Por
+        # defecto hay tantos hilos como llamadas a OpenAI admitidas: los trabajos
+        # que no tienen hilo esperan en la cola con su mensaje pendiente. Con más
+        # hilos que OPENAI_MAX_CONCURRENT, el exceso pasa por el control de
+        # admisión y puede responderse sin GPT.
+        self.CHAT_JOBS = os.getenv("CHAT_JOBS", "1").lower() in ("1", "true")
+        self.JOB_WORKERS = int(os.getenv("JOB_WORKERS", self.OPENAI_MAX_CONCURRENT))
+        self.JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+        self.JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 2))
+        # Hash de contraseñas (ver passwords.py): método completo de werkzeug con
+        # su costo, largo de la sal y pool de procesos (0 = en el mismo hilo)
+        self.PASSWORD_METHOD = os.getenv("PASSWORD_METHOD", "scrypt:32768:8:1")
+        self.PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", 16))
+        self.PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+        self.PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 8))
+        self.PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+        # Token para leer /metrics (Authorization: Bearer ...); vacío = deshabilitado
+        self.METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+        # Flask-Migrate (y alembic) solo se necesitan para los comandos "flask db";
+        # por defecto los workers de gunicorn no los cargan.
+        self.ENABLE_MIGRATIONS = os.getenv(
+            "ENABLE_MIGRATIONS", os.getenv("FLASK_RUN_FROM_CLI", "false")
+        ).lower() in ("1", "true")
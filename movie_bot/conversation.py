@@ -0,0 +1,97 @@
+"""
+Contexto de la conversación por usuario para las preguntas de seguimiento.
+
+Tras "qué rating tiene Dune", mensajes como "y el tráiler?" o "dónde la puedo
+ver" no nombran la película. Aquí se guarda, por usuario, la última película
+resuelta, la intención que la resolvió y la última lista de resultados, para
+que los manejadores del chat la reutilicen sin volver a buscar en TMDB.
+
+El contexto vive en memoria del proceso (cada worker de gunicorn tiene el
+suyo), con un número máximo de usuarios y expiración por inactividad.
+"""
+import os
+import re
+
+from .cache import TTLCache
+
+CONTEXT_TTL = int(os.getenv("CHAT_CONTEXT_TTL", 15 * 60))
+CONTEXT_MAX_USERS = int(os.getenv("CHAT_CONTEXT_MAX_USERS", 10000))
+_contexts = TTLCache(maxsize=CONTEXT_MAX_USERS, ttl=CONTEXT_TTL)
+
+# Argumentos que se refieren a la película de la que se venía hablando
+PRONOMBRES = {
+    "", "la", "lo", "ella", "esa", "esta", "eso", "esto",
+    "la pelicula", "esa pelicula", "esta pelicula", "esa peli", "esta peli",
+}
+# "la primera", "la segunda", ..., "la 3": posición en la última lista
+ORDINALES = {
+    "primera": 1, "segunda": 2, "tercera": 3, "cuarta": 4, "quinta": 5,
+    "sexta": 6, "septima": 7, "octava": 8, "novena": 9, "decima": 10,
+    "ultima": -1,
+}
+_ORDINAL_RE = re.compile(r"^(?:la |el )?(?:(\d+)|(" + "|".join(ORDINALES) + r"))(?: pelicula| peli| de la lista)?$")
+
+
+class ConversationContext:
+    __slots__ = ("movie", "intent", "results")
+
+    def __init__(self, movie=None, intent=None, results=()):
+        self.movie = movie
+        self.intent = intent
+        self.results = results
+
+    def __repr__(self):
+        return f"<ConversationContext {self.intent} {self.movie!r} ({len(self.results)} resultados)>"
+
+
+def contexto(user_id):
+    """Contexto vigente del usuario o None si no hay (o expiró)."""
+    return _contexts.get(user_id)
+
+
+def recordar(user_id, intent, movie=None, results=None):
+    """
+    Actualiza el contexto del usuario tras una respuesta. ``movie`` es la
+    película resuelta (Movie) y ``results`` la lista de películas mostrada;
+    lo que no se indique se conserva del contexto anterior.
+    """
+    previous = _contexts.get(user_id)
+    if previous is not None:
+        if movie is None:
+            movie = previous.movie
+        if results is None:
+            results = previous.results
+    _contexts.set(user_id, ConversationContext(movie, intent, tuple(results or ())))
+
+
+def olvidar(user_id):
+    _contexts.pop(user_id)
+
+
+def resolver_referencia(user_id, arg):
+    """
+    Movie a la que se refiere ``arg`` ("", "la", "esa película", "la segunda"...)
+    según el contexto del usuario. None si ``arg`` es un título o si no hay
+    contexto que lo resuelva.
+    """
+    arg = arg.strip()
+    ctx = _contexts.get(user_id)
+    if ctx is None:
+        return None
+
+    if arg in PRONOMBRES:
+        return ctx.movie
+
+    match = _ORDINAL_RE.match(arg)
+    if match and ctx.results:
+        position = int(match.group(1)) if match.group(1) else ORDINALES[match.group(2)]
+        index = position - 1 if position > 0 else len(ctx.results) + position
+        if 0 <= index < len(ctx.results):
+            return ctx.results[index]
+    return None
+
+
+def es_referencia(arg):
+    """True si ``arg`` no nombra una película sino que apunta al contexto."""
+    arg = arg.strip()
+    return arg in PRONOMBRES or _ORDINAL_RE.match(arg) is not None
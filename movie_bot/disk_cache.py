@@ -0,0 +1,152 @@
+"""
+Caché persistente de respuestas de TMDB compartida por todos los workers.
+
+Guarda el JSON de cada respuesta comprimido con zlib en una base SQLite en
+modo WAL (por defecto instance/tmdb_cache.sqlite3), con su fecha de
+expiración. Varios procesos pueden leer a la vez mientras otro escribe, y el
+contenido sobrevive a reinicios y despliegues: un worker nuevo arranca con la
+caché caliente. Las cachés en memoria de tmdb_api.py funcionan como capa
+rápida por delante de esta.
+
+Un hilo por proceso borra periódicamente las entradas expiradas.
+"""
+import os
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_expires_at ON responses (expires_at);
+"""
+
+
+class DiskCache:
+    """
+    Clave -> bytes con expiración, en SQLite. Cada hilo usa su propia
+    conexión (y se abre una nueva tras un fork). Los errores de SQLite se
+    registran y se tratan como fallos de caché: la caché nunca rompe una
+    petición.
+    """
+
+    def __init__(self, path, sweep_interval=SWEEP_INTERVAL, timer=time.time):
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self.timer = timer
+        self._local = threading.local()
+        self._sweeper_pid = None
+        self._lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+            self._start_sweeper()
+        return self._local.conn
+
+    def get(self, key):
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, self.timer())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"[disk_cache] Error al leer '{key}': {e}")
+            return None
+        if row is None:
+            metrics.incr("tmdb.disk_misses")
+            return None
+        try:
+            value = zlib.decompress(row[0])
+        except zlib.error as e:
+            # Fila corrupta o truncada: se borra y cuenta como fallo de caché
+            logger.error(f"[disk_cache] Entrada corrupta '{key}': {e}")
+            metrics.incr("tmdb.disk_corrupt")
+            self.delete(key)
+            return None
+        metrics.incr("tmdb.disk_hits")
+        return value
+
+    def set(self, key, value, ttl):
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, zlib.compress(value), self.timer() + ttl),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"[disk_cache] Error al guardar '{key}': {e}")
+
+    def delete(self, key):
+        try:
+            self._conn().execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.error(f"[disk_cache] Error al borrar '{key}': {e}")
+
+    def sweep(self):
+        """Borra las entradas expiradas; devuelve cuántas."""
+        try:
+            cursor = self._conn().execute("DELETE FROM responses WHERE expires_at <= ?", (self.timer(),))
+        except sqlite3.Error as e:
+            logger.error(f"[disk_cache] Error al limpiar entradas expiradas: {e}")
+            return 0
+        return cursor.rowcount
+
+    def clear(self):
+        self._conn().execute("DELETE FROM responses")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _start_sweeper(self):
+        # Los hilos no sobreviven al fork de gunicorn: uno por proceso
+        with self._lock:
+            if self._sweeper_pid == os.getpid() or not self.sweep_interval:
+                return
+            self._sweeper_pid = os.getpid()
+        thread = threading.Thread(target=self._sweep_loop, name="tmdb-cache-sweeper", daemon=True)
+        thread.start()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.info(f"[disk_cache] {removed} respuestas expiradas eliminadas")
+
+
+def disk_cache_config(app):
+    app.config.setdefault(
+        "TMDB_DISK_CACHE", os.getenv("TMDB_DISK_CACHE", os.path.join(app.instance_path, "tmdb_cache.sqlite3"))
+    )
+
+    from .tmdb_api import set_disk_cache
+
+    path = app.config["TMDB_DISK_CACHE"]
+    if not path:
+        set_disk_cache(None)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    cache = DiskCache(path)
+    app.extensions["tmdb_disk_cache"] = cache
+    set_disk_cache(cache)
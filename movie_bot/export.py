@@ -0,0 +1,101 @@
+"""
+Exportación del historial de un usuario (mensajes y recomendaciones) en NDJSON.
+
+Las filas se leen por lotes con un cursor del servidor (yield_per) y se
+escriben a medida que llegan, así que la memoria no depende del tamaño del
+historial. La misma función alimenta la descarga /export (ver
+blueprints/profile.py) y el comando para soporte:
+
+    flask --app movie_bot export usuario@correo.com > historial.ndjson
+    flask --app movie_bot export usuario@correo.com --gzip -o historial.ndjson.gz
+"""
+import sys
+import json
+import zlib
+
+import click
+from sqlalchemy import select
+
+from .db import db
+from .models import Message, Recommendation, User
+
+# Filas pedidas a la base por lote y bytes acumulados antes de emitir un bloque
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def _filas(user_id):
+    """Un dict por fila: primero los mensajes y después las recomendaciones, por id."""
+    messages = db.session.execute(
+        select(Message.id, Message.author, Message.content, Message.timestamp, Message.pending)
+        .where(Message.user_id == user_id)
+        .order_by(Message.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for id, author, content, timestamp, pending in messages:
+        row = {"type": "message", "id": id, "author": author, "content": content,
+               "timestamp": timestamp.isoformat()}
+        if pending:
+            row["pending"] = True
+        yield row
+
+    recommendations = db.session.execute(
+        select(Recommendation.id, Recommendation.movie_id, Recommendation.movie_title, Recommendation.timestamp)
+        .where(Recommendation.user_id == user_id)
+        .order_by(Recommendation.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for id, movie_id, movie_title, timestamp in recommendations:
+        yield {"type": "recommendation", "id": id, "movie_id": movie_id, "movie_title": movie_title,
+               "timestamp": timestamp.isoformat()}
+
+
+def exportar_historial(user_id, comprimir=False):
+    """
+    Generador de bloques de bytes con el historial en NDJSON (una fila JSON
+    por línea), comprimido con gzip si ``comprimir``.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None
+    buffer = []
+    size = 0
+    for row in _filas(user_id):
+        line = json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            chunk = b"".join(buffer)
+            buffer.clear()
+            size = 0
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = b"".join(buffer)
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+@click.command("export")
+@click.argument("usuario")
+@click.option("--gzip", "comprimir", is_flag=True, help="Comprimir la salida con gzip.")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="Archivo de salida (por defecto, stdout).")
+def export_command(usuario, comprimir, output):
+    """Exporta el historial de un usuario (id o email) en NDJSON."""
+    query = select(User.id)
+    query = query.where(User.id == int(usuario)) if usuario.isdigit() else query.where(User.email == usuario)
+    user_id = db.session.scalar(query)
+    if user_id is None:
+        raise click.ClickException(f"No existe el usuario '{usuario}'.")
+
+    fh = open(output, "wb") if output else sys.stdout.buffer
+    try:
+        for chunk in exportar_historial(user_id, comprimir=comprimir):
+            fh.write(chunk)
+    finally:
+        if output:
+            fh.close()
+        else:
+            fh.flush()
@@ -0,0 +1,10 @@
+from flask_login import LoginManager
+
+from .models import User
+
+login_manager = LoginManager()
+login_manager.login_view = "auth.login"
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
@@ -0,0 +1,295 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import requests
+from flask import Response, abort, current_app, request
+
+logger = logging.getLogger(__name__)
+
+TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p"
+
+# Tamaños de TMDB que aceptamos y anchos a los que se permite reducir
+ALLOWED_SIZES = {"w300", "w500", "w780", "w1280", "original"}
+ALLOWED_WIDTHS = {300, 400, 500}
+
+# Las rutas de TMDB tienen la forma "abc123XYZ.jpg"
+FILENAME_RE = re.compile(r"^[A-Za-z0-9_\-]+\.(jpg|jpeg|png|webp)$")
+
+ONE_YEAR = 60 * 60 * 24 * 365
+
+try:
+    from PIL import Image
+except ImportError:  # Sin Pillow no se reduce el tamaño y se rechaza ?w=
+    Image = None
+
+try:
+    import fcntl
+except ImportError:  # Sin fcntl (Windows) el barrido solo se protege entre hilos
+    fcntl = None
+
+# Con Pillow el proxy acepta ?w= (build_image_url de tmdb_api.py lo consulta)
+PUEDE_REDUCIR = Image is not None
+
+# Archivo de lock del barrido, dentro del directorio de la caché
+LOCK_NAME = ".sweep.lock"
+
+
+@contextmanager
+def _file_lock(path):
+    """Lock exclusivo entre procesos sobre ``path`` (flock)."""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+class DiskImageCache:
+    """
+    Caché de imágenes en disco acotada por tamaño total, con expulsión LRU.
+
+    El directorio es compartido por todos los workers, así que el límite se
+    aplica sobre lo que hay en disco: un barrido (bajo un lock de archivo)
+    recorre el directorio y borra los archivos usados hace más tiempo (cada
+    lectura "toca" el archivo) hasta bajar a ``max_bytes * LOW_WATER``. Cada
+    worker barre cuando su estimación supera el límite o cuando escribió
+    ``max_bytes / SWEEP_FRACTION`` bytes desde el último barrido, así que con
+    N workers el disco no pasa de max_bytes * (1 + N / SWEEP_FRACTION). Como
+    el barrido deja margen, con la caché llena no se recorre el directorio en
+    cada escritura sino una vez cada varios archivos.
+
+    El índice en memoria guarda, por archivo, el tamaño y su ETag; se
+    reconstruye en cada barrido.
+    """
+
+    SWEEP_FRACTION = 20
+    LOW_WATER = 0.9
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # nombre de archivo -> [bytes, etag]
+        self._total = 0
+        self._written = 0  # bytes escritos desde el último barrido
+        self._sweep_bytes = max(1, max_bytes // self.SWEEP_FRACTION)
+        self._low_bytes = int(max_bytes * self.LOW_WATER)
+        self._lock_path = os.path.join(directory, LOCK_NAME)
+        os.makedirs(directory, exist_ok=True)
+        self.sweep()
+
+    @staticmethod
+    def _filename(key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Devuelve (datos, etag) o None si la clave no está en caché."""
+        name = self._filename(key)
+        full_path = os.path.join(self.directory, name)
+        try:
+            with open(full_path, "rb") as fh:
+                data = fh.read()
+            os.utime(full_path)
+        except FileNotFoundError:
+            with self._lock:
+                entry = self._index.pop(name, None)
+                if entry:
+                    self._total -= entry[0]
+            return None
+
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None:
+                # Lo escribió otro worker que comparte el directorio
+                entry = [len(data), None]
+                self._index[name] = entry
+                self._total += len(data)
+            self._index.move_to_end(name)
+            if entry[1] is None:
+                entry[1] = hashlib.sha256(data).hexdigest()[:32]
+            return data, entry[1]
+
+    def put(self, key, data):
+        """Guarda los datos y devuelve su ETag fuerte."""
+        name = self._filename(key)
+        full_path = os.path.join(self.directory, name)
+        etag = hashlib.sha256(data).hexdigest()[:32]
+
+        tmp_path = f"{full_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, full_path)
+
+        with self._lock:
+            old = self._index.pop(name, None)
+            if old:
+                self._total -= old[0]
+            self._index[name] = [len(data), etag]
+            self._total += len(data)
+            self._written += len(data)
+            barrer = self._total > self.max_bytes or self._written >= self._sweep_bytes
+        if barrer:
+            self.sweep()
+        return etag
+
+    def sweep(self):
+        """
+        Recorre el directorio y, si el total en disco supera ``max_bytes``,
+        borra los archivos menos usados hasta bajar a ``max_bytes * LOW_WATER``.
+        Devuelve el total resultante.
+        """
+        with _file_lock(self._lock_path), self._lock:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name == LOCK_NAME or entry.name.endswith(".tmp") or not entry.is_file():
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            entries.sort()
+
+            total = sum(size for _, _, size in entries)
+            first = 0
+            target = self._low_bytes if total > self.max_bytes else total
+            # Siempre queda al menos el archivo más reciente
+            while total > target and first < len(entries) - 1:
+                _, name, size = entries[first]
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                first += 1
+
+            index = OrderedDict()
+            for _, name, size in entries[first:]:
+                old = self._index.get(name)
+                index[name] = [size, old[1] if old is not None and old[0] == size else None]
+            self._index = index
+            self._total = total
+            self._written = 0
+            return total
+
+    @property
+    def total_bytes(self):
+        return self._total
+
+    def __len__(self):
+        return len(self._index)
+
+
+# ----------------------------------------------------------
+# Orígenes de imágenes
+# ----------------------------------------------------------
+class TMDBImageUpstream:
+    """Descarga las imágenes directamente desde el CDN de TMDB."""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    def fetch(self, size, filename):
+        url = f"{TMDB_IMAGE_BASE}/{size}/{filename}"
+        response = requests.get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        return response.content
+
+
+def _downscale(data, width):
+    """Reduce la imagen al ancho indicado conservando la proporción (requiere Pillow)."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.width <= width:
+                return data
+            height = max(1, round(img.height * width / img.width))
+            fmt = img.format or "JPEG"
+            resized = img.convert("RGB").resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            if fmt.upper() == "PNG":
+                resized.save(out, format="PNG", optimize=True)
+            else:
+                resized.save(out, format="JPEG", quality=82, optimize=True, progressive=True)
+            return out.getvalue()
+    except Exception as e:
+        logger.warning(f"[image_proxy] No se pudo reducir la imagen: {e}")
+        return data
+
+
+def _mimetype(data, filename):
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if filename.lower().endswith(".png"):
+        return "image/png"
+    return "image/jpeg"
+
+
+# ----------------------------------------------------------
+# Configuración y vista
+# ----------------------------------------------------------
+def image_proxy_config(app):
+    app.config.setdefault("IMAGE_CACHE_DIR", os.path.join(app.instance_path, "img_cache"))
+    app.config.setdefault("IMAGE_CACHE_MAX_BYTES", int(os.getenv("IMAGE_CACHE_MAX_BYTES", 200 * 1024 * 1024)))
+    # Cualquier objeto con fetch(size, filename); las pruebas pasan uno falso
+    app.config.setdefault("IMAGE_UPSTREAM", None)
+
+    upstream = app.config["IMAGE_UPSTREAM"] or TMDBImageUpstream()
+
+    app.extensions["image_cache"] = DiskImageCache(
+        app.config["IMAGE_CACHE_DIR"], app.config["IMAGE_CACHE_MAX_BYTES"]
+    )
+    app.extensions["image_upstream"] = upstream
+
+
+def serve_image(size, filename):
+    """
+    Sirve una imagen de TMDB desde la caché en disco, descargándola si hace falta.
+
+    El parámetro opcional ``w`` reduce la imagen a uno de los anchos permitidos.
+    """
+    if size not in ALLOWED_SIZES or not FILENAME_RE.match(filename):
+        abort(404)
+
+    width = request.args.get("w", type=int)
+    if width is not None and (width not in ALLOWED_WIDTHS or not PUEDE_REDUCIR):
+        abort(404)
+
+    cache = current_app.extensions["image_cache"]
+    upstream = current_app.extensions["image_upstream"]
+    key = f"{size}/{filename}?w={width or ''}"
+
+    cached = cache.get(key)
+    if cached:
+        data, etag = cached
+    else:
+        try:
+            data = upstream.fetch(size, filename)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[image_proxy] Error HTTP al descargar {size}/{filename}: {e}")
+            abort(502)
+        if data is None:
+            abort(404)
+        if width:
+            data = _downscale(data, width)
+        etag = cache.put(key, data)
+
+    response = Response(data, mimetype=_mimetype(data, filename))
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = ONE_YEAR
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
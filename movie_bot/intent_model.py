@@ -0,0 +1,514 @@
+"""
+Clasificador local de intenciones para los mensajes que no usan las frases fijas.
+
+detectar_intencion() reconoce "que rating tiene X" o "parecida a X", pero
+"cuánta nota tiene Dune" o "pelis como Alien" terminan en GPT. Este módulo
+entrena un modelo pequeño que asigna esos mensajes a las mismas intenciones
+de TMDB y extrae el título:
+
+- Rasgos: TF-IDF de palabras, pares de palabras y n-gramas de caracteres
+  (3 y 4 por palabra, así "peli"/"pelis"/"peliculas" se parecen).
+- Modelo: regresión logística multiclase (softmax) entrenada con NumPy, con
+  la clase "gpt" para lo que debe seguir yendo a GPT.
+- Título: cada palabra tiene una probabilidad de ser parte de la frase
+  ("que", "nota", "como") o del título, aprendida de los ejemplos, igual que
+  la de que haya frase antes y después del título; el título es el tramo
+  que mejor separa frase-título-frase.
+
+Se entrena con frases de ejemplo (SEMILLAS) y con los mensajes guardados en
+messages: los que las frases fijas ya reconocen aportan intención y título;
+los que el chat mandó a GPT (messages.intent = "gpt") se usan como clase
+"gpt". Los que atendió el propio modelo no se usan: entrenar con sus
+etiquetas fijaría sus errores.
+
+    flask --app movie_bot intent-model
+
+El modelo se guarda en INTENT_MODEL_PATH (por defecto
+instance/intent_model.npz) y los workers lo cargan al primer mensaje; tras
+reentrenar hay que reiniciarlos. Una predicción con confianza menor que
+INTENT_MIN_CONFIDENCE se deja a GPT. numpy se importa dentro de las
+funciones para no cargarlo al arrancar los workers.
+"""
+import os
+import math
+import time
+import logging
+import threading
+from array import array
+from collections import Counter
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import select
+
+from .metrics import metrics
+from .text_utils import GENRE_MAP, limpiar_texto
+
+logger = logging.getLogger(__name__)
+
+CLASSES = ("gpt", "donde_ver", "rating", "similares", "trailer", "recomendar", "estrenos")
+# Intenciones cuyo argumento es un título (o una referencia al contexto)
+CON_TITULO = {"donde_ver", "rating", "similares", "trailer"}
+
+MAX_FEATURES = 4096
+EPOCHS = 300
+LEARNING_RATE = 0.05
+L2 = 1e-4
+# Probabilidad de ser parte de la frase de una palabra que nunca se vio: las
+# frases usan pocas palabras y casi todas aparecen en los ejemplos, los
+# títulos no
+CUE_PRIOR = 0.05
+
+# Frases de ejemplo ya normalizadas: {t} es un título y {g} un género
+SEMILLAS = {
+    "donde_ver": [
+        "donde puedo ver {t}", "donde veo {t}", "en que plataforma esta {t}",
+        "en que plataforma puedo ver {t}", "donde pasan {t}", "donde esta disponible {t}",
+        "en que streaming esta {t}", "{t} esta en netflix", "{t} esta en disney", "{t} esta en prime video",
+        "{t} esta en hbo", "{t} donde la puedo ver",
+        "se puede ver {t} en algun lado", "donde se puede ver {t}", "en donde dan {t}",
+        "quiero ver {t} donde la encuentro", "en que servicio esta {t}", "donde consigo {t}",
+        "{t} en que plataforma esta",
+    ],
+    "rating": [
+        "que rating tiene {t}", "cuanta nota tiene {t}", "que nota tiene {t}",
+        "cuanto puntaje tiene {t}", "que tan buena es {t}", "es buena {t}", "{t} es buena",
+        "calificacion de {t}", "que puntuacion tiene {t}", "cuantas estrellas tiene {t}",
+        "como esta calificada {t}", "vale la pena {t}", "que tal es {t}", "nota de {t}",
+        "puntaje de {t}", "{t} que nota tiene", "cuanto le dan a {t}",
+    ],
+    "similares": [
+        "parecida a {t}", "pelis como {t}", "peliculas como {t}", "algo parecido a {t}",
+        "similares a {t}", "que otras peliculas son como {t}", "me gusto {t} que mas veo",
+        "pelis del estilo de {t}", "algo tipo {t}", "quiero algo similar a {t}",
+        "peliculas parecidas a {t}", "alguna parecida a {t}", "otras como {t}",
+        "algo en la onda de {t}",
+    ],
+    "trailer": [
+        "muestras el trailer de {t}", "trailer de {t}", "quiero ver el trailer de {t}",
+        "pasame el trailer de {t}", "avance de {t}", "tienes el avance de {t}",
+        "muestrame el adelanto de {t}", "video de {t}", "{t} trailer", "ponme el trailer de {t}",
+        "como es el trailer de {t}", "hay trailer de {t}",
+    ],
+    "recomendar": [
+        "quiero ver algo de {g}", "alguna de {g}", "pelis de {g}", "una de {g} para hoy",
+        "sugiereme una peli de {g}", "alguna recomendacion de {g}", "que veo hoy",
+        "que pelicula veo", "sugiere algo", "no se que ver", "dame una recomendacion",
+        "que me sugieres", "quiero ver una pelicula", "ponme algo de {g}", "tienes algo de {g}",
+    ],
+    "estrenos": [
+        "que hay de nuevo en cines", "que peliculas salieron esta semana",
+        "novedades en cartelera", "que esta en cartelera", "ultimos lanzamientos",
+        "que se estreno", "peliculas nuevas", "lo ultimo en cines", "que salio nuevo",
+        "que hay en el cine",
+    ],
+    "gpt": [
+        "hola", "gracias", "quien eres", "como estas", "buenas noches", "cuentame un chiste",
+        "quien dirigio {t}", "de que trata {t}", "quien actua en {t}", "explicame el final de {t}",
+        "cuanto dura {t}", "en que ano salio {t}", "quien compuso la musica de {t}",
+        "cuantas secuelas tiene {t}", "por que {t} es tan famosa", "cual es tu pelicula favorita",
+        "cual es la mejor pelicula de la historia", "que actor gano el oscar este ano",
+        "que opinas del cine frances", "quien es el protagonista de {t}", "hola que tal",
+        "me ayudas", "que puedes hacer",
+    ],
+}
+SEED_TITLES = (
+    "dune", "alien", "el padrino", "titanic", "harry potter y la piedra filosofal", "la la land",
+    "volver al futuro", "toy story", "matrix", "interstellar", "el senor de los anillos", "coco",
+    "parasitos", "amelie", "el laberinto del fauno", "oppenheimer", "barbie", "joker", "avatar",
+    "la vida es bella", "los increibles", "shrek", "el rey leon", "star wars", "tiburon",
+    "inception", "roma", "relatos salvajes", "nueve reinas", "amores perros",
+)
+# Títulos por frase de ejemplo (rotando SEED_TITLES)
+TITLES_PER_TEMPLATE = 8
+
+
+def _rasgos(palabras):
+    """Contador de rasgos de un mensaje ya normalizado y partido en palabras."""
+    feats = Counter()
+    for i, word in enumerate(palabras):
+        feats["w:" + word] += 1
+        if i:
+            feats[f"b:{palabras[i - 1]} {word}"] += 1
+        padded = f" {word} "
+        for n in (3, 4):
+            for j in range(len(padded) - n + 1):
+                feats["c:" + padded[j:j + n]] += 1
+    return feats
+
+
+def _ubicar(palabras, span):
+    """(inicio, fin) de las palabras de ``span`` dentro del mensaje, o None."""
+    span_words = span.split()
+    n = len(span_words)
+    if not n:
+        return None
+    for i in range(len(palabras) - n, -1, -1):
+        if palabras[i:i + n] == span_words:
+            return i, i + n
+    return None
+
+
+def ejemplos_semilla():
+    """[(mensaje, intención, título)] generados a partir de SEMILLAS."""
+    ejemplos = []
+    genres = list(GENRE_MAP)
+    k = 0
+    for intent, templates in SEMILLAS.items():
+        for template in templates:
+            if "{t}" in template:
+                for _ in range(TITLES_PER_TEMPLATE):
+                    title = SEED_TITLES[k % len(SEED_TITLES)]
+                    k += 1
+                    ejemplos.append((template.format(t=title), intent, title))
+            elif "{g}" in template:
+                for genre in genres:
+                    ejemplos.append((template.format(g=genre), intent, genre))
+            else:
+                ejemplos.append((template, intent, ""))
+    return ejemplos
+
+
+class IntentModel:
+    """Vocabulario con IDF, pesos de la regresión logística y probabilidades de frase por palabra."""
+
+    def __init__(self, vocab, idf, weights, bias, classes, cue_words, cue_probs, shape):
+        self.vocab = {feature: i for i, feature in enumerate(vocab)}
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.classes = list(classes)
+        self.cue = dict(zip(cue_words, cue_probs.tolist()))
+        # Probabilidad de que haya frase antes y después del título
+        self.shape = shape
+
+    # ---- Entrenamiento ----
+    @classmethod
+    def entrenar(cls, ejemplos, max_features=MAX_FEATURES, epochs=EPOCHS):
+        """Entrena con [(mensaje normalizado, intención, título o "")]."""
+        import numpy as np
+        # Los rasgos se calculan dos veces (frecuencias y matriz) en vez de
+        # guardar un Counter por mensaje
+        df = Counter()
+        for texto, _, _ in ejemplos:
+            df.update(_rasgos(texto.split()).keys())
+        vocab = [f for f, _ in sorted(df.items(), key=lambda item: (-item[1], item[0]))[:max_features]]
+        index = {feature: i for i, feature in enumerate(vocab)}
+        n_docs = len(ejemplos)
+        idf = np.array([math.log((1 + n_docs) / (1 + df[f])) + 1 for f in vocab], dtype=np.float32)
+
+        # Matriz documento x rasgo dispersa (CSR: fila, columna y valor de cada
+        # rasgo presente); una densa con 20k mensajes y 4096 rasgos ocuparía
+        # cientos de MB
+        rows, cols, vals = array("q"), array("q"), array("f")
+        for row, (texto, _, _) in enumerate(ejemplos):
+            for feature, count in _rasgos(texto.split()).items():
+                col = index.get(feature)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    vals.append((1 + math.log(count)) * idf[col])
+        rows = np.frombuffer(rows, dtype=np.int64)
+        cols = np.frombuffer(cols, dtype=np.int64)
+        vals = np.frombuffer(vals, dtype=np.float32).copy()
+        norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=n_docs))
+        vals /= np.maximum(norms, 1e-12)[rows].astype(np.float32)
+        X = _dispersa(rows, cols, vals, n_docs)
+        XT = _dispersa(cols, rows, vals, len(vocab))
+
+        classes = list(CLASSES)
+        labels = np.array([classes.index(intent) for _, intent, _ in ejemplos])
+        Y = np.eye(len(classes), dtype=np.float32)[labels]
+        # Clases balanceadas: cada clase pesa lo mismo aunque tenga menos ejemplos
+        counts = np.bincount(labels, minlength=len(classes)).astype(np.float32)
+        sample_w = (n_docs / (len(classes) * np.maximum(counts, 1)))[labels][:, None]
+        sample_w /= sample_w.sum()
+
+        W = np.zeros((len(vocab), len(classes)), dtype=np.float32)
+        b = np.zeros(len(classes), dtype=np.float32)
+        # Descenso por gradiente con Adam sobre todo el lote
+        mW, vW, mb, vb = np.zeros_like(W), np.zeros_like(W), np.zeros_like(b), np.zeros_like(b)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            P = _softmax(_producto(X, W) + b)
+            G = (P - Y) * sample_w
+            gW = _producto(XT, G) + L2 * W
+            gb = G.sum(axis=0)
+            mW = beta1 * mW + (1 - beta1) * gW
+            vW = beta2 * vW + (1 - beta2) * gW * gW
+            mb = beta1 * mb + (1 - beta1) * gb
+            vb = beta2 * vb + (1 - beta2) * gb * gb
+            lr = LEARNING_RATE * math.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+            W -= lr * mW / (np.sqrt(vW) + eps)
+            b -= lr * mb / (np.sqrt(vb) + eps)
+
+        # Palabras de frase frente a palabras de título
+        cue_counts, title_counts = Counter(), Counter()
+        before = after = titled = 0
+        for texto, _, span in ejemplos:
+            palabras = texto.split()
+            pos = _ubicar(palabras, span)
+            if span and pos is None:
+                continue
+            start, end = pos or (len(palabras), len(palabras))
+            for i, word in enumerate(palabras):
+                (title_counts if start <= i < end else cue_counts)[word] += 1
+            if pos is not None:
+                titled += 1
+                before += start > 0
+                after += end < len(palabras)
+        cue_words = sorted(set(cue_counts) | set(title_counts))
+        cue_probs = np.array([
+            (cue_counts[w] + CUE_PRIOR) / (cue_counts[w] + title_counts[w] + 1) for w in cue_words
+        ], dtype=np.float32)
+        shape = np.array([(before + 1) / (titled + 2), (after + 1) / (titled + 2)], dtype=np.float32)
+        return cls(vocab, idf, W, b, classes, cue_words, cue_probs, shape)
+
+    # ---- Inferencia ----
+    def probabilidades(self, texto):
+        """Probabilidad de cada clase para un mensaje normalizado."""
+        import numpy as np
+        cols, vals = [], []
+        for feature, count in _rasgos(texto.split()).items():
+            col = self.vocab.get(feature)
+            if col is not None:
+                cols.append(col)
+                vals.append((1 + math.log(count)) * self.idf[col])
+        if not cols:
+            probs = np.zeros(len(self.classes), dtype=np.float32)
+            probs[self.classes.index("gpt")] = 1.0
+            return probs
+        vals = np.array(vals, dtype=np.float32)
+        vals /= np.linalg.norm(vals)
+        scores = vals @ self.weights[cols] + self.bias
+        return _softmax(scores[None, :])[0]
+
+    def titulo(self, texto):
+        """Tramo del mensaje que más parece un título (frase, título, frase)."""
+        import numpy as np
+        palabras = texto.split()
+        if not palabras:
+            return ""
+        cue = np.array([self.cue.get(w, CUE_PRIOR) for w in palabras], dtype=np.float64)
+        cue = np.clip(cue, 1e-3, 1 - 1e-3)
+        log_cue = np.concatenate([[0.0], np.cumsum(np.log(cue))])
+        log_title = np.concatenate([[0.0], np.cumsum(np.log(1 - cue))])
+        p_before, p_after = (float(p) for p in self.shape)
+        n = len(palabras)
+        best, best_span = log_cue[n], (0, 0)
+        for i in range(n):
+            for j in range(i + 1, n + 1):
+                score = (
+                    log_cue[i] + math.log(p_before if i else 1 - p_before)
+                    + (log_title[j] - log_title[i])
+                    + (log_cue[n] - log_cue[j]) + math.log(p_after if j < n else 1 - p_after)
+                )
+                if score > best:
+                    best, best_span = score, (i, j)
+        return " ".join(palabras[best_span[0]:best_span[1]])
+
+    def predecir(self, texto):
+        """
+        (intención, confianza, argumento) para un mensaje normalizado. Para
+        "recomendar" el argumento son solo los géneros mencionados (o ""),
+        nunca un tramo del mensaje: "algo bueno" no es un título.
+        """
+        import numpy as np
+        probs = self.probabilidades(texto)
+        k = int(np.argmax(probs))
+        intent = self.classes[k]
+        if intent in CON_TITULO:
+            arg = self.titulo(texto)
+        elif intent == "recomendar":
+            arg = " ".join(genre_word for genre_word in GENRE_MAP if genre_word in texto.split())
+        else:
+            arg = ""
+        return intent, float(probs[k]), arg
+
+    # ---- Persistencia ----
+    def guardar(self, path):
+        import numpy as np
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path, vocab=np.array(vocab), idf=self.idf, weights=self.weights, bias=self.bias,
+            classes=np.array(self.classes), cue_words=np.array(list(self.cue)),
+            cue_probs=np.array(list(self.cue.values()), dtype=np.float32), shape=self.shape,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def cargar(cls, path):
+        import numpy as np
+        with np.load(path) as data:
+            return cls(
+                data["vocab"].tolist(), data["idf"], data["weights"], data["bias"],
+                data["classes"].tolist(), data["cue_words"].tolist(), data["cue_probs"], data["shape"],
+            )
+
+
+def _dispersa(rows, cols, vals, n_rows):
+    """
+    Matriz dispersa a partir de (fila, columna, valor) de cada elemento:
+    elementos ordenados por fila más las filas no vacías y dónde empieza cada
+    una, como espera _producto(). Con rows y cols intercambiados es la
+    traspuesta.
+    """
+    import numpy as np
+    order = np.argsort(rows, kind="stable")
+    present, starts = np.unique(rows[order], return_index=True)
+    return present, starts, cols[order], vals[order], n_rows
+
+
+def _producto(X, M):
+    """X @ M para X de _dispersa() y M densa."""
+    import numpy as np
+    present, starts, cols, vals, n_rows = X
+    out = np.zeros((n_rows, M.shape[1]), dtype=np.float32)
+    if len(vals):
+        out[present] = np.add.reduceat(vals[:, None] * M[cols], starts, axis=0)
+    return out
+
+
+def _softmax(scores):
+    import numpy as np
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+# ----------------------------------------------------------
+# Uso desde el chat
+# ----------------------------------------------------------
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """Modelo de la app actual, cargado la primera vez (False si no hay archivo)."""
+    app = current_app._get_current_object()
+    model = app.extensions.get("intent_model")
+    if model is not None:
+        return model
+    with _model_lock:
+        model = app.extensions.get("intent_model")
+        if model is None:
+            path = app.config["INTENT_MODEL_PATH"]
+            model = False
+            if path and os.path.exists(path):
+                try:
+                    model = IntentModel.cargar(path)
+                    logger.info(f"[intent_model] Modelo cargado de {path}")
+                except Exception as e:
+                    logger.error(f"[intent_model] No se pudo cargar {path}: {e}")
+            app.extensions["intent_model"] = model
+    return model
+
+
+def clasificar(user_msg_clean):
+    """
+    (intención, argumento) según el modelo, o None si no hay modelo, si la
+    intención es "gpt" o si la confianza no llega a INTENT_MIN_CONFIDENCE.
+    """
+    if not has_app_context():
+        return None
+    model = _get_model()
+    if not model:
+        return None
+
+    start = time.perf_counter()
+    intent, confidence, arg = model.predecir(user_msg_clean.replace(",", ""))
+    metrics.observe("intent_model.time", time.perf_counter() - start)
+    if intent == "gpt" or confidence < current_app.config["INTENT_MIN_CONFIDENCE"]:
+        metrics.incr("intent_model.gpt")
+        return None
+    metrics.incr("intent_model.local")
+    logger.info("[intent_model] %s (%.2f) arg='%s'", intent, confidence, arg)
+    return intent, arg
+
+
+def intent_model_config(app):
+    app.config.setdefault(
+        "INTENT_MODEL_PATH", os.getenv("INTENT_MODEL_PATH", os.path.join(app.instance_path, "intent_model.npz"))
+    )
+    app.config.setdefault("INTENT_MIN_CONFIDENCE", float(os.getenv("INTENT_MIN_CONFIDENCE", 0.7)))
+
+
+# ----------------------------------------------------------
+# Entrenamiento con los mensajes guardados
+# ----------------------------------------------------------
+def ejemplos_de_mensajes(limit):
+    """
+    ([(mensaje, intención, título)] reconocidos por las frases fijas, [mensajes
+    que el chat mandó a GPT], mensajes sin etiqueta confirmada) de los últimos
+    ``limit`` mensajes de usuarios. Los mensajes que atendió el modelo (o
+    guardados sin messages.intent) solo se cuentan.
+    """
+    from .chatbot import detectar_intencion
+    from .db import db
+    from .models import Message
+
+    etiquetados, a_gpt, sin_confirmar = [], [], 0
+    rows = db.session.execute(
+        select(Message.content, Message.intent)
+        .where(Message.author == "user")
+        .order_by(Message.id.desc())
+        .limit(limit)
+        .execution_options(yield_per=1000)
+    )
+    for content, routed in rows:
+        clean = limpiar_texto(content, conservar=",")
+        intent, arg = detectar_intencion(clean, usar_modelo=False)
+        texto = clean.replace(",", "")
+        if not texto:
+            continue
+        if intent != "gpt":
+            etiquetados.append((texto, intent, arg.replace(",", "")))
+        elif routed == "gpt":
+            a_gpt.append(texto)
+        else:
+            sin_confirmar += 1
+    return etiquetados, a_gpt, sin_confirmar
+
+
+def entrenar_modelo(max_mensajes=20000):
+    """
+    Entrena con SEMILLAS y los mensajes guardados con etiqueta confirmada
+    (frases fijas o enviados a GPT). Devuelve (modelo, resumen).
+    """
+    semillas = ejemplos_semilla()
+    etiquetados, a_gpt, sin_confirmar = ejemplos_de_mensajes(max_mensajes)
+    a_gpt = list(dict.fromkeys(a_gpt))
+    ejemplos = semillas + etiquetados + [(texto, "gpt", "") for texto in a_gpt]
+
+    model = IntentModel.entrenar(ejemplos)
+    aciertos = sum(model.predecir(texto)[0] == intent for texto, intent, _ in ejemplos)
+    resumen = {
+        "semillas": len(semillas),
+        "etiquetados": len(etiquetados),
+        "gpt": len(a_gpt),
+        "sin_confirmar": sin_confirmar,
+        "por_clase": Counter(intent for _, intent, _ in ejemplos),
+        "precision": aciertos / len(ejemplos),
+        "rasgos": len(model.vocab),
+    }
+    return model, resumen
+
+
+@click.command("intent-model")
+@click.option("--max-mensajes", default=20000, show_default=True, help="Mensajes de usuarios a usar (los más recientes).")
+def intent_model_command(max_mensajes):
+    """Entrena el clasificador local de intenciones y lo guarda en INTENT_MODEL_PATH."""
+    start = time.perf_counter()
+    model, resumen = entrenar_modelo(max_mensajes)
+    path = current_app.config["INTENT_MODEL_PATH"]
+    model.guardar(path)
+    click.echo(
+        f"Ejemplos: {resumen['semillas']} semillas, {resumen['etiquetados']} mensajes reconocidos, "
+        f"{resumen['gpt']} mensajes a GPT ({resumen['sin_confirmar']} sin etiqueta confirmada)"
+    )
+    click.echo("Por clase: " + ", ".join(f"{k}={v}" for k, v in sorted(resumen["por_clase"].items())))
+    click.echo(
+        f"{resumen['rasgos']} rasgos, acierto en entrenamiento {resumen['precision']:.1%}, "
+        f"{time.perf_counter() - start:.1f} s -> {path}"
+    )
@@ -0,0 +1,194 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from .db import db
+from .metrics import metrics
+from .models import ChatJob, Message, User
+
+logger = logging.getLogger(__name__)
+
+PENDING_REPLY = "Estoy buscando tu respuesta..."
+FAILED_REPLY = "No pude completar tu solicitud. Inténtalo nuevamente."
+
+
+class ChatJobQueue:
+    """
+    Cola de trabajos en segundo plano para las intenciones lentas del chat
+    (GPT y descubrimiento por género).
+
+    Los trabajos se guardan en la tabla chat_jobs, así que sobreviven a un
+    reinicio: recover() vuelve a encolar los pendientes. Un pool de hilos acotado
+    los ejecuta; cada intento "reclama" el trabajo con un UPDATE condicional,
+    por lo que dos workers de gunicorn nunca ejecutan el mismo trabajo a la vez.
+    """
+
+    def __init__(self, app, max_workers=4, max_attempts=3, retry_delay=2.0, stale_after=300):
+        self.app = app
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stale_after = stale_after
+        self.pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-job")
+
+    def enqueue(self, user, user_message):
+        """Crea el mensaje pendiente del bot y su trabajo; devuelve el mensaje."""
+        placeholder = Message(content=PENDING_REPLY, author="assistant", user=user, pending=True)
+        db.session.add(placeholder)
+        db.session.flush()
+        job = ChatJob(user_id=user.id, message_id=placeholder.id, user_message=user_message)
+        db.session.add(job)
+        db.session.commit()
+
+        metrics.incr("jobs.enqueued")
+        self._submit(job.id)
+        return placeholder
+
+    def recover(self):
+        """Vuelve a encolar trabajos pendientes o que quedaron a medias hace demasiado."""
+        stale = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        db.session.execute(
+            update(ChatJob)
+            .where(ChatJob.status == "running", ChatJob.started_at < stale)
+            .values(status="pending")
+        )
+        db.session.commit()
+        job_ids = db.session.scalars(select(ChatJob.id).where(ChatJob.status == "pending")).all()
+        for job_id in job_ids:
+            self._submit(job_id)
+        return len(job_ids)
+
+    def queue_depth(self):
+        return self._executor._work_queue.qsize()
+
+    def _submit(self, job_id, delay=0):
+        if delay:
+            timer = threading.Timer(delay, self._executor.submit, args=(self._run, job_id))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"[jobs] Error inesperado en el trabajo {job_id}: {e}")
+
+    def _claim(self, job_id):
+        result = db.session.execute(
+            update(ChatJob)
+            .where(ChatJob.id == job_id, ChatJob.status == "pending")
+            .values(status="running", started_at=datetime.utcnow(), attempts=ChatJob.attempts + 1)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _run_job(self, job_id):
+        from .chatbot import responder
+
+        if not self._claim(job_id):
+            return
+        job = db.session.get(ChatJob, job_id)
+        if job is None:
+            # El usuario limpió el chat después de que se reclamara
+            return
+        user = db.session.get(User, job.user_id)
+        if user is None:
+            logger.warning(f"[jobs] El trabajo {job_id} es de un usuario que ya no existe")
+            metrics.incr("jobs.failed")
+            self._finish(job_id, job.message_id, FAILED_REPLY, "failed", error="usuario inexistente")
+            return
+        if job.attempts == 1:
+            metrics.observe("jobs.queue_wait", (job.started_at - job.created_at).total_seconds())
+
+        last_attempt = job.attempts >= self.max_attempts
+        start = time.perf_counter()
+        try:
+            # En el último intento los errores transitorios de OpenAI ya no se
+            # relanzan y el usuario recibe el mensaje de error habitual
+            reply = responder(user, job.user_message, reintentar=not last_attempt)
+        except Exception as e:
+            db.session.rollback()
+            if last_attempt:
+                logger.error(f"[jobs] El trabajo {job_id} falló definitivamente: {e}")
+                metrics.incr("jobs.failed")
+                self._finish(job_id, job.message_id, FAILED_REPLY, "failed", error=str(e))
+            else:
+                logger.warning(f"[jobs] Reintentando el trabajo {job_id} (intento {job.attempts}): {e}")
+                metrics.incr("jobs.retried")
+                db.session.execute(
+                    update(ChatJob).where(ChatJob.id == job_id).values(status="pending", error=str(e))
+                )
+                db.session.commit()
+                self._submit(job_id, delay=self.retry_delay * 2 ** (job.attempts - 1))
+            return
+
+        metrics.observe("jobs.run_time", time.perf_counter() - start)
+        metrics.incr("jobs.completed")
+        self._finish(job_id, job.message_id, reply, "done")
+        metrics.observe("jobs.latency", (datetime.utcnow() - job.created_at).total_seconds())
+
+    def _finish(self, job_id, message_id, reply, status, error=None):
+        # Con UPDATE directos: si el usuario limpió el chat mientras tanto,
+        # simplemente no se actualiza ninguna fila
+        db.session.execute(
+            update(Message).where(Message.id == message_id).values(content=reply, pending=False)
+        )
+        db.session.execute(
+            update(ChatJob)
+            .where(ChatJob.id == job_id)
+            .values(status=status, finished_at=datetime.utcnow(), error=error)
+        )
+        db.session.commit()
+
+
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Devuelve la cola de la app actual, creándola la primera vez en cada proceso.
+    Se crea de forma perezosa para que con preload_app los hilos nazcan
+    después del fork, dentro de cada worker.
+    """
+    app = current_app._get_current_object()
+    queue = app.extensions.get("chat_jobs")
+    if queue is not None and queue.pid == os.getpid():
+        return queue
+
+    with _queue_lock:
+        queue = app.extensions.get("chat_jobs")
+        if queue is None or queue.pid != os.getpid():
+            queue = ChatJobQueue(
+                app,
+                max_workers=app.config["JOB_WORKERS"],
+                max_attempts=app.config["JOB_MAX_ATTEMPTS"],
+                retry_delay=app.config["JOB_RETRY_DELAY"],
+            )
+            app.extensions["chat_jobs"] = queue
+            metrics.gauge("jobs.queue_depth", queue.queue_depth)
+            recovered = queue.recover()
+            if recovered:
+                logger.info(f"[jobs] {recovered} trabajos pendientes vueltos a encolar")
+    return queue
+
+
+def iniciar_trabajos(app):
+    """
+    Crea la cola del proceso y retoma los trabajos que quedaron pendientes
+    antes de un reinicio, sin esperar al próximo mensaje lento. Se llama al
+    arrancar cada worker (post_fork en gunicorn.conf.py).
+    """
+    if not app.config["CHAT_JOBS"]:
+        return None
+    with app.app_context():
+        return get_job_queue()
@@ -0,0 +1,205 @@
+"""
+Logging sin bloquear el hilo de la petición.
+
+Los registros se encolan (QueueHandler) y un hilo aparte (QueueListener) los
+formatea y los escribe en stderr, así un disco lento o un recolector de logs
+atascado no se suma a la latencia del chat:
+
+- El mensaje se formatea en el hilo de escritura, no en el de la petición:
+  en las líneas frecuentes se usa logger.info("... %s", valor) en vez de un
+  f-string. Los argumentos deben ser valores simples (str, números), no
+  objetos que cambien o consulten la base al convertirse a texto.
+- Si la cola (LOG_QUEUE_SIZE registros) está llena, el registro se descarta y
+  se cuenta en la métrica logging.dropped; nunca se espera.
+- LOG_SAMPLING deja pasar solo una fracción de las líneas INFO/DEBUG de los
+  loggers indicados, p. ej. "movie_bot.chatbot=0.1,movie_bot.query_counter=0.1"
+  (se aplica el prefijo más largo). WARNING y superiores siempre se escriben.
+- LOG_FORMAT=text (por defecto) mantiene el formato de siempre;
+  LOG_FORMAT=json escribe un objeto JSON por línea (con los campos de
+  ``extra=``), para los recolectores que lo esperan.
+
+Con LOG_QUEUE_SIZE=0 se escribe en el mismo hilo, como antes. Con
+preload_app el hilo de escritura no sobrevive al fork: cada worker crea su
+cola y su hilo al registrar su primera línea.
+"""
+import os
+import sys
+import json
+import queue
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from .metrics import metrics
+
+TEXT_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+# Atributos propios de LogRecord; el resto viene de extra= y se añade al JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objeto JSON por registro: ts, level, logger, msg, pid, thread y los extra."""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in data:
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar una fracción de los registros INFO/DEBUG según el logger."""
+
+    def __init__(self, rates):
+        super().__init__()
+        # Prefijos más largos primero para que gane el más específico
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+        self._resolved = {}
+
+    def _rate(self, name):
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            for prefix, value in self.rates:
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = value
+                    break
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        metrics.incr("logging.sampled_out")
+        return False
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Con la cola llena, put_nowait fallaría: se espera a que haya lugar
+        self.queue.put(self._sentinel)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    QueueHandler con cola acotada que descarta en vez de esperar y que no
+    formatea el mensaje al encolar. La cola y el hilo se crean de nuevo en
+    cada proceso (ver get_job_queue en jobs.py).
+    """
+
+    def __init__(self, target, maxsize):
+        self.target = target
+        self.maxsize = maxsize
+        self.pid = None
+        self.listener = None
+        self._start_lock = threading.Lock()
+        super().__init__(None)
+        self._start()
+
+    def _start(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = _Listener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def prepare(self, record):
+        # Sin formatear: getMessage() y el traceback se resuelven en el hilo de escritura
+        return record
+
+    def enqueue(self, record):
+        if self.pid != os.getpid():
+            with self._start_lock:
+                if self.pid != os.getpid():
+                    self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("logging.dropped")
+
+    def close(self):
+        # Vacía la cola (solo en el proceso dueño del hilo); logging.shutdown()
+        # lo llama al salir
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
+
+
+def parse_sampling(value):
+    """"a=0.1,b.c=0.5" -> {"a": 0.1, "b.c": 0.5}"""
+    rates = {}
+    for item in (value or "").split(","):
+        name, sep, rate = item.strip().partition("=")
+        if sep and name:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+_installed = {"key": None, "handler": None}
+_install_lock = threading.Lock()
+
+
+def instalar_logging(level="INFO", fmt="text", queue_size=10000, sampling=None, stream=None):
+    """
+    Reemplaza los handlers del logger raíz. Es global del proceso: si ya está
+    instalado con los mismos parámetros no hace nada. Devuelve el handler.
+    """
+    key = (level, fmt, queue_size, tuple(sorted((sampling or {}).items())), id(stream))
+    with _install_lock:
+        if _installed["key"] == key:
+            return _installed["handler"]
+
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+        handler = AsyncQueueHandler(target, queue_size) if queue_size > 0 else target
+        if sampling:
+            handler.addFilter(SamplingFilter(sampling))
+
+        root = logging.getLogger()
+        for old in list(root.handlers):
+            root.removeHandler(old)
+            if old is _installed["handler"]:
+                old.close()
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _installed.update(key=key, handler=handler)
+        if isinstance(handler, AsyncQueueHandler):
+            metrics.gauge("logging.queue_depth", lambda: handler.queue.qsize())
+        return handler
+
+
+def logs_config(app):
+    app.config.setdefault("LOG_LEVEL", os.getenv("LOG_LEVEL", "INFO").upper())
+    app.config.setdefault("LOG_FORMAT", os.getenv("LOG_FORMAT", "text").lower())
+    app.config.setdefault("LOG_QUEUE_SIZE", int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+    app.config.setdefault(
+        "LOG_SAMPLING", os.getenv(
+            "LOG_SAMPLING", "movie_bot.chatbot=0.1,movie_bot.intent_model=0.1,movie_bot.query_counter=0.1"
+        )
+    )
+
+    instalar_logging(
+        level=app.config["LOG_LEVEL"],
+        fmt=app.config["LOG_FORMAT"],
+        queue_size=app.config["LOG_QUEUE_SIZE"],
+        sampling=parse_sampling(app.config["LOG_SAMPLING"]),
+    )
@@ -0,0 +1,60 @@
+import threading
+from collections import deque
+
+
+class Metrics:
+    """
+    Contadores y tiempos en memoria del proceso, expuestos en /metrics.
+
+    Cada worker de gunicorn tiene los suyos; para tiempos se guarda una ventana
+    con las últimas observaciones y se resumen en count/avg/p50/p95/max.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._counters = {}
+        self._timings = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        with self._lock:
+            values = self._timings.get(name)
+            if values is None:
+                values = self._timings[name] = deque(maxlen=self.window)
+            values.append(seconds)
+
+    def gauge(self, name, fn):
+        """Registra una función que devuelve el valor actual de una métrica."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self):
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: sorted(values) for name, values in self._timings.items()}
+            gauges = dict(self._gauges)
+
+        summary = {}
+        for name, values in timings.items():
+            if not values:
+                continue
+            summary[name] = {
+                "count": len(values),
+                "avg": sum(values) / len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            }
+        return {
+            "counters": counters,
+            "timings": summary,
+            "gauges": {name: fn() for name, fn in gauges.items()},
+        }
+
+
+metrics = Metrics()
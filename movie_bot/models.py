@@ -1,7 +1,7 @@
 # movie_bot/models.py
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from .db import db
+from .passwords import hash_password, needs_rehash, verify_password
 from datetime import datetime
 
 class User(db.Model, UserMixin):
@@ -18,11 +18,15 @@ class User(db.Model, UserMixin):
     messages = db.relationship('Message', backref='user', lazy=True)
     recommendations = db.relationship('Recommendation', backref='user', lazy=True)
 
+    # El hash se calcula en el pool de procesos de passwords.py
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -35,6 +39,11 @@ class Message(db.Model):
     content = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # True mientras la respuesta la está generando un trabajo en segundo plano
+    pending = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    # Intención con la que el chat atendió el mensaje del usuario ("gpt" si fue
+    # a GPT); entrena el clasificador local (ver intent_model.py)
+    intent = db.Column(db.String(30), nullable=True)
 
     def __repr__(self):
         return f"<Message {self.id} by {self.author} at {self.timestamp}>"
@@ -47,6 +56,100 @@ class Recommendation(db.Model):
     movie_id = db.Column(db.Integer, nullable=False)  # ID de TMDB
     movie_title = db.Column(db.String(255), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Ids de géneros de TMDB separados por comas; forman el perfil del ranking
+    # (ver ranking.pesos_de_historial). Vacío si TMDB no los mandó.
+    genre_ids = db.Column(db.String(100), nullable=True)
 
     def __repr__(self):
         return f"<Recommendation {self.movie_title} (ID: {self.movie_id}) for User {self.user_id}>"
+
+class ChatJob(db.Model):
+    __tablename__ = 'chat_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Mensaje del bot (pendiente) que se completa cuando termina el trabajo
+    message_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=False)
+    user_message = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ChatJob {self.id} ({self.status}) for Message {self.message_id}>"
+
+# Índice de co-recomendaciones (ver coindex.py): películas que se recomendaron
+# a los mismos usuarios. Se actualiza con "flask coindex".
+class CoItem(db.Model):
+    __tablename__ = 'co_items'
+
+    movie_id = db.Column(db.Integer, primary_key=True)  # ID de TMDB
+    movie_title = db.Column(db.String(255), nullable=False)
+    # Título normalizado con limpiar_texto, para buscar por lo que escribe el usuario
+    title_key = db.Column(db.String(255), nullable=False, index=True)
+    users = db.Column(db.Integer, nullable=False, default=0)  # usuarios a los que se recomendó
+
+    def __repr__(self):
+        return f"<CoItem {self.movie_title} (ID: {self.movie_id})>"
+
+class CoPair(db.Model):
+    __tablename__ = 'co_pairs'
+
+    # Se guardan ambos sentidos (a, b) y (b, a) para leer los vecinos con la clave primaria
+    movie_a = db.Column(db.Integer, primary_key=True)
+    movie_b = db.Column(db.Integer, primary_key=True)
+    shared_users = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CoPair {self.movie_a}-{self.movie_b}: {self.shared_users}>"
+
+# Películas de cada usuario ya contadas en el índice. Borrar el historial
+# (clear_chat) no las toca, así una película que se vuelve a recomendar no
+# se cuenta dos veces.
+class CoSeen(db.Model):
+    __tablename__ = 'co_seen'
+
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    movie_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+class CoIndexState(db.Model):
+    __tablename__ = 'co_index_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Última fila de recommendations ya incorporada al índice
+    last_recommendation_id = db.Column(db.Integer, nullable=False, default=0)
+
+# Catálogo completo de películas de TMDB, cargado desde los exports diarios de
+# ids con "flask catalog" (ver catalog.py)
+class CatalogMovie(db.Model):
+    __tablename__ = 'catalog_movies'
+
+    movie_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # ID de TMDB
+    original_title = db.Column(db.String(500), nullable=False)
+    # Título normalizado con limpiar_texto, como co_items.title_key
+    title_key = db.Column(db.String(500), nullable=False, index=True)
+    popularity = db.Column(db.Float, nullable=False, default=0.0)
+    adult = db.Column(db.Boolean, nullable=False, default=False)
+    video = db.Column(db.Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<CatalogMovie {self.original_title} (ID: {self.movie_id})>"
+
+class CatalogIngestState(db.Model):
+    __tablename__ = 'catalog_ingest_state'
+
+    # Nombre del archivo de export; con su tamaño se reconoce el mismo archivo
+    source = db.Column(db.String(255), primary_key=True)
+    file_size = db.Column(db.BigInteger, nullable=False)
+    # Líneas del archivo ya incorporadas (punto de reanudación)
+    lines_done = db.Column(db.Integer, nullable=False, default=0)
+    # Filas escritas (una película repetida en el archivo cuenta cada vez)
+    upserts = db.Column(db.Integer, nullable=False, default=0)
+    finished = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CatalogIngestState {self.source}: {self.lines_done} líneas>"
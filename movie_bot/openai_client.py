@@ -0,0 +1,126 @@
+import time
+import logging
+import threading
+
+from flask import current_app
+
+from . import cassette
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# El paquete openai (con aiohttp) tarda en importarse; se carga recién
+# en la primera llamada para que el arranque de los workers sea rápido.
+_openai = None
+
+
+def get_openai():
+    """Importa y configura el módulo openai la primera vez que se usa."""
+    global _openai
+    if _openai is None:
+        import openai
+        openai.api_key = current_app.config.get("OPENAI_API_KEY")
+        _openai = openai
+    return _openai
+
+
+class OpenAISaturated(Exception):
+    """No hay capacidad para otra llamada a OpenAI: la cola está llena o venció el plazo."""
+
+
+class AdmissionLimiter:
+    """
+    Control de admisión: como mucho ``max_concurrent`` llamadas a la vez y
+    ``max_waiting`` esperando turno durante ``wait_timeout`` segundos. Lo que
+    no entra se rechaza enseguida para no dejar a todos los hilos del worker
+    bloqueados esperando a OpenAI.
+    """
+
+    def __init__(self, max_concurrent=8, max_waiting=16, wait_timeout=2.0):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """True si la llamada puede seguir; False si se rechaza."""
+        start = time.perf_counter()
+        with self._cond:
+            if self.active < self.max_concurrent and not self.waiting:
+                self.active += 1
+                admitted = True
+            elif self.waiting >= self.max_waiting:
+                admitted = False
+            else:
+                self.waiting += 1
+                try:
+                    admitted = self._cond.wait_for(
+                        lambda: self.active < self.max_concurrent, timeout=self.wait_timeout
+                    )
+                    if admitted:
+                        self.active += 1
+                finally:
+                    self.waiting -= 1
+
+        if not admitted:
+            metrics.incr("openai.shed")
+            return False
+        metrics.incr("openai.served")
+        metrics.observe("openai.admission_wait", time.perf_counter() - start)
+        return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Limitador del proceso, creado con la configuración de la app la primera vez."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                config = current_app.config
+                _limiter = AdmissionLimiter(
+                    max_concurrent=config["OPENAI_MAX_CONCURRENT"],
+                    max_waiting=config["OPENAI_MAX_WAITING"],
+                    wait_timeout=config["OPENAI_WAIT_TIMEOUT"],
+                )
+                metrics.gauge("openai.in_flight", lambda: _limiter.active)
+                metrics.gauge("openai.waiting", lambda: _limiter.waiting)
+    return _limiter
+
+
+def chat_completion(messages, model="gpt-3.5-turbo"):
+    """
+    Envía la conversación a OpenAI y devuelve el texto de la respuesta.
+    Lanza OpenAISaturated si el control de admisión rechaza la llamada.
+    """
+    limiter = get_limiter()
+    if not limiter.acquire():
+        raise OpenAISaturated()
+    tape = cassette.active()
+    try:
+        if tape is not None and tape.replaying:
+            return tape.replay("openai", *cassette.openai_keys(model, messages))[1]
+        start = time.perf_counter()
+        openai = get_openai()
+        response = openai.ChatCompletion.create(model=model, messages=messages)
+    finally:
+        limiter.release()
+    content = response['choices'][0]['message']['content']
+    if tape is not None:
+        _grabar(tape, model, messages, content, time.perf_counter() - start)
+    return content
+
+
+def _grabar(tape, model, messages, content, latency):
+    key, alt = cassette.openai_keys(model, messages)
+    tape.record("openai", key, 200, content, latency, alt=alt)
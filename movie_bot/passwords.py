@@ -0,0 +1,138 @@
+"""
+Hash de contraseñas fuera del worker web.
+
+generate_password_hash/check_password_hash de werkzeug son lentas a propósito
+(cientos de ms de CPU). Aquí se ejecutan en un pool de procesos acotado
+(PASSWORD_HASH_WORKERS procesos y como mucho PASSWORD_HASH_QUEUE hashes
+pendientes), así una ráfaga de logins no se come la CPU de los hilos que
+atienden el chat. Con PASSWORD_HASH_WORKERS=0 se calcula en el mismo hilo.
+
+El algoritmo y su costo se configuran con PASSWORD_METHOD, escrito completo
+como lo guarda werkzeug (p. ej. "scrypt:32768:8:1" o
+"pbkdf2:sha256:1000000"), y PASSWORD_SALT_LENGTH. Si cambian, los hashes
+viejos se siguen aceptando y se recalculan en el siguiente login correcto
+(ver needs_rehash()).
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashBusy(Exception):
+    """Hay demasiados hashes pendientes; el pool no lo resolvió a tiempo."""
+
+
+class HashPool:
+    """
+    Pool de procesos para hashear. Los procesos se lanzan con "spawn" (no se
+    heredan hilos ni conexiones del worker), así que un script propio que use
+    la app con el pool activo necesita el guard ``if __name__ == "__main__"``.
+    El semáforo acota los hashes en vuelo, incluidos los que esperan turno;
+    un hash ocupa su lugar hasta que el proceso termina, aunque quien lo pidió
+    ya se haya rendido.
+    """
+
+    def __init__(self, workers=2, max_pending=8, timeout=10.0):
+        self.pid = os.getpid()
+        self.timeout = timeout
+        self.pending = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _done(self, future=None):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def run(self, fn, *args):
+        """
+        Resultado de ``fn(*args)`` en el pool. Esperar lugar y esperar el
+        resultado comparten un solo plazo de ``timeout`` segundos; si se
+        agota, PasswordHashBusy (las vistas responden 503).
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        if not self._slots.acquire(timeout=self.timeout):
+            metrics.incr("passwords.busy")
+            raise PasswordHashBusy()
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._done()
+            raise
+        future.add_done_callback(self._done)
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            future.cancel()
+            metrics.incr("passwords.timeout")
+            raise PasswordHashBusy()
+        finally:
+            metrics.observe("passwords.hash_time", time.perf_counter() - start)
+
+
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Pool de la app actual, creado la primera vez en cada proceso (como la cola de jobs.py)."""
+    app = current_app._get_current_object()
+    workers = app.config["PASSWORD_HASH_WORKERS"]
+    if not workers:
+        return None
+    pool = app.extensions.get("password_pool")
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _pool_lock:
+        pool = app.extensions.get("password_pool")
+        if pool is None or pool.pid != os.getpid():
+            pool = HashPool(
+                workers=workers,
+                max_pending=app.config["PASSWORD_HASH_QUEUE"],
+                timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+            )
+            app.extensions["password_pool"] = pool
+            metrics.gauge("passwords.pending", lambda: pool.pending)
+    return pool
+
+
+def _run(fn, *args):
+    pool = _get_pool()
+    if pool is None:
+        return fn(*args)
+    return pool.run(fn, *args)
+
+
+def hash_password(password):
+    """Hash de la contraseña con el método y la sal configurados."""
+    config = current_app.config
+    return _run(generate_password_hash, password, config["PASSWORD_METHOD"], config["PASSWORD_SALT_LENGTH"])
+
+
+def verify_password(pwhash, password):
+    """True si la contraseña corresponde al hash (con cualquier método soportado)."""
+    return _run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash):
+    """True si el hash se calculó con otro método, otro costo u otro largo de sal."""
+    config = current_app.config
+    method, _, rest = pwhash.partition("$")
+    salt = rest.partition("$")[0]
+    return method != config["PASSWORD_METHOD"] or len(salt) != config["PASSWORD_SALT_LENGTH"]
@@ -0,0 +1,120 @@
+"""
+Contador de consultas SQL por petición, con eventos de SQLAlchemy.
+
+Al terminar cada petición se registra cuántas consultas hizo y cuánto tiempo
+pasó en la base de datos, junto con la ruta y la intención del chat (si la
+hubo). Las consultas de hilos sin petición (cola de trabajos) no se cuentan.
+
+Para vigilar regresiones (N+1, commits de más) max_queries() falla si un
+bloque supera un presupuesto:
+
+    with max_queries(8, "POST /chat"):
+        client.post("/chat", data={"message": "hola"})
+"""
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Un contexto por petición: cada hilo del worker ve solo sus consultas
+_current = ContextVar("query_stats", default=None)
+
+
+class QueryStats:
+    """Consultas y tiempo en BD de un bloque; también suma en el bloque que lo contiene."""
+
+    __slots__ = ("count", "seconds", "statements", "tags", "parent")
+
+    def __init__(self, parent=None, record=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if record else None
+        self.tags = {}
+        self.parent = parent
+
+    def add(self, statement, seconds):
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            if stats.statements is not None:
+                stats.statements.append(statement)
+            stats = stats.parent
+
+
+def anotar(name, value):
+    """Añade una etiqueta (p. ej. la intención del chat) al registro de la petición."""
+    stats = _current.get()
+    if stats is not None:
+        stats.tags[name] = value
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get("query_start"):
+        stats.add(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+
+@contextmanager
+def contar_consultas(record=False):
+    """Cuenta las consultas del bloque; devuelve el QueryStats."""
+    stats = QueryStats(parent=_current.get(), record=record)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def max_queries(limit, label="bloque"):
+    """Lanza AssertionError si el bloque hace más de ``limit`` consultas SQL."""
+    with contar_consultas(record=True) as stats:
+        yield stats
+    if stats.count > limit:
+        listado = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(stats.statements))
+        raise AssertionError(f"{label}: {stats.count} consultas SQL (máximo {limit})\n{listado}")
+
+
+def query_counter_config(app):
+    app.config.setdefault("SQL_QUERY_LOG", True)
+    if not app.config["SQL_QUERY_LOG"]:
+        return
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def empezar_conteo():
+        request.query_stats = QueryStats(parent=_current.get())
+        request.query_stats_token = _current.set(request.query_stats)
+
+    @app.teardown_request
+    def registrar_conteo(exc=None):
+        stats = getattr(request, "query_stats", None)
+        if stats is None:
+            return
+        _current.reset(request.query_stats_token)
+        if not stats.count:
+            return
+        route = request.url_rule.rule if request.url_rule else request.path
+        tags = "".join(f" {k}={v}" for k, v in stats.tags.items())
+        logger.info(
+            "[sql] %s %s%s: %d consultas, %.1f ms", request.method, route, tags, stats.count, stats.seconds * 1000
+        )
+        metrics.observe(f"sql.queries {request.method} {route}", stats.count)
+        metrics.observe(f"sql.time {request.method} {route}", stats.seconds)
@@ -0,0 +1,192 @@
+"""
+Ranking local de recomendaciones con NumPy.
+
+Puntúa películas candidatas (sacadas de los listados de TMDB en caché) según
+los géneros favorito y a evitar del usuario, los géneros de lo que ya se le
+recomendó (guardados con cada Recommendation) y las características de cada película (puntuación, popularidad y
+antigüedad). Todo el cálculo es vectorial, así que rankear cientos de miles de
+filas lleva milisegundos y no hace falta llamar a GPT para un "recomiéndame algo".
+"""
+from datetime import date
+
+import numpy as np
+
+from .cache import TTLCache
+from .text_utils import limpiar_texto, GENRE_MAP
+from .tmdb_api import TMDB_LIST_TTL, get_candidate_movies
+
+# Géneros de películas de TMDB; cada uno es una columna de la matriz de géneros
+TMDB_GENRE_IDS = (
+    28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37
+)
+_GENRE_COLUMN = {genre_id: i for i, genre_id in enumerate(TMDB_GENRE_IDS)}
+
+# Pesos de cada término de la puntuación
+FAVORITE_WEIGHT = 1.0
+DISLIKED_WEIGHT = -2.0
+HISTORY_WEIGHT = 0.5
+QUALITY_WEIGHT = 1.0
+POPULARITY_WEIGHT = 0.5
+RECENCY_WEIGHT = 0.7
+# Días en los que el peso por novedad cae a 1/e
+RECENCY_DAYS = 180.0
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _dias(release_date):
+    """Días desde 1970 de una fecha "AAAA-MM-DD"; NaN si falta o es inválida."""
+    try:
+        return float((date.fromisoformat(release_date) - _EPOCH).days)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class CandidateSet:
+    """
+    Películas candidatas en forma de columnas NumPy: ids, matriz de géneros
+    (una fila por película), puntuación media, popularidad y fecha de estreno
+    en días. ``titles`` y ``release_dates`` se conservan para la respuesta.
+    """
+
+    def __init__(self, ids, genres, vote, popularity, release_days, titles=None, release_dates=None):
+        self.ids = ids
+        self.genres = genres
+        self.vote = vote
+        self.popularity = popularity
+        self.release_days = release_days
+        self.titles = titles
+        self.release_dates = release_dates
+
+    @classmethod
+    def from_movies(cls, movies):
+        """Construye el conjunto a partir de registros Movie, sin ids repetidos."""
+        seen = set()
+        unique = []
+        for movie in movies:
+            if movie.id in seen:
+                continue
+            seen.add(movie.id)
+            unique.append(movie)
+
+        n = len(unique)
+        genres = np.zeros((n, len(TMDB_GENRE_IDS)), dtype=np.float32)
+        for row, movie in enumerate(unique):
+            for genre_id in movie.genre_ids:
+                column = _GENRE_COLUMN.get(genre_id)
+                if column is not None:
+                    genres[row, column] = 1.0
+
+        return cls(
+            ids=np.fromiter((m.id for m in unique), dtype=np.int64, count=n),
+            genres=genres,
+            vote=np.fromiter((m.vote_average or 0 for m in unique), dtype=np.float32, count=n),
+            popularity=np.fromiter((m.popularity or 0 for m in unique), dtype=np.float32, count=n),
+            release_days=np.fromiter((_dias(m.release_date) for m in unique), dtype=np.float32, count=n),
+            titles=[m.title for m in unique],
+            release_dates=[m.release_date for m in unique],
+        )
+
+    def genre_ids(self, i):
+        """Ids de TMDB de los géneros de la fila ``i``."""
+        return tuple(TMDB_GENRE_IDS[c] for c in np.flatnonzero(self.genres[i]))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def genero_a_id(texto):
+    """Id de TMDB del primer género de GENRE_MAP mencionado en un texto libre."""
+    if not texto:
+        return None
+    texto = limpiar_texto(texto)
+    for genre_word, genre_id in GENRE_MAP.items():
+        if genre_word in texto:
+            return genre_id
+    return None
+
+
+def pesos_de_genero(favorite_id=None, disliked_id=None):
+    """Vector de pesos por género a partir del perfil del usuario."""
+    weights = np.zeros(len(TMDB_GENRE_IDS), dtype=np.float32)
+    if favorite_id in _GENRE_COLUMN:
+        weights[_GENRE_COLUMN[favorite_id]] += FAVORITE_WEIGHT
+    if disliked_id in _GENRE_COLUMN:
+        weights[_GENRE_COLUMN[disliked_id]] += DISLIKED_WEIGHT
+    return weights
+
+
+def pesos_de_historial(genre_lists):
+    """
+    Vector de pesos por género a partir de los géneros de lo ya recomendado
+    (una secuencia de ids por película). Se normaliza por el género más
+    frecuente para que el historial afine el perfil sin dominarlo.
+    """
+    counts = np.zeros(len(TMDB_GENRE_IDS), dtype=np.float32)
+    for genre_ids in genre_lists:
+        for genre_id in genre_ids:
+            column = _GENRE_COLUMN.get(genre_id)
+            if column is not None:
+                counts[column] += 1.0
+    # Sin géneros en el historial (TMDB a veces no los manda) no se suma nada
+    return HISTORY_WEIGHT * counts / max(float(counts.max()), 1.0)
+
+
+def rank(candidates, genre_weights, history_ids=(), k=5, today=None):
+    """
+    Devuelve los índices (en ``candidates``) de las ``k`` películas con mejor
+    puntuación, de mayor a menor, excluyendo las de ``history_ids``.
+
+    ``genre_weights`` es el perfil completo: pesos_de_genero() más, si hay
+    historial, pesos_de_historial().
+    """
+    n = len(candidates)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    seen = np.isin(candidates.ids, np.fromiter(history_ids, dtype=np.int64))
+
+    if today is None:
+        today = (date.today() - _EPOCH).days
+    age = np.maximum(today - candidates.release_days, 0)
+    recency = np.nan_to_num(np.exp(-age / RECENCY_DAYS), nan=0.0)
+    popularity = np.log1p(candidates.popularity)
+    popularity /= max(float(popularity.max()), 1.0)
+
+    score = (
+        candidates.genres @ genre_weights
+        + QUALITY_WEIGHT * candidates.vote / 10
+        + POPULARITY_WEIGHT * popularity
+        + RECENCY_WEIGHT * recency
+    )
+
+    # Solo entre las no vistas: ni un NaN en la puntuación puede devolver una ya recomendada
+    unseen = np.flatnonzero(~seen)
+    k = min(k, len(unseen))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    score = np.nan_to_num(score[unseen], nan=-np.inf)
+    top = np.argpartition(-score, k - 1)[:k]
+    return unseen[top[np.argsort(-score[top], kind="stable")]]
+
+
+# Conjuntos de candidatas por (región, géneros): se reconstruyen solo cuando
+# expiran los listados de TMDB en los que se basan
+_candidates_cache = TTLCache(maxsize=256, ttl=TMDB_LIST_TTL)
+
+
+def candidatas(region, genre_ids=(), cached_only=False):
+    """
+    CandidateSet en caché con los listados de TMDB de una región y géneros.
+    Con ``cached_only`` no se llama a TMDB: se usan solo los listados que ya
+    están en memoria (y el resultado parcial no se guarda).
+    """
+    key = (region, tuple(sorted(genre_ids)))
+    candidates = _candidates_cache.get(key)
+    if candidates is None:
+        candidates = CandidateSet.from_movies(
+            get_candidate_movies(region=region, language="es", genre_ids=key[1], cached_only=cached_only)
+        )
+        if len(candidates) and not cached_only:
+            _candidates_cache.set(key, candidates)
+    return candidates
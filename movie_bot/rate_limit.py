@@ -0,0 +1,210 @@
+"""
+Límite de mensajes por usuario en /chat.
+
+Antes de procesar un mensaje (y de llamar a TMDB, a OpenAI o de escribir en
+la base) se comprueba:
+
+- Debounce: el mismo texto que el último mensaje aceptado del usuario, antes
+  de CHAT_DEBOUNCE segundos (doble envío del formulario, recargas).
+- Ventana deslizante: como mucho CHAT_RATE_LIMIT mensajes aceptados en los
+  últimos CHAT_RATE_WINDOW segundos.
+
+Por defecto el estado vive en memoria del proceso, así que cada worker de
+gunicorn cuenta por su lado. Con CHAT_RATE_LIMIT_DB (ruta de un archivo
+SQLite, como la caché de disco de TMDB) todos los workers comparten los
+contadores. Si SQLite falla el mensaje se acepta: el límite nunca rompe el
+chat. Con CHAT_RATE_LIMIT=0 no se limita.
+
+Métricas: chat_limit.allowed, chat_limit.rate_limited, chat_limit.debounced,
+chat_limit.errors y el tiempo de cada comprobación en chat_limit.check_time.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import deque
+
+from flask import current_app
+
+from .cache import TTLCache
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Usuarios distintos con estado en memoria (los inactivos expiran antes)
+MAX_USERS = 100000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_hits (
+    user_id INTEGER NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_chat_hits_user_ts ON chat_hits (user_id, ts);
+CREATE TABLE IF NOT EXISTS chat_last (
+    user_id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+"""
+
+
+def _digest(message):
+    return hashlib.blake2b(message.strip().lower().encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _UserWindow:
+    __slots__ = ("hits", "digest", "last")
+
+    def __init__(self):
+        self.hits = deque()
+        self.digest = None
+        self.last = 0.0
+
+
+class MemoryRateLimiter:
+    """Ventana deslizante y debounce por usuario en memoria del proceso."""
+
+    def __init__(self, limit, window, debounce, timer=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.debounce = debounce
+        self.timer = timer
+        self._users = TTLCache(maxsize=MAX_USERS, ttl=max(window, debounce))
+        self._lock = threading.Lock()
+
+    def check(self, user_id, message):
+        """
+        None si el mensaje se acepta (y queda contado); si no, (motivo,
+        segundos hasta poder reintentar) con motivo "debounce" o "rate".
+        """
+        now = self.timer()
+        digest = _digest(message)
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None:
+                state = _UserWindow()
+            if state.digest == digest and now - state.last < self.debounce:
+                return "debounce", self.debounce - (now - state.last)
+
+            while state.hits and state.hits[0] <= now - self.window:
+                state.hits.popleft()
+            if len(state.hits) >= self.limit:
+                return "rate", state.hits[0] + self.window - now
+
+            state.hits.append(now)
+            state.digest = digest
+            state.last = now
+            self._users.set(user_id, state)
+        return None
+
+    def __len__(self):
+        return len(self._users)
+
+
+class SQLiteRateLimiter:
+    """
+    Lo mismo que MemoryRateLimiter, compartido entre procesos en un archivo
+    SQLite (WAL). Cada comprobación es una transacción BEGIN IMMEDIATE, así
+    dos workers no aceptan a la vez el último mensaje de la ventana.
+    """
+
+    def __init__(self, path, limit, window, debounce, timer=time.time):
+        self.path = path
+        self.limit = limit
+        self.window = window
+        self.debounce = debounce
+        self.timer = timer
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        # Una conexión por hilo, y nueva tras un fork (como DiskCache)
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn
+
+    def check(self, user_id, message):
+        now = self.timer()
+        digest = _digest(message)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            last = conn.execute("SELECT digest, ts FROM chat_last WHERE user_id = ?", (user_id,)).fetchone()
+            if last is not None and last[0] == digest and now - last[1] < self.debounce:
+                return "debounce", self.debounce - (now - last[1])
+
+            conn.execute("DELETE FROM chat_hits WHERE user_id = ? AND ts <= ?", (user_id, now - self.window))
+            count, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(ts) FROM chat_hits WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if count >= self.limit:
+                return "rate", oldest + self.window - now
+
+            conn.execute("INSERT INTO chat_hits (user_id, ts) VALUES (?, ?)", (user_id, now))
+            conn.execute(
+                "INSERT OR REPLACE INTO chat_last (user_id, digest, ts) VALUES (?, ?, ?)", (user_id, digest, now)
+            )
+            conn.execute("COMMIT")
+            return None
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+
+
+def limitar_chat(user_id, message):
+    """
+    None si el mensaje de ``user_id`` se puede procesar; si no, (motivo,
+    segundos para reintentar). Ver el docstring del módulo.
+    """
+    limiter = current_app.extensions.get("chat_rate_limiter")
+    if limiter is None:
+        return None
+
+    start = time.perf_counter()
+    try:
+        decision = limiter.check(user_id, message)
+    except sqlite3.Error as e:
+        logger.error(f"[rate_limit] Error al comprobar el límite de {user_id}: {e}")
+        metrics.incr("chat_limit.errors")
+        decision = None
+    metrics.observe("chat_limit.check_time", time.perf_counter() - start)
+
+    if decision is None:
+        metrics.incr("chat_limit.allowed")
+    elif decision[0] == "debounce":
+        metrics.incr("chat_limit.debounced")
+    else:
+        metrics.incr("chat_limit.rate_limited")
+    return decision
+
+
+def rate_limit_config(app):
+    app.config.setdefault("CHAT_RATE_LIMIT", int(os.getenv("CHAT_RATE_LIMIT", 20)))
+    app.config.setdefault("CHAT_RATE_WINDOW", float(os.getenv("CHAT_RATE_WINDOW", 60)))
+    app.config.setdefault("CHAT_DEBOUNCE", float(os.getenv("CHAT_DEBOUNCE", 5)))
+    app.config.setdefault("CHAT_RATE_LIMIT_DB", os.getenv("CHAT_RATE_LIMIT_DB", ""))
+
+    limit = app.config["CHAT_RATE_LIMIT"]
+    if not limit:
+        return
+    kwargs = {"limit": limit, "window": app.config["CHAT_RATE_WINDOW"], "debounce": app.config["CHAT_DEBOUNCE"]}
+    path = app.config["CHAT_RATE_LIMIT_DB"]
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        limiter = SQLiteRateLimiter(path, **kwargs)
+    else:
+        limiter = MemoryRateLimiter(**kwargs)
+        metrics.gauge("chat_limit.users", lambda: len(limiter))
+    app.extensions["chat_rate_limiter"] = limiter
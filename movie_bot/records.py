@@ -0,0 +1,61 @@
+"""
+Registros compactos de películas y proveedores de streaming.
+
+Las respuestas de TMDB traen una docena de campos por película; la capa de
+API (tmdb_api.py) y sus cachés guardan en su lugar un Movie con __slots__ y
+solo los campos que se usan. Las plantillas reciben diccionarios armados con
+los conversores movie_card() y carousel_banner() de tmdb_api.py.
+"""
+
+
+class Movie:
+    __slots__ = (
+        "id", "title", "release_date", "overview", "backdrop_path",
+        "vote_average", "popularity", "genre_ids",
+    )
+
+    def __init__(self, id, title, release_date=None, overview=None, backdrop_path=None,
+                 vote_average=None, popularity=None, genre_ids=()):
+        self.id = id
+        self.title = title
+        self.release_date = release_date
+        self.overview = overview
+        self.backdrop_path = backdrop_path
+        self.vote_average = vote_average
+        self.popularity = popularity
+        self.genre_ids = genre_ids
+
+    @classmethod
+    def from_tmdb(cls, result):
+        """Crea el registro a partir de un resultado de TMDB (búsqueda, listado o similares)."""
+        return cls(
+            id=result.get("id"),
+            title=result.get("title") or "Título desconocido",
+            release_date=result.get("release_date") or "Fecha desconocida",
+            overview=result.get("overview") or None,
+            backdrop_path=result.get("backdrop_path"),
+            vote_average=result.get("vote_average"),
+            popularity=result.get("popularity"),
+            genre_ids=tuple(result.get("genre_ids", ())),
+        )
+
+    def __repr__(self):
+        return f"<Movie {self.title} (ID: {self.id})>"
+
+
+def movies_from_tmdb(results):
+    """Lista de Movie a partir de los resultados de una respuesta de TMDB."""
+    return [Movie.from_tmdb(result) for result in results if result.get("id") is not None]
+
+
+class Provider:
+    __slots__ = ("id", "name", "logo")
+
+    def __init__(self, id, name, logo=None):
+        self.id = id
+        self.name = name
+        self.logo = logo
+
+    def __repr__(self):
+        return f"<Provider {self.name} (ID: {self.id})>"
+
@@ -0,0 +1,29 @@
+import unicodedata
+
+
+# ----------------------------------------------------------
+# Funciones de ayuda para limpiar texto y remover acentos
+# ----------------------------------------------------------
+def remover_acentos(texto: str) -> str:
+    normalized = unicodedata.normalize('NFD', texto)
+    sin_acentos = "".join(c for c in normalized if unicodedata.category(c) != 'Mn')
+    return unicodedata.normalize('NFC', sin_acentos)
+
+def limpiar_texto(texto: str, conservar: str = "") -> str:
+    texto = texto.lower()
+    for ch in ["¿", "?", "¡", "!", ",", ".", ":", ";"]:
+        if ch in conservar:
+            continue
+        texto = texto.replace(ch, "")
+    texto = remover_acentos(texto)
+    return texto.strip()
+
+# Diccionario para mapear géneros a sus IDs de TMDB
+GENRE_MAP = {
+    "accion": 28,
+    "terror": 27,
+    "comedia": 35,
+    "drama": 18,
+    "romance": 10749,
+    "suspenso": 53
+}
@@ -0,0 +1,191 @@
+"""
+Índice de trigramas en memoria para encontrar títulos con errores de tipeo.
+
+Cada título se normaliza como limpiar_texto y se parte en trigramas (cada
+palabra con dos espacios delante y uno detrás, como pg_trgm). Por trigrama se
+guarda un array compacto con las posiciones de los títulos que lo contienen.
+Una búsqueda cuenta coincidencias con NumPy empezando por los trigramas menos
+frecuentes y calcula la similitud de Jaccard exacta solo de los mejores
+candidatos, así que responde en menos de un milisegundo incluso con cientos
+de miles de títulos.
+
+El índice se llena con lo que devuelve TMDB y cada worker tiene el suyo, así
+que está acotado a MAX_TITLES títulos (500k por defecto, unos 125 MiB por
+worker; ver benchmarks/bench_title_index.py). Al llenarse se descarta la mitad
+más antigua recortando las listas de posiciones, sin volver a normalizar los
+títulos (unos 0,25 s con 500k, con las búsquedas en espera mientras tanto).
+"""
+import os
+import heapq
+import math
+import threading
+from array import array
+
+from .text_utils import limpiar_texto
+
+# Máximo de posiciones que se recorren al generar candidatos (los trigramas
+# muy comunes como "  l" o "la " pueden tener cientos de miles)
+MAX_POSTINGS_SCAN = 20000
+# Candidatos a los que se les calcula la similitud exacta
+MAX_CANDIDATES = 64
+# Títulos por proceso antes de descartar los más antiguos
+MAX_TITLES = int(os.getenv("TITLE_INDEX_MAX_TITLES", 500000))
+
+
+def trigramas(texto):
+    """Conjunto de trigramas de un texto ya normalizado."""
+    grams = set()
+    for word in texto.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TitleIndex:
+    """
+    Títulos conocidos (id de TMDB y título tal como lo devuelve TMDB) con sus
+    listas de trigramas. Seguro entre hilos: add() y la parte NumPy de las
+    búsquedas toman el mismo lock. Guarda como mucho ``maxsize`` títulos.
+    """
+
+    def __init__(self, maxsize=MAX_TITLES):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._ids = array("q")
+        self._titles = []
+        self._sizes = array("B")  # trigramas de cada título (hasta 255)
+        self._postings = {}  # trigrama -> array("I") de posiciones
+        self._known = set()  # ids ya indexados
+        self._exact = {}  # título normalizado -> título
+
+    def add(self, movie_id, title):
+        """Añade un título; si el id ya estaba, no hace nada."""
+        if not title or movie_id in self._known:
+            return
+        key = limpiar_texto(title)
+        grams = trigramas(key)
+        if not grams:
+            return
+        with self._lock:
+            if movie_id in self._known:
+                return
+            if len(self._ids) >= self.maxsize:
+                self._compact()
+            self._append(movie_id, title, key, grams)
+
+    def _append(self, movie_id, title, key, grams):
+        position = len(self._ids)
+        self._ids.append(movie_id)
+        self._titles.append(title)
+        self._sizes.append(min(len(grams), 255))
+        self._known.add(movie_id)
+        self._exact.setdefault(key, title)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(position)
+
+    def _compact(self):
+        # Con el lock tomado: conserva la mitad más reciente. Las posiciones
+        # de cada lista están ordenadas, así que basta con cortar cada lista
+        # y desplazarla, sin volver a normalizar los títulos
+        import numpy as np
+
+        cut = len(self._ids) - self.maxsize // 2
+        for gram, postings in list(self._postings.items()):
+            positions = np.frombuffer(postings, dtype=np.uint32)
+            start = int(np.searchsorted(positions, cut))
+            if start == len(positions):
+                del self._postings[gram]
+            else:
+                self._postings[gram] = array("I", (positions[start:] - cut).astype(np.uint32).tobytes())
+        self._ids = self._ids[cut:]
+        self._titles = self._titles[cut:]
+        self._sizes = self._sizes[cut:]
+        self._known = set(self._ids)
+        kept = set(self._titles)
+        self._exact = {key: title for key, title in self._exact.items() if title in kept}
+
+    def add_movies(self, movies):
+        """Añade los títulos de una lista de Movie (records.py)."""
+        for movie in movies:
+            self.add(movie.id, movie.title)
+
+    def search(self, text, k=5, min_score=0.3):
+        """
+        Los ``k`` títulos más parecidos a ``text``: lista de
+        (similitud, movie_id, título) de mayor a menor similitud.
+        """
+        query = trigramas(limpiar_texto(text))
+        if not query:
+            return []
+
+        # Con el lock tomado add() no puede redimensionar (ni compactar) los
+        # arrays mientras NumPy los lee sin copiarlos
+        with self._lock:
+            positions, scores = self._score(query, min_score)
+            matches = [
+                (score, self._ids[position], self._titles[position])
+                for position, score in zip(positions, scores)
+                if score >= min_score
+            ]
+        return heapq.nlargest(k, matches)
+
+    def _score(self, query, min_score):
+        # numpy se importa aquí para no cargarlo al arrancar los workers
+        import numpy as np
+
+        # Para llegar a min_score un título debe compartir al menos
+        # ceil(min_score * |query|) trigramas, así que basta con recorrer los
+        # |query| - ese mínimo + 1 trigramas menos frecuentes (prefix filtering)
+        required = max(1, math.ceil(min_score * len(query)))
+        postings = sorted(
+            (np.frombuffer(p, dtype=np.uint32) for p in (self._postings.get(g) for g in query) if p),
+            key=len,
+        )
+        prefix = len(query) - required + 1
+        selected = []
+        scanned = 0
+        for p in postings[:prefix]:
+            if scanned and scanned + len(p) > MAX_POSTINGS_SCAN:
+                break
+            selected.append(p)
+            scanned += len(p)
+        if not selected:
+            return [], []
+
+        candidates, shared = np.unique(np.concatenate(selected), return_counts=True)
+        if len(candidates) > MAX_CANDIDATES:
+            top = np.argpartition(-shared, MAX_CANDIDATES - 1)[:MAX_CANDIDATES]
+            candidates, shared = candidates[top], shared[top]
+
+        # Las posiciones de cada lista están ordenadas: el resto de trigramas
+        # se cuentan con búsqueda binaria
+        for p in postings[len(selected):]:
+            found = np.searchsorted(p, candidates)
+            shared += p[np.minimum(found, len(p) - 1)] == candidates
+
+        sizes = np.frombuffer(self._sizes, dtype=np.uint8)[candidates]
+        scores = shared / (len(query) + sizes - shared)
+        return candidates.tolist(), scores.tolist()
+
+    def exact(self, text):
+        """El título conocido que normalizado es igual a ``text``, o None."""
+        return self._exact.get(limpiar_texto(text))
+
+    def best(self, text, min_score=0.3):
+        """La mejor coincidencia (similitud, movie_id, título) o None."""
+        matches = self.search(text, k=1, min_score=min_score)
+        return matches[0] if matches else None
+
+    def __len__(self):
+        return len(self._ids)
+
+
+# Índice compartido del proceso: se llena con los títulos que devuelve TMDB
+titulos = TitleIndex()
@@ -1,13 +1,257 @@
 # movie_bot/tmdb_api.py
 import os
+import json
+import time
 import requests
 import logging
 
+from . import cassette
+from .cache import SingleFlight, TTLCache
+from .image_proxy import PUEDE_REDUCIR
+from .records import Movie, Provider, movies_from_tmdb
+from .title_index import titulos
+
 logger = logging.getLogger(__name__)
 
-def get_streaming_platforms(movie_name, region="US"):
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+# Segundos máximos de espera por cada petición a TMDB
+TMDB_TIMEOUT = float(os.getenv("TMDB_TIMEOUT", 10))
+
+# Los listados (populares, en cartelera, discover) cambian poco durante el día,
+# así que se guardan en memoria durante TMDB_LIST_TTL segundos.
+TMDB_LIST_TTL = int(os.getenv("TMDB_LIST_TTL", 600))
+_list_cache = TTLCache(maxsize=512, ttl=TMDB_LIST_TTL)
+
+# Las cachés guardan registros Movie/Provider (records.py), no el JSON de TMDB.
+# Listados: lista de Movie por URL y parámetros.
+# Proveedores de streaming por película para todas las regiones: {región: (provider_id, ...)}
+TMDB_PROVIDERS_TTL = int(os.getenv("TMDB_PROVIDERS_TTL", 6 * 60 * 60))
+_providers_cache = TTLCache(maxsize=20000, ttl=TMDB_PROVIDERS_TTL)
+# provider_id -> Provider; hay pocos proveedores, se comparten entre películas
+_providers = {}
+
+# Mejor coincidencia de /search/movie por consulta normalizada, y facetas de
+# detalle (videos y similares) por (movie_id, idioma). Se llenan juntas con
+# fetch_movie_bundle(), así una pregunta de seguimiento sobre la misma
+# película no hace ninguna llamada a TMDB.
+TMDB_DETAIL_TTL = int(os.getenv("TMDB_DETAIL_TTL", 6 * 60 * 60))
+_search_cache = TTLCache(maxsize=20000, ttl=TMDB_DETAIL_TTL)
+_videos_cache = TTLCache(maxsize=20000, ttl=TMDB_DETAIL_TTL)
+_similar_cache = TTLCache(maxsize=20000, ttl=TMDB_DETAIL_TTL)
+# Idioma con el que se piden los detalles cuando solo hacen falta los proveedores
+BUNDLE_LANGUAGE = "es"
+
+# Corrección de títulos con el índice de trigramas (title_index.py): se busca
+# en TMDB el texto del usuario (o el título conocido que normalizado es igual)
+# y solo si no hay resultados se prueba con la mejor coincidencia que alcance
+# FUZZY_MIN_SCORE. Un título bien escrito nunca se cambia por otro parecido
+# ("toy story" no es "Toy Story 2").
+FUZZY_MIN_SCORE = 0.4
+
+# Caché en disco compartida entre workers (disk_cache.py); la configura
+# create_app() y las cachés en memoria de arriba hacen de capa rápida
+_disk_cache = None
+
+# Peticiones idénticas concurrentes (mismo endpoint y parámetros) comparten una
+# sola llamada a TMDB, p. ej. cuando muchos usuarios preguntan por un estreno
+_flight = SingleFlight(metric="tmdb.coalesced")
+
+# Las imágenes se sirven a través del proxy local (/img/<size>/<path>)
+IMAGE_PROXY_PREFIX = "/img"
+DEFAULT_BANNER = "/static/images/default_banner.jpg"
+# Ancho en píxeles de las tarjetas de películas populares en landing.html
+CARD_IMAGE_WIDTH = 400
+
+
+def build_image_url(backdrop_path, size="w500", width=None):
+    """
+    Construye la URL del proxy de imágenes para un backdrop de TMDB.
+    Si se indica ``width`` (y Pillow está instalado), el proxy reduce la
+    imagen a ese ancho.
+    """
+    if not backdrop_path:
+        return DEFAULT_BANNER
+    url = f"{IMAGE_PROXY_PREFIX}/{size}/{backdrop_path.lstrip('/')}"
+    if width and PUEDE_REDUCIR:
+        url += f"?w={width}"
+    return url
+
+
+def movie_card(movie):
+    """Convierte un Movie en la tarjeta de Películas Populares de landing.html."""
+    return {
+        "id": movie.id,
+        "title": movie.title,
+        "description": movie.overview or "Sin descripción disponible.",
+        "image_url": build_image_url(movie.backdrop_path, width=CARD_IMAGE_WIDTH)
+    }
+
+
+def carousel_banner(movie):
+    """Convierte un Movie en un banner del carrusel de landing.html."""
+    return {
+        "id": movie.id,
+        "title": movie.title,
+        "short_description": (movie.overview or "Sin descripción disponible.")[:150],
+        "image_url": build_image_url(movie.backdrop_path)
+    }
+
+
+def _list_cache_key(url, params):
+    return (url, tuple(sorted((k, v) for k, v in params.items() if k != "api_key")))
+
+
+def cassette_key(url, params):
+    """Clave de una petición en el cassette: sin la URL base, para poder reproducirla contra otra."""
+    return repr(_list_cache_key(url.removeprefix(TMDB_BASE_URL), params))
+
+
+def set_disk_cache(cache):
+    global _disk_cache
+    _disk_cache = cache
+
+
+def _get_json(url, params, ttl):
+    """
+    GET a TMDB; devuelve (status_code, data). Las respuestas 200 se guardan
+    durante ``ttl`` segundos en la caché en disco, si está activa. Con un
+    cassette activo (cassette.py) la respuesta se graba o se reproduce.
+    """
+    key = repr(_list_cache_key(url, params))
+    cache = _disk_cache
+    if cache is not None:
+        body = cache.get(key)
+        if body is not None:
+            return 200, json.loads(body)
+
+    tape = cassette.active()
+    if tape is not None and tape.replaying:
+        status_code, body = tape.replay("tmdb", cassette_key(url, params))
+    else:
+        start = time.perf_counter()
+        response = requests.get(url, params=params, timeout=TMDB_TIMEOUT)
+        status_code, body = response.status_code, response.content
+        if tape is not None:
+            tape.record("tmdb", cassette_key(url, params), status_code, body, time.perf_counter() - start)
+
+    if status_code != 200:
+        return status_code, None
+    if cache is not None:
+        cache.set(key, body, ttl)
+    return 200, json.loads(body)
+
+
+def _fetch_list(url, params):
+    """
+    GET a un listado de TMDB usando la caché de listados.
+    Devuelve (status_code, movies) con una lista de Movie; solo se guardan en
+    caché las respuestas 200.
+    """
+    key = _list_cache_key(url, params)
+    movies = _list_cache.get(key)
+    if movies is not None:
+        return 200, movies
+    return _flight.do(key, _fetch_list_upstream, url, params, key)
+
+
+def _fetch_list_upstream(url, params, key):
+    status_code, data = _get_json(url, params, TMDB_LIST_TTL)
+    if status_code != 200:
+        return status_code, None
+
+    movies = movies_from_tmdb(data.get("results", []))
+    _list_cache.set(key, movies)
+    titulos.add_movies(movies)
+    return 200, movies
+
+
+def _search_best_movie(search_url, params, movie=None):
+    """
+    Busca una película y devuelve (status_code, mejor_coincidencia) o
+    (200, None) si no hubo resultados. Si TMDB no encuentra el texto, se
+    prueba con el título conocido más parecido (índice de trigramas). Si ya se conoce la
+    película (``movie``, p. ej. del contexto de la conversación) no se busca.
+    """
+    if movie is not None:
+        return 200, movie
+
+    exact = titulos.exact(params["query"])
+    if exact is not None:
+        params = {**params, "query": exact}
+
+    status_code, movie = _search_cached(search_url, params)
+    if status_code == 200 and movie is None:
+        match = titulos.best(params["query"], min_score=FUZZY_MIN_SCORE)
+        if match is not None and match[2] != params["query"]:
+            logger.info(f"[search] '{params['query']}' sin resultados; se prueba con '{match[2]}'")
+            return _search_cached(search_url, {**params, "query": match[2]})
+    return status_code, movie
+
+
+def _search_cached(search_url, params):
+    """
+    La mejor coincidencia (mayor vote_average) se guarda por consulta
+    normalizada, sin importar el idioma o la región de la búsqueda: solo se
+    usan su id y su puntuación.
+    """
+    key = params["query"].strip().lower()
+    movie = _search_cache.get(key)
+    if movie is not None:
+        return 200, movie
+    return _flight.do(("search", key), _search_upstream, search_url, params, key)
+
+
+def _search_upstream(search_url, params, key):
+    status_code, data = _get_json(search_url, params, TMDB_DETAIL_TTL)
+    if status_code != 200:
+        return status_code, None
+
+    results = movies_from_tmdb(data.get("results", []))
+    if not results:
+        return 200, None
+
+    titulos.add_movies(results)
+    movie = max(results, key=lambda m: m.vote_average or 0)
+    _search_cache.set(key, movie)
+    return 200, movie
+
+
+def fetch_movie_bundle(movie_id, language=BUNDLE_LANGUAGE):
+    """
+    Pide detalles, videos, similares y proveedores de una película en una sola
+    llamada (append_to_response) y llena las cachés de cada faceta.
+    Devuelve (status_code, facetas) con las claves "videos", "similar" y
+    "providers". Lanza RequestException si falla la conexión.
+    """
+    return _flight.do(("bundle", movie_id, language), _fetch_bundle_upstream, movie_id, language)
+
+
+def _fetch_bundle_upstream(movie_id, language):
+    url = f"{TMDB_BASE_URL}/movie/{movie_id}"
+    params = {
+        "api_key": os.getenv("TMDB_API_KEY"),
+        "language": language,
+        "append_to_response": "videos,similar,watch/providers"
+    }
+    status_code, data = _get_json(url, params, TMDB_DETAIL_TTL)
+    if status_code != 200:
+        return status_code, None
+
+    videos = tuple(
+        (v.get("type", ""), v.get("site", ""), v.get("key"))
+        for v in data.get("videos", {}).get("results", [])
+    )
+    similar = movies_from_tmdb(data.get("similar", {}).get("results", []))
+    _videos_cache.set((movie_id, language), videos)
+    _similar_cache.set((movie_id, language), similar)
+    titulos.add_movies(similar)
+    providers = store_watch_providers(movie_id, data.get("watch/providers", {}).get("results", {}))
+    return 200, {"videos": videos, "similar": similar, "providers": providers}
+
+
+def get_streaming_platforms(movie_name, region="US", movie=None):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
 
     if not api_key:
         return {"error": "No se ha configurado la clave de TMDB (TMDB_API_KEY)."}
@@ -19,43 +263,68 @@ def get_streaming_platforms(movie_name, region="US"):
         "region": region
     }
     try:
-        response = requests.get(search_url, params=params)
+        status_code, movie = _search_best_movie(search_url, params, movie)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_streaming_platforms] Error HTTP: {e}")
         return {"error": "Error al conectar con TMDB."}
 
-    if response.status_code != 200:
-        return {"error": f"Error al conectar con TMDB (status code: {response.status_code})."}
+    if status_code != 200:
+        return {"error": f"Error al conectar con TMDB (status code: {status_code})."}
 
-    results = response.json().get("results", [])
-    if not results:
+    # La mejor coincidencia es la de mayor puntuación
+    if movie is None:
         return {"error": f"No se encontró la película '{movie_name}' en TMDB."}
+    movie_id = movie.id
+
+    # El mapa de proveedores de todas las regiones se guarda por película,
+    # así que otra región u otro usuario ya no necesitan llamar a TMDB
+    provider_map = _providers_cache.get(movie_id)
+    if provider_map is None:
+        try:
+            status_code, bundle = fetch_movie_bundle(movie_id)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[get_streaming_platforms] Error HTTP: {e}")
+            return {"error": "Error al obtener información de streaming."}
+
+        if status_code != 200:
+            return {"error": f"Error al obtener información de streaming (status code: {status_code})."}
+
+        provider_map = bundle["providers"]
+
+    provider_ids = provider_map.get(region, ())
+    if not provider_ids:
+        return {
+            "message": f"No se encontró información de streaming para '{movie_name}' en la región {region}.",
+            "match": movie
+        }
 
-    # Seleccionamos la mejor coincidencia (por ej. la de mayor puntuación)
-    movie = max(results, key=lambda x: x.get("vote_average", 0))
-    movie_id = movie["id"]
-
-    watch_providers_url = f"{base_url}/movie/{movie_id}/watch/providers"
-    try:
-        response = requests.get(watch_providers_url, params={"api_key": api_key})
-    except requests.exceptions.RequestException as e:
-        logger.error(f"[get_streaming_platforms] Error HTTP: {e}")
-        return {"error": "Error al obtener información de streaming."}
-
-    if response.status_code != 200:
-        return {"error": f"Error al obtener información de streaming (status code: {response.status_code})."}
-
-    providers = response.json().get("results", {}).get(region, {}).get("flatrate", [])
-    if not providers:
-        return {"message": f"No se encontró información de streaming para '{movie_name}' en la región {region}."}
+    platforms = [_providers[provider_id] for provider_id in provider_ids]
+    return {"movie_id": movie_id, "movie": movie_name, "match": movie, "platforms": platforms}
 
-    platforms = [{"id": p["provider_id"], "name": p["provider_name"], "logo": p["logo_path"]} for p in providers]
-    return {"movie_id": movie_id, "movie": movie_name, "platforms": platforms}
 
+def store_watch_providers(movie_id, results):
+    """
+    Guarda en caché los proveedores "flatrate" de todas las regiones de una
+    película, a partir de la respuesta de /movie/{id}/watch/providers.
 
-def get_movie_rating(movie_name):
+    Forma compacta: por región solo una tupla de provider_id; el nombre y el
+    logo de cada proveedor se guardan una única vez en _providers.
+    """
+    provider_map = {}
+    for region_code, data in results.items():
+        flatrate = data.get("flatrate") or []
+        for p in flatrate:
+            if p["provider_id"] not in _providers:
+                _providers[p["provider_id"]] = Provider(p["provider_id"], p["provider_name"], p["logo_path"])
+        if flatrate:
+            provider_map[region_code] = tuple(p["provider_id"] for p in flatrate)
+    _providers_cache.set(movie_id, provider_map)
+    return provider_map
+
+
+def get_movie_rating(movie_name, movie=None):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
 
     if not api_key:
         return {"error": "No se ha configurado la clave de TMDB (TMDB_API_KEY)."}
@@ -63,28 +332,25 @@ def get_movie_rating(movie_name):
     search_url = f"{base_url}/search/movie"
     params = {"api_key": api_key, "query": movie_name}
     try:
-        response = requests.get(search_url, params=params)
+        status_code, movie = _search_best_movie(search_url, params, movie)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_movie_rating] Error HTTP: {e}")
         return {"error": "Error al conectar con TMDB."}
 
-    if response.status_code != 200:
-        return {"error": f"Error al conectar con TMDB (status code: {response.status_code})."}
+    if status_code != 200:
+        return {"error": f"Error al conectar con TMDB (status code: {status_code})."}
 
-    results = response.json().get("results", [])
-    if not results:
+    if movie is None:
         return {"error": f"No se encontró la película '{movie_name}'."}
 
-    # Seleccionamos la mejor coincidencia
-    movie = max(results, key=lambda x: x.get("vote_average", 0))
-    rating = movie.get("vote_average", "No disponible")
+    rating = movie.vote_average if movie.vote_average is not None else "No disponible"
 
-    return {"movie_id": movie["id"], "movie": movie_name, "rating": rating}
+    return {"movie_id": movie.id, "movie": movie_name, "match": movie, "rating": rating}
 
 
-def get_similar_movies(movie_name, language="en"):
+def get_similar_movies(movie_name, language="en", movie=None):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
 
     if not api_key:
         return {"error": "No se ha configurado la clave de TMDB (TMDB_API_KEY)."}
@@ -92,50 +358,41 @@ def get_similar_movies(movie_name, language="en"):
     search_url = f"{base_url}/search/movie"
     params = {"api_key": api_key, "query": movie_name, "language": language}
     try:
-        response = requests.get(search_url, params=params)
+        status_code, movie = _search_best_movie(search_url, params, movie)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_similar_movies] Error HTTP: {e}")
         return {"error": "Error al conectar con TMDB."}
 
-    if response.status_code != 200:
-        return {"error": f"Error al conectar con TMDB (status code: {response.status_code})."}
+    if status_code != 200:
+        return {"error": f"Error al conectar con TMDB (status code: {status_code})."}
 
-    results = response.json().get("results", [])
-    if not results:
+    # Tomamos la mejor coincidencia
+    if movie is None:
         return {"error": f"No se encontró la película '{movie_name}'."}
+    movie_id = movie.id
 
-    # Tomamos la mejor coincidencia
-    movie = max(results, key=lambda x: x.get("vote_average", 0))
-    movie_id = movie["id"]
+    movies = _similar_cache.get((movie_id, language))
+    if movies is None:
+        try:
+            status_code, bundle = fetch_movie_bundle(movie_id, language)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[get_similar_movies] Error HTTP al obtener similares: {e}")
+            return {"error": "Error al obtener recomendaciones."}
 
-    similar_url = f"{base_url}/movie/{movie_id}/similar"
-    try:
-        response = requests.get(similar_url, params={"api_key": api_key, "language": language})
-    except requests.exceptions.RequestException as e:
-        logger.error(f"[get_similar_movies] Error HTTP al obtener similares: {e}")
-        return {"error": "Error al obtener recomendaciones."}
+        if status_code != 200:
+            return {"error": f"Error al obtener recomendaciones (status code: {status_code})."}
 
-    if response.status_code != 200:
-        return {"error": f"Error al obtener recomendaciones (status code: {response.status_code})."}
+        movies = bundle["similar"]
 
-    similar_movies = response.json().get("results", [])
-    if not similar_movies:
-        return {"message": f"No se encontraron recomendaciones para '{movie_name}'."}
+    if not movies:
+        return {"message": f"No se encontraron recomendaciones para '{movie_name}'.", "match": movie}
 
-    movies = [
-        {
-            "id": m.get("id"),
-            "title": m.get("title", "Sin título"),
-            "release_date": m.get("release_date", "Fecha desconocida")
-        }
-        for m in similar_movies
-    ]
-    return {"movie_id": movie_id, "movie": movie_name, "recommendations": movies}
+    return {"movie_id": movie_id, "movie": movie_name, "match": movie, "recommendations": movies}
 
 
-def get_movie_trailer(movie_name):
+def get_movie_trailer(movie_name, movie=None):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
 
     if not api_key:
         return {"error": "No se ha configurado la clave de TMDB (TMDB_API_KEY)."}
@@ -143,49 +400,46 @@ def get_movie_trailer(movie_name):
     search_url = f"{base_url}/search/movie"
     params = {"api_key": api_key, "query": movie_name, "language": "es"}
     try:
-        response = requests.get(search_url, params=params)
+        status_code, movie = _search_best_movie(search_url, params, movie)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_movie_trailer] Error HTTP al buscar la película: {e}")
         return {"error": "Error al conectar con TMDB."}
 
-    if response.status_code != 200:
-        return {"error": f"Error al conectar con TMDB (status code: {response.status_code})."}
+    if status_code != 200:
+        return {"error": f"Error al conectar con TMDB (status code: {status_code})."}
 
-    results = response.json().get("results", [])
-    if not results:
+    # Seleccionamos la mejor coincidencia
+    if movie is None:
         return {"error": f"No se encontró la película '{movie_name}'."}
+    movie_id = movie.id
 
-    # Seleccionamos la mejor coincidencia
-    movie = max(results, key=lambda x: x.get("vote_average", 0))
-    movie_id = movie["id"]
+    videos_data = _videos_cache.get((movie_id, "es"))
+    if videos_data is None:
+        try:
+            status_code, bundle = fetch_movie_bundle(movie_id, "es")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[get_movie_trailer] Error HTTP al obtener videos: {e}")
+            return {"error": "Error al obtener los videos de la película."}
 
-    videos_url = f"{base_url}/movie/{movie_id}/videos"
-    params = {"api_key": api_key, "language": "es"}
-    try:
-        response_videos = requests.get(videos_url, params=params)
-    except requests.exceptions.RequestException as e:
-        logger.error(f"[get_movie_trailer] Error HTTP al obtener videos: {e}")
-        return {"error": "Error al obtener los videos de la película."}
+        if status_code != 200:
+            return {"error": f"Error al obtener videos (status code: {status_code})."}
 
-    if response_videos.status_code != 200:
-        return {"error": f"Error al obtener videos (status code: {response_videos.status_code})."}
+        videos_data = bundle["videos"]
 
-    videos_data = response_videos.json().get("results", [])
     if not videos_data:
-        return {"message": "No hay tráiler disponible para esta película."}
+        return {"message": "No hay tráiler disponible para esta película.", "match": movie}
 
-    for video in videos_data:
-        if video.get("type", "").lower() == "trailer" and video.get("site", "").lower() == "youtube":
-            youtube_key = video["key"]
+    for video_type, site, youtube_key in videos_data:
+        if video_type.lower() == "trailer" and site.lower() == "youtube":
             youtube_url = f"https://www.youtube.com/watch?v={youtube_key}"
-            return {"trailer_url": youtube_url}
+            return {"movie_id": movie_id, "match": movie, "trailer_url": youtube_url}
 
-    return {"message": "No se encontró un tráiler de YouTube para esta película."}
+    return {"message": "No se encontró un tráiler de YouTube para esta película.", "match": movie}
 
 
 def get_popular_movies(limit=5, region="US", language="es", page=1):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
     url = f"{base_url}/movie/popular"
 
     if not api_key:
@@ -199,31 +453,16 @@ def get_popular_movies(limit=5, region="US", language="es", page=1):
         "page": page
     }
     try:
-        response = requests.get(url, params=params)
+        status_code, movies = _fetch_list(url, params)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_popular_movies] Error HTTP al obtener películas populares: {e}")
         return []
 
-    if response.status_code != 200:
-        logger.error(f"[get_popular_movies] Código de estado inesperado: {response.status_code}")
+    if status_code != 200:
+        logger.error(f"[get_popular_movies] Código de estado inesperado: {status_code}")
         return []
 
-    movies = response.json().get("results", [])
-    banners = []
-    for movie in movies[:limit]:
-        title = movie.get("title", "Sin título")
-        description = movie.get("overview", "Sin descripción disponible.")
-        backdrop_path = movie.get("backdrop_path")
-
-        image_url = f"https://image.tmdb.org/t/p/w500{backdrop_path}" if backdrop_path else "/static/images/default_banner.jpg"
-        banners.append({
-            "id": movie.get("id"),
-            "title": title,
-            "description": description,
-            "image_url": image_url
-        })
-
-    return banners
+    return [movie_card(movie) for movie in movies[:limit]]
 
 
 def get_carousel_banners(limit=5, region="US", language="es", page=1):
@@ -232,7 +471,7 @@ def get_carousel_banners(limit=5, region="US", language="es", page=1):
     cambiando la página para evitar duplicar los mismos resultados.
     """
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
     url = f"{base_url}/movie/popular"
 
     if not api_key:
@@ -246,37 +485,21 @@ def get_carousel_banners(limit=5, region="US", language="es", page=1):
         "page": page
     }
     try:
-        response = requests.get(url, params=params)
+        status_code, movies = _fetch_list(url, params)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_carousel_banners] Error HTTP al obtener películas populares: {e}")
         return []
 
-    if response.status_code != 200:
-        logger.error(f"[get_carousel_banners] Código de estado inesperado: {response.status_code}")
+    if status_code != 200:
+        logger.error(f"[get_carousel_banners] Código de estado inesperado: {status_code}")
         return []
 
-    movies = response.json().get("results", [])
-    banners = []
-    for movie in movies[:limit]:
-        title = movie.get("title", "Sin título")
-        overview = movie.get("overview", "Sin descripción disponible.")
-        short_desc = overview[:150]
-        backdrop_path = movie.get("backdrop_path")
-
-        image_url = f"https://image.tmdb.org/t/p/w500{backdrop_path}" if backdrop_path else "/static/images/default_banner.jpg"
-        banners.append({
-            "id": movie.get("id"),
-            "title": title,
-            "short_description": short_desc,
-            "image_url": image_url
-        })
-
-    return banners
+    return [carousel_banner(movie) for movie in movies[:limit]]
 
 
 def get_now_playing_movies(limit=5, region="US", language="es"):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
     url = f"{base_url}/movie/now_playing"
 
     if not api_key:
@@ -289,43 +512,24 @@ def get_now_playing_movies(limit=5, region="US", language="es"):
         "page": 1
     }
     try:
-        response = requests.get(url, params=params)
+        status_code, movies = _fetch_list(url, params)
     except requests.exceptions.RequestException as e:
         logger.error(f"[get_now_playing_movies] Error HTTP: {e}")
         return {"error": "Error al conectar con TMDB."}
 
-    if response.status_code != 200:
-        logger.error(f"[get_now_playing_movies] Código de estado inesperado: {response.status_code}")
-        return {"error": f"Error al conectar con TMDB (status code: {response.status_code})."}
+    if status_code != 200:
+        logger.error(f"[get_now_playing_movies] Código de estado inesperado: {status_code}")
+        return {"error": f"Error al conectar con TMDB (status code: {status_code})."}
 
-    data = response.json()
-    results = data.get("results", [])
-    if not results:
+    if not movies:
         return {"message": "No hay películas recientes en cartelera disponibles."}
 
-    results = results[:limit]
-    movies = []
-    for movie in results:
-        title = movie.get("title", "Título desconocido")
-        release_date = movie.get("release_date", "Fecha desconocida")
-        overview = movie.get("overview", "Sin descripción disponible.")
-        backdrop_path = movie.get("backdrop_path")
-
-        image_url = f"https://image.tmdb.org/t/p/w500{backdrop_path}" if backdrop_path else "/static/images/default_banner.jpg"
-        movies.append({
-            "id": movie.get("id"),
-            "title": title,
-            "release_date": release_date,
-            "overview": overview,
-            "image_url": image_url
-        })
-
-    return {"movies": movies}
+    return {"movies": movies[:limit]}
 
 
 def discover_movies_by_genre(genre_id, limit=5, region="US", language="es", page=1):
     api_key = os.getenv("TMDB_API_KEY")
-    base_url = "https://api.themoviedb.org/3"
+    base_url = TMDB_BASE_URL
     discover_url = f"{base_url}/discover/movie"
 
     if not api_key:
@@ -340,36 +544,54 @@ def discover_movies_by_genre(genre_id, limit=5, region="US", language="es", page
         "page": page
     }
     try:
-        response = requests.get(discover_url, params=params)
+        status_code, movies = _fetch_list(discover_url, params)
     except requests.exceptions.RequestException as e:
         logger.error(f"[discover_movies_by_genre] Error HTTP al buscar: {e}")
         return {"error": "Error al conectar con TMDB."}
 
-    if response.status_code != 200:
-        logger.error(f"[discover_movies_by_genre] Código de estado inesperado: {response.status_code}")
-        return {"error": f"Error al obtener películas por género (status code: {response.status_code})."}
+    if status_code != 200:
+        logger.error(f"[discover_movies_by_genre] Código de estado inesperado: {status_code}")
+        return {"error": f"Error al obtener películas por género (status code: {status_code})."}
 
-    data = response.json()
-    results = data.get("results", [])
-    if not results:
+    if not movies:
         return {"message": "No se encontraron películas para este género en este momento."}
 
-    results = results[:limit]
+    return {"movies": movies[:limit]}
+
+
+def get_candidate_movies(region="US", language="es", genre_ids=(), pages=2, cached_only=False):
+    """
+    Películas (Movie) de los listados en caché que alimentan el ranking local:
+    populares y en cartelera, más discover para cada género indicado. Las
+    páginas que fallan se omiten; con ``cached_only`` también las que no están
+    en la caché en memoria, sin llamar a TMDB.
+    """
+    api_key = os.getenv("TMDB_API_KEY")
+    if not api_key:
+        return []
+
+    base_params = {"api_key": api_key, "language": language, "region": region}
+    requests_to_make = []
+    for page in range(1, pages + 1):
+        requests_to_make.append((f"{TMDB_BASE_URL}/movie/popular", {**base_params, "page": page}))
+        requests_to_make.append((f"{TMDB_BASE_URL}/movie/now_playing", {**base_params, "page": page}))
+        for genre_id in genre_ids:
+            requests_to_make.append((f"{TMDB_BASE_URL}/discover/movie", {
+                **base_params, "sort_by": "popularity.desc", "with_genres": genre_id, "page": page
+            }))
+
     movies = []
-    for movie in results:
-        title = movie.get("title", "Título desconocido")
-        release_date = movie.get("release_date", "Fecha desconocida")
-        overview = movie.get("overview", "Sin descripción disponible.")
-        backdrop_path = movie.get("backdrop_path")
-        movie_id = movie.get("id")
-
-        image_url = f"https://image.tmdb.org/t/p/w500{backdrop_path}" if backdrop_path else "/static/images/default_banner.jpg"
-        movies.append({
-            "id": movie_id,
-            "title": title,
-            "release_date": release_date,
-            "overview": overview,
-            "image_url": image_url
-        })
-
-    return {"movies": movies}
+    for url, params in requests_to_make:
+        if cached_only:
+            movies.extend(_list_cache.get(_list_cache_key(url, params)) or [])
+            continue
+        try:
+            status_code, page_movies = _fetch_list(url, params)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"[get_candidate_movies] Error HTTP: {e}")
+            continue
+        if status_code != 200:
+            logger.error(f"[get_candidate_movies] Código de estado inesperado: {status_code}")
+            continue
+        movies.extend(page_movies)
+    return movies
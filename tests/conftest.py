@@ -0,0 +1,79 @@
+"""
+Fixtures comunes de las pruebas.
+
+Las pruebas corren contra el TMDB falso de benchmarks/fake_tmdb.py (sin salir
+a Internet) y una base SQLite temporal por prueba. El entorno se fija antes
+de importar movie_bot, porque algunos módulos leen la configuración al cargarse.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from fake_tmdb import FakeImageUpstream, start_fake_tmdb  # noqa: E402
+
+_server, _tmdb_url = start_fake_tmdb(latency=0)
+os.environ.update({
+    "TMDB_API_KEY": "test",
+    "TMDB_BASE_URL": _tmdb_url,
+    "TMDB_DISK_CACHE": "",
+    "OPENAI_API_KEY": "",
+    "PASSWORD_HASH_WORKERS": "0",
+    "LOG_QUEUE_SIZE": "0",
+    "CHAT_JOBS": "0",
+    "METRICS_TOKEN": "",
+})
+
+
+@pytest.fixture
+def tmdb():
+    """El servidor TMDB falso (``tmdb.hits`` cuenta las peticiones)."""
+    return _server
+
+
+@pytest.fixture
+def app(tmp_path):
+    from movie_bot import create_app
+    from movie_bot.db import db
+
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.sqlite3'}",
+        "WTF_CSRF_ENABLED": False,
+        "CHAT_RATE_LIMIT": 0,
+        "IMAGE_CACHE_DIR": str(tmp_path / "images"),
+        "IMAGE_UPSTREAM": FakeImageUpstream(),
+        "INTENT_MODEL_PATH": str(tmp_path / "intent_model.npz"),
+    })
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def user(app):
+    """Id de un usuario de prueba (test@moviebot.test / "test")."""
+    from movie_bot.db import db
+    from movie_bot.models import User
+
+    with app.app_context():
+        user = User(email="test@moviebot.test", favorite_genre="accion", region="US")
+        user.set_password("test")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def client(app, user):
+    """Cliente de pruebas con la sesión del usuario de prueba iniciada."""
+    client = app.test_client()
+    client.post("/login", data={"email": "test@moviebot.test", "password": "test"})
+    return client
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pytest
+
+from movie_bot.catalog import cargar_catalogo
+from movie_bot.db import db
+from movie_bot.models import CatalogMovie
+
+
+def _export(path, items):
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for item in items:
+            fh.write((item if isinstance(item, str) else json.dumps(item)) + "\n")
+    return str(path)
+
+
+def _pelicula(movie_id, **extra):
+    return {"adult": False, "id": movie_id, "original_title": f"Película {movie_id}",
+            "popularity": 1.5, "video": False, **extra}
+
+
+def test_valor_invalido_no_corta_la_carga(app, tmp_path):
+    path = _export(tmp_path / "movie_ids.json.gz", [
+        _pelicula(1), _pelicula(2, popularity="n/a"), "{roto", _pelicula(3, original_title=None), _pelicula(4),
+    ])
+    with app.app_context():
+        loaded, state = cargar_catalogo(path, batch_size=2)
+        assert state.finished
+        assert sorted(m.movie_id for m in CatalogMovie.query) == [1, 3, 4]
+        assert db.session.get(CatalogMovie, 1).title_key == "pelicula 1"
+
+
+def test_reanuda_desde_el_ultimo_lote(app, tmp_path):
+    path = _export(tmp_path / "movie_ids.json.gz", [_pelicula(i) for i in range(1, 101)])
+
+    class Corte(Exception):
+        pass
+
+    def cortar(loaded, seconds):
+        if loaded >= 40:
+            raise Corte()
+
+    with app.app_context():
+        with pytest.raises(Corte):
+            cargar_catalogo(path, batch_size=20, progress=cortar)
+        db.session.rollback()
+        assert CatalogMovie.query.count() == 40
+
+        loaded, state = cargar_catalogo(path, batch_size=20)
+        assert loaded == 60
+        assert state.lines_done == 100
+        assert CatalogMovie.query.count() == 100
+        assert cargar_catalogo(path)[0] == 0
+
+
+def test_upserts_y_peliculas_distintas(app, tmp_path):
+    # 25 líneas con 20 ids: los repetidos dentro de un lote se escriben una vez
+    path = _export(tmp_path / "movie_ids.json.gz", [_pelicula(i % 20) for i in range(25)])
+    with app.app_context():
+        loaded, state = cargar_catalogo(path, batch_size=10)
+        assert CatalogMovie.query.count() == 20
+        assert state.upserts == loaded == 25
+
+
+def test_comando(app, tmp_path):
+    path = _export(tmp_path / "movie_ids.json.gz", [_pelicula(i) for i in range(1, 11)])
+    with app.app_context():
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["catalog", path])
+        assert result.exit_code == 0
+        assert "10 películas en el catálogo" in result.output
+        assert "ya estaba cargado" in runner.invoke(args=["catalog", path]).output
@@ -0,0 +1,50 @@
+from movie_bot.coindex import actualizar_indice, vecinos
+from movie_bot.db import db
+from movie_bot.models import CoItem, CoPair, Recommendation, User
+
+
+def _recomendar(user_id, movie_ids):
+    for movie_id in movie_ids:
+        db.session.add(Recommendation(user_id=user_id, movie_id=movie_id, movie_title=f"Película {movie_id}"))
+    db.session.commit()
+
+
+def _conteos():
+    items = {i.movie_id: i.users for i in CoItem.query}
+    pairs = {(p.movie_a, p.movie_b): p.shared_users for p in CoPair.query}
+    return items, pairs
+
+
+def test_borrar_el_historial_no_duplica_conteos(app, client, user):
+    with app.app_context():
+        other = User(email="otro@moviebot.test", password_hash="x")
+        db.session.add(other)
+        db.session.commit()
+        _recomendar(user, [1, 2, 3])
+        _recomendar(other.id, [1, 2])
+        actualizar_indice()
+        antes = _conteos()
+        assert antes[0] == {1: 2, 2: 2, 3: 1}
+        assert antes[1][(1, 2)] == 2
+
+    client.post("/clear_chat")
+
+    with app.app_context():
+        assert Recommendation.query.filter_by(user_id=user).count() == 0
+        _recomendar(user, [1, 2, 4])
+        actualizar_indice()
+        items, pairs = _conteos()
+        assert {k: items[k] for k in antes[0]} == antes[0]
+        assert {k: pairs[k] for k in antes[1]} == antes[1]
+        # La película nueva sí se cuenta, junto a lo que el usuario ya tenía
+        assert items[4] == 1
+        assert pairs[(4, 1)] == pairs[(4, 3)] == 1
+        assert [m.id for m in vecinos(1)] == [2]
+
+
+def test_full_reconstruye_desde_recommendations(app, user):
+    with app.app_context():
+        _recomendar(user, [1, 2])
+        actualizar_indice()
+        actualizar_indice(full=True)
+        assert _conteos()[0] == {1: 1, 2: 1}
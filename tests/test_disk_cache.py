@@ -0,0 +1,16 @@
+from movie_bot.disk_cache import DiskCache
+
+
+def test_fila_corrupta_es_un_fallo_y_se_borra(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), sweep_interval=0)
+    cache.set("buena", b'{"results": []}', ttl=60)
+    cache.set("rota", b'{"results": []}', ttl=60)
+    cache._conn().execute("UPDATE responses SET value = substr(value, 1, 5) WHERE key = 'rota'")
+
+    assert cache.get("rota") is None
+    assert len(cache) == 1
+    assert cache.get("buena") == b'{"results": []}'
+
+    # Se vuelve a guardar con normalidad
+    cache.set("rota", b"{}", ttl=60)
+    assert cache.get("rota") == b"{}"
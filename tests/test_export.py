@@ -0,0 +1,59 @@
+import gzip
+import json
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from movie_bot.db import db
+from movie_bot.export import exportar_historial
+from movie_bot.models import Message, Recommendation
+
+
+def _poblar(user_id, rows, batch=10000):
+    now = datetime.utcnow()
+    for start in range(0, rows, batch):
+        db.session.execute(insert(Message), [
+            {"user_id": user_id, "author": "user", "content": f"Mensaje de prueba número {i}", "timestamp": now}
+            for i in range(start, min(start + batch, rows))
+        ])
+    db.session.execute(insert(Recommendation), [
+        {"user_id": user_id, "movie_id": i, "movie_title": f"Película {i}", "timestamp": now}
+        for i in range(0, rows, 10)
+    ])
+    db.session.commit()
+
+
+def _pico_streaming(user_id):
+    """(pico de memoria en bytes, bytes exportados) de consumir la exportación."""
+    tracemalloc.start()
+    size = sum(len(chunk) for chunk in exportar_historial(user_id))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, size
+
+
+def test_memoria_no_crece_con_el_historial(app, user):
+    with app.app_context():
+        _poblar(user, 2000)
+        db.session.expunge_all()
+        peak_small, size_small = _pico_streaming(user)
+
+        _poblar(user, 38000)
+        db.session.expunge_all()
+        peak_large, size_large = _pico_streaming(user)
+
+    # 20 veces más filas, y el pico apenas cambia
+    assert size_large > 15 * size_small
+    assert peak_large < 1.5 * peak_small
+
+
+def test_exportacion_completa_y_gzip(app, user):
+    with app.app_context():
+        _poblar(user, 30)
+        plano = b"".join(exportar_historial(user))
+        comprimido = gzip.decompress(b"".join(exportar_historial(user, comprimir=True)))
+    assert plano == comprimido
+    rows = [json.loads(line) for line in plano.splitlines()]
+    assert [r["type"] for r in rows].count("message") == 30
+    assert [r["type"] for r in rows].count("recommendation") == 3
@@ -0,0 +1,65 @@
+import io
+import os
+
+from movie_bot import image_proxy, tmdb_api
+from movie_bot.image_proxy import DiskImageCache
+
+
+def _en_disco(directory):
+    return sum(
+        entry.stat().st_size for entry in os.scandir(directory)
+        if entry.is_file() and entry.name != image_proxy.LOCK_NAME
+    )
+
+
+def test_limite_compartido_entre_workers(tmp_path):
+    # Dos workers con el mismo directorio: el límite es del disco, no de cada uno
+    workers = [DiskImageCache(str(tmp_path), max_bytes=20_000) for _ in range(2)]
+    for i in range(100):
+        workers[i % 2].put(f"w500/{i}.jpg", b"x" * 1000)
+        assert _en_disco(tmp_path) <= 20_000 * (1 + 2 / DiskImageCache.SWEEP_FRACTION)
+    assert workers[0].sweep() <= 20_000
+    assert _en_disco(tmp_path) <= 20_000
+
+
+def test_expulsa_lo_menos_usado_por_cualquier_worker(tmp_path):
+    a = DiskImageCache(str(tmp_path), max_bytes=5_000)
+    b = DiskImageCache(str(tmp_path), max_bytes=5_000)
+    for i in range(5):
+        a.put(f"w500/{i}.jpg", b"x" * 1000)
+    assert b.get("w500/0.jpg") is not None  # la lee el otro worker
+    a.put("w500/5.jpg", b"x" * 1000)
+    assert a.get("w500/0.jpg") is not None
+    assert a.get("w500/1.jpg") is None
+
+
+def test_reduce_con_pillow(app):
+    from PIL import Image
+
+    response = app.test_client().get("/img/w780/abc.jpg?w=400")
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.data)).width == 400
+
+
+def test_sin_pillow_rechaza_w(app, monkeypatch):
+    monkeypatch.setattr(image_proxy, "PUEDE_REDUCIR", False)
+    monkeypatch.setattr(tmdb_api, "PUEDE_REDUCIR", False)
+    client = app.test_client()
+    assert client.get("/img/w780/abc.jpg?w=400").status_code == 404
+    assert client.get("/img/w780/abc.jpg").status_code == 200
+    assert tmdb_api.build_image_url("/abc.jpg", width=400) == "/img/w500/abc.jpg"
+
+
+def test_con_la_cache_llena_no_barre_en_cada_escritura(tmp_path, monkeypatch):
+    cache = DiskImageCache(str(tmp_path), max_bytes=100_000)
+    barridos = []
+    sweep = cache.sweep
+    monkeypatch.setattr(cache, "sweep", lambda: barridos.append(1) or sweep())
+    for i in range(300):
+        cache.put(f"w500/{i}.jpg", b"x" * 1000)
+    assert _en_disco(tmp_path) <= 100_000
+    # Un barrido cada max_bytes / SWEEP_FRACTION bytes escritos más uno cada vez
+    # que se llena el margen bajo LOW_WATER; no uno por archivo
+    por_escritura = 300_000 // (100_000 // DiskImageCache.SWEEP_FRACTION)
+    por_margen = 300_000 // int(100_000 * (1 - DiskImageCache.LOW_WATER))
+    assert len(barridos) <= por_escritura + por_margen + 1
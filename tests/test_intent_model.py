@@ -0,0 +1,74 @@
+import pytest
+
+from movie_bot.db import db
+from movie_bot.intent_model import IntentModel, ejemplos_de_mensajes, ejemplos_semilla
+from movie_bot.models import Message
+
+
+@pytest.fixture(scope="module")
+def modelo():
+    return IntentModel.entrenar(ejemplos_semilla())
+
+
+@pytest.mark.parametrize("texto", ["quiero ver una pelicula esta noche", "sugiereme algo bueno"])
+def test_recomendar_no_devuelve_un_titulo(modelo, texto):
+    intent, _, arg = modelo.predecir(texto)
+    assert intent == "recomendar"
+    assert arg == ""
+
+
+def test_recomendar_devuelve_el_genero(modelo):
+    assert modelo.predecir("ponme algo de terror") == ("recomendar", pytest.approx(1, abs=0.1), "terror")
+
+
+def test_el_chat_no_busca_el_argumento_como_titulo(app, client, modelo, monkeypatch):
+    import movie_bot.chatbot as chatbot
+
+    modelo.guardar(app.config["INTENT_MODEL_PATH"])
+    monkeypatch.setattr(chatbot, "get_movie_rating", lambda *a, **k: pytest.fail("buscó un título"))
+    client.post("/chat", data={"message": "sugiereme algo bueno"})
+    with app.app_context():
+        message = Message.query.filter_by(author="user").one()
+        assert message.intent == "recomendar"
+        reply = Message.query.filter_by(author="assistant").one().content
+    assert "Para la película" not in reply
+
+
+def test_solo_se_entrena_con_etiquetas_confirmadas(app, user):
+    with app.app_context():
+        for content, intent in (
+            ("que rating tiene dune", "rating"),   # frase fija
+            ("quien dirigio alien", "gpt"),        # fue a GPT
+            ("sugiereme algo bueno", "recomendar"),  # lo atendió el modelo
+            ("hola", None),                        # anterior a messages.intent
+        ):
+            db.session.add(Message(content=content, author="user", user_id=user, intent=intent))
+        db.session.commit()
+
+        etiquetados, a_gpt, sin_confirmar = ejemplos_de_mensajes(100)
+    assert etiquetados == [("que rating tiene dune", "rating", "dune")]
+    assert a_gpt == ["quien dirigio alien"]
+    assert sin_confirmar == 2
+
+
+def test_entrenar_no_crea_una_matriz_densa():
+    import tracemalloc
+
+    from movie_bot.intent_model import MAX_FEATURES
+
+    semillas = ejemplos_semilla()
+    # Mensajes con palabras distintas para llenar el vocabulario
+    ejemplos = [
+        (f"{texto} palabra{i % 3000} otra{i % 2000}", intent, titulo)
+        for i, (texto, intent, titulo) in enumerate(semillas * 8)
+    ]
+    tracemalloc.start()
+    model = IntentModel.entrenar(ejemplos, epochs=5)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Solo la X densa (float32) ya ocupaba esto; el entrenamiento denso
+    # llegaba a ~2.5 veces por las copias del descenso
+    densa = len(ejemplos) * MAX_FEATURES * 4
+    assert len(model.vocab) == MAX_FEATURES
+    assert peak < densa / 1.5
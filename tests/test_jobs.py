@@ -0,0 +1,75 @@
+from sqlalchemy import delete
+
+from movie_bot import chatbot, jobs
+from movie_bot.db import db
+from movie_bot.models import ChatJob, Message, User
+
+
+def _trabajo(user_id, texto="recomiéndame algo"):
+    message = Message(content=jobs.PENDING_REPLY, author="assistant", user_id=user_id, pending=True)
+    db.session.add(message)
+    db.session.flush()
+    job = ChatJob(user_id=user_id, message_id=message.id, user_message=texto)
+    db.session.add(job)
+    db.session.commit()
+    return job.id, message.id
+
+
+def test_al_arrancar_se_retoman_los_pendientes(app, user, monkeypatch):
+    monkeypatch.setattr(chatbot, "responder", lambda user, texto, **kwargs: f"respuesta a {texto}")
+    app.config["CHAT_JOBS"] = True
+    with app.app_context():
+        job_id, message_id = _trabajo(user)
+
+    # Sin ningún mensaje nuevo: basta con arrancar el worker
+    queue = jobs.iniciar_trabajos(app)
+    queue._executor.shutdown(wait=True)
+
+    with app.app_context():
+        assert db.session.get(ChatJob, job_id).status == "done"
+        message = db.session.get(Message, message_id)
+        assert not message.pending
+        assert message.content == "respuesta a recomiéndame algo"
+
+
+def test_sin_cola_no_se_arranca_nada(app):
+    app.config["CHAT_JOBS"] = False
+    assert jobs.iniciar_trabajos(app) is None
+    assert "chat_jobs" not in app.extensions
+
+
+def test_trabajo_de_usuario_borrado_falla(app, user):
+    with app.app_context():
+        job_id, message_id = _trabajo(user)
+        db.session.execute(delete(User).where(User.id == user))
+        db.session.commit()
+
+        queue = jobs.ChatJobQueue(app, max_workers=1)
+        queue._run_job(job_id)
+        db.session.expire_all()
+        job = db.session.get(ChatJob, job_id)
+        assert job.status == "failed"
+        assert db.session.get(Message, message_id).content == jobs.FAILED_REPLY
+        queue._executor.shutdown()
+
+
+def test_trabajo_borrado_tras_reclamarlo(app, user, monkeypatch):
+    with app.app_context():
+        job_id, _ = _trabajo(user)
+        queue = jobs.ChatJobQueue(app, max_workers=1)
+        claim = queue._claim
+
+        def reclamar_y_borrar(job_id):
+            claimed = claim(job_id)
+            db.session.execute(delete(ChatJob).where(ChatJob.id == job_id))
+            db.session.commit()
+            return claimed
+
+        monkeypatch.setattr(queue, "_claim", reclamar_y_borrar)
+        queue._run_job(job_id)  # no lanza AttributeError
+        assert db.session.get(ChatJob, job_id) is None
+        queue._executor.shutdown()
+
+
+def test_por_defecto_tantos_hilos_como_llamadas_a_openai(app):
+    assert app.config["JOB_WORKERS"] == app.config["OPENAI_MAX_CONCURRENT"]
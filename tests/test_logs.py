@@ -0,0 +1,21 @@
+import io
+import logging
+
+from flask import Flask
+
+from movie_bot.logs import instalar_logging, logs_config
+
+
+def test_por_defecto_se_escribe_en_texto(monkeypatch):
+    monkeypatch.delenv("LOG_FORMAT", raising=False)
+    app = Flask(__name__)
+    logs_config(app)
+    assert app.config["LOG_FORMAT"] == "text"
+
+    stream = io.StringIO()
+    instalar_logging(queue_size=0, stream=stream)
+    try:
+        logging.getLogger("movie_bot.prueba").warning("hola %s", "mundo", extra={"user_id": 1})
+        assert stream.getvalue() == "WARNING:movie_bot.prueba:hola mundo\n"
+    finally:
+        instalar_logging(queue_size=0)
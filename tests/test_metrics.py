@@ -0,0 +1,12 @@
+def test_metrics_deshabilitado_sin_token(app):
+    assert app.test_client().get("/metrics").status_code == 404
+
+
+def test_metrics_requiere_token(app):
+    app.config["METRICS_TOKEN"] = "secreto"
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer secreto"})
+    assert response.status_code == 200
+    assert set(response.get_json()) >= {"counters", "timings", "gauges"}
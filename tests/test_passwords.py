@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from movie_bot.passwords import HashPool, PasswordHashBusy
+
+
+@pytest.fixture
+def pool():
+    pool = HashPool(workers=1, max_pending=1, timeout=30)
+    pool.run(time.sleep, 0)  # arranca el proceso fuera del tiempo medido
+    pool.timeout = 1.0
+    yield pool
+    pool._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def test_hash_lento_es_busy(pool):
+    start = time.monotonic()
+    with pytest.raises(PasswordHashBusy):
+        pool.run(time.sleep, 3)
+    assert time.monotonic() - start < 1.5
+
+
+def test_espera_y_resultado_comparten_el_plazo(pool):
+    other = threading.Thread(target=pool.run, args=(time.sleep, 0.7))
+    other.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    with pytest.raises(PasswordHashBusy):
+        # Espera ~0.6 s el lugar y solo le queda ~0.4 s para el resultado
+        pool.run(time.sleep, 3)
+    assert time.monotonic() - start < 1.5
+    other.join()
+
+
+def test_login_responde_503(app, user, monkeypatch):
+    import movie_bot.models as models
+
+    def ocupado(*args):
+        raise PasswordHashBusy()
+
+    monkeypatch.setattr(models, "verify_password", ocupado)
+    response = app.test_client().post("/login", data={"email": "test@moviebot.test", "password": "test"})
+    assert response.status_code == 503
@@ -0,0 +1,31 @@
+"""
+Presupuestos de consultas SQL por ruta (movie_bot/query_counter.py).
+
+Recorre las rutas principales con el cliente de pruebas y falla si alguna
+hace más consultas que su presupuesto (el mensaje lista las consultas), así
+un patrón N+1 o un commit de más se detectan antes de desplegar.
+"""
+import pytest
+
+from movie_bot.query_counter import max_queries
+
+# (método, ruta, datos del formulario, máximo de consultas). Las respuestas
+# que guardan recomendaciones hacen un INSERT por película (5 por respuesta).
+BUDGETS = [
+    ("GET", "/", None, 1),
+    ("GET", "/chat", None, 2),
+    ("POST", "/chat", {"message": "que rating tiene dune"}, 7),
+    ("POST", "/chat", {"message": "me recomiendas algo"}, 13),
+    ("POST", "/chat", {"message": "alguna parecida a dune"}, 14),
+    ("GET", "/perfil", None, 1),
+]
+
+
+@pytest.mark.parametrize(
+    "method, path, data, limit", BUDGETS,
+    ids=[f"{m} {p}" + (f" ({d['message']})" if d else "") for m, p, d, _ in BUDGETS],
+)
+def test_presupuesto_de_consultas(client, method, path, data, limit):
+    with max_queries(limit, f"{method} {path}"):
+        response = client.open(path, method=method, data=data)
+    assert response.status_code == 200
@@ -0,0 +1,67 @@
+import numpy as np
+
+from movie_bot.ranking import CandidateSet, pesos_de_genero, pesos_de_historial, rank
+from movie_bot.records import Movie
+
+
+def _candidatas(genres_por_pelicula):
+    return CandidateSet.from_movies([
+        Movie(id=i + 1, title=f"Película {i + 1}", release_date="2024-01-01",
+              vote_average=7.0, popularity=10.0, genre_ids=genres)
+        for i, genres in enumerate(genres_por_pelicula)
+    ])
+
+
+def test_historial_sin_generos_no_devuelve_vistas():
+    # La película ya recomendada (id 1) no trae genre_ids, como pasa a menudo en TMDB
+    candidates = _candidatas([(), (28,), (27,)])
+    top = rank(candidates, pesos_de_genero(28, 27), {1}, k=2)
+    assert 1 not in candidates.ids[top]
+    assert list(candidates.ids[top]) == [2, 3]
+
+
+def test_nunca_devuelve_vistas():
+    rng = np.random.default_rng(0)
+    candidates = _candidatas([tuple(rng.choice([28, 27, 35, 18], size=rng.integers(0, 3))) for _ in range(200)])
+    seen = set(int(i) for i in rng.choice(candidates.ids, size=150, replace=False))
+    top = rank(candidates, pesos_de_genero(35), seen, k=100)
+    assert len(top) == 50
+    assert not seen & set(int(i) for i in candidates.ids[top])
+
+
+def test_todas_vistas():
+    candidates = _candidatas([(28,), (27,)])
+    assert len(rank(candidates, pesos_de_genero(28), {1, 2})) == 0
+
+
+def test_historial_fuera_de_las_candidatas_cuenta():
+    # Lo ya recomendado (ids 100 y 101, de terror) no está entre las candidatas
+    candidates = _candidatas([(35,), (27,), (18,)])
+    sin_historial = rank(candidates, pesos_de_genero(), {100, 101}, k=1)
+    weights = pesos_de_genero() + pesos_de_historial([(27,), (27, 53)])
+    con_historial = rank(candidates, weights, {100, 101}, k=1)
+    assert list(candidates.ids[sin_historial]) == [1]
+    assert list(candidates.ids[con_historial]) == [2]
+
+
+def test_historial_sin_generos_no_suma():
+    assert not pesos_de_historial([(), ()]).any()
+
+
+def test_recomendacion_local_usa_los_generos_guardados(app, user, monkeypatch):
+    from movie_bot import chatbot, ranking
+    from movie_bot.db import db
+    from movie_bot.models import Recommendation, User
+
+    candidates = _candidatas([(35,), (27,), (18,)])
+    monkeypatch.setattr(ranking, "candidatas", lambda *args, **kwargs: candidates)
+    with app.app_context():
+        user = db.session.get(User, user)
+        user.favorite_genre = None
+        db.session.add(Recommendation(user_id=user.id, movie_id=100, movie_title="Vieja", genre_ids="27,53"))
+        db.session.commit()
+
+        reply = chatbot._recomendacion_local(user, {100}, "Para ti:")
+        assert reply.splitlines()[1].startswith("Película 2")
+        guardada = Recommendation.query.filter_by(user_id=user.id, movie_id=2).one()
+        assert guardada.genre_ids == "27"
@@ -0,0 +1,45 @@
+import pytest
+
+from movie_bot.chatbot import clasificar_mensaje, detectar_intencion
+from movie_bot.conversation import olvidar, recordar
+from movie_bot.records import Movie
+
+FRASES_SIN_TITULO = ["toma nota", "dame una nota", "me gusta ver el trailer"]
+
+
+@pytest.mark.parametrize("texto", FRASES_SIN_TITULO)
+def test_sin_contexto_van_a_gpt(app, texto):
+    with app.app_context():
+        assert detectar_intencion(texto) == ("gpt", "")
+        assert clasificar_mensaje(texto, user_id=999) == ("gpt", "")
+
+
+@pytest.mark.parametrize("texto, intent", [
+    ("dame una nota", "rating"),
+    ("y el trailer", "trailer"),
+    ("donde la puedo ver", "donde_ver"),
+])
+def test_con_pelicula_en_contexto_son_seguimientos(app, texto, intent):
+    recordar(998, "rating", movie=Movie(id=1, title="Dune"))
+    try:
+        with app.app_context():
+            assert clasificar_mensaje(texto, user_id=998) == (intent, "")
+    finally:
+        olvidar(998)
+
+
+def test_referencia_explicita_sin_contexto(app):
+    # "la segunda" apunta al contexto aunque no lo haya: el chat pregunta el título
+    with app.app_context():
+        assert clasificar_mensaje("que nota tiene la segunda", user_id=997) == ("rating", "la segunda")
+
+
+def test_el_chat_responde_con_gpt(app, client, user, monkeypatch):
+    import movie_bot.chatbot as chatbot
+
+    # El contexto vive en memoria del proceso: que no quede el de otra prueba
+    olvidar(user)
+    monkeypatch.setattr(chatbot, "responder_gpt", lambda *args, **kwargs: "respuesta de GPT")
+    response = client.post("/chat", data={"message": "toma nota"})
+    assert "respuesta de GPT" in response.get_data(as_text=True)
+    assert "De qué película me hablas" not in response.get_data(as_text=True)
@@ -0,0 +1,76 @@
+from movie_bot import tmdb_api
+from movie_bot.records import Movie
+from movie_bot.title_index import TitleIndex
+
+
+def _indice(monkeypatch, titles):
+    index = TitleIndex()
+    for i, title in enumerate(titles):
+        index.add(i + 1, title)
+    monkeypatch.setattr(tmdb_api, "titulos", index)
+    return index
+
+
+def _busquedas(monkeypatch, encontrados):
+    """Reemplaza la búsqueda en TMDB; devuelve la lista de consultas hechas."""
+    queries = []
+
+    def search(search_url, params):
+        queries.append(params["query"])
+        found = params["query"] in encontrados
+        return 200, Movie(id=1, title=params["query"], vote_average=7.0) if found else None
+
+    monkeypatch.setattr(tmdb_api, "_search_cached", search)
+    return queries
+
+
+def test_titulo_bien_escrito_no_se_reemplaza(monkeypatch):
+    _indice(monkeypatch, ["Toy Story 2", "Shrek 2", "Rocky II"])
+    for text in ("toy story", "shrek", "rocky iii"):
+        queries = _busquedas(monkeypatch, {text})
+        status_code, movie = tmdb_api._search_best_movie("/search/movie", {"query": text})
+        assert queries == [text]
+        assert movie.title == text
+
+
+def test_sin_resultados_se_prueba_el_titulo_parecido(monkeypatch):
+    _indice(monkeypatch, ["Toy Story 2"])
+    queries = _busquedas(monkeypatch, {"Toy Story 2"})
+    status_code, movie = tmdb_api._search_best_movie("/search/movie", {"query": "tpy story 2"})
+    assert queries == ["tpy story 2", "Toy Story 2"]
+    assert movie.title == "Toy Story 2"
+
+
+def test_coincidencia_exacta_normalizada(monkeypatch):
+    _indice(monkeypatch, ["Amélie"])
+    queries = _busquedas(monkeypatch, {"Amélie"})
+    tmdb_api._search_best_movie("/search/movie", {"query": "amelie"})
+    assert queries == ["Amélie"]
+
+
+def test_indice_acotado():
+    index = TitleIndex(maxsize=100)
+    for i in range(1000):
+        index.add(i, f"Película número {i}")
+    assert len(index) <= 100
+    # Se conservan los más recientes y las búsquedas siguen funcionando
+    assert index.best("Película número 999", min_score=0.9)[1] == 999
+    assert index.best("Película número 3", min_score=0.99) is None
+    assert index.exact("pelicula numero 999") == "Película número 999"
+    assert index.exact("pelicula numero 3") is None
+
+
+def test_descarte_equivale_a_reconstruir():
+    titles = [f"Película {i} {'del norte' if i % 3 else 'de la noche'}" for i in range(150)]
+    index = TitleIndex(maxsize=100)
+    for i, title in enumerate(titles):
+        index.add(i, title)
+    # Al añadir el título 100 se descartan los 50 más antiguos
+    fresh = TitleIndex(maxsize=100)
+    for i in range(50, 150):
+        fresh.add(i, titles[i])
+    assert len(index) == len(fresh) == 100
+    for query in ("pelicula 7 del norte", "pelicula 120 de la noche", "pelicula 99"):
+        assert index.search(query, k=10) == fresh.search(query, k=10)
+    assert index.exact("pelicula 149 del norte") == "Película 149 del norte"
+    assert index.exact("pelicula 10 del norte") is None